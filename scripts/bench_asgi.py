@@ -0,0 +1,195 @@
+#!/usr/bin/env python
+"""p50/p99 latency of the hot auth routes: WSGI (gthread) vs ASGI (Uvicorn).
+
+Starts each server the way it is deployed, on a local port with the same
+number of worker processes, then keeps ``--concurrency`` requests in flight
+against each route until ``--requests`` have completed:
+
+    wsgi   gunicorn authsvc.config.wsgi:application --worker-class gthread --threads 8
+    asgi   gunicorn authsvc.config.asgi:application -c python:authsvc.config.gunicorn
+
+Routes: ``me`` (bearer auth + one SELECT), ``introspect`` (a batch of 10
+tokens), ``refresh`` (one rotation per request, each client on its own
+chain) and ``login`` (one password hash; rejections with 503 under hashing
+backpressure are counted, not timed).
+
+    DJANGO_SETTINGS_MODULE=authsvc.config.settings.dev \\
+        python scripts/bench_asgi.py [--concurrency 64] [--requests 3000] [--workers 3]
+
+``--url`` benchmarks an already running server instead (e.g. an older
+release, to compare against the fully synchronous routes). Needs a migrated
+database (``DB_*`` env vars) and the JWT keys; login throttling and rate
+limits are turned off for the launched servers. Creates and removes its own
+bench user.
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "authsvc.config.settings.dev")
+
+BENCH_EMAIL = "bench-asgi@example.com"
+PASSWORD = "bench password that is long enough"
+ROUTES = ("me", "introspect", "refresh", "login")
+
+SERVERS = {
+    "wsgi": [
+        "gunicorn", "authsvc.config.wsgi:application",
+        "--worker-class", "gthread", "--threads", "8",
+    ],
+    "asgi": [
+        "gunicorn", "authsvc.config.asgi:application",
+        "--config", "python:authsvc.config.gunicorn",
+    ],
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start(name: str, workers: int) -> tuple[subprocess.Popen, str]:
+    import httpx
+
+    port = _free_port()
+    env = {
+        **os.environ,
+        "PYTHONPATH": os.pathsep.join(filter(None, [str(ROOT / "src"), os.getenv("PYTHONPATH")])),
+        "LOGIN_THROTTLE_ENABLED": "0",
+        "RATELIMIT_ENABLE": "0",
+    }
+    command = SERVERS[name] + [
+        "--bind", f"127.0.0.1:{port}", "--workers", str(workers),
+        "--access-logfile", "/dev/null",
+    ]
+    process = subprocess.Popen(command, env=env, cwd=ROOT)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            sys.exit(f"{name} server exited with {process.returncode}")
+        try:
+            if httpx.get(f"{url}/api/v1/health/live").status_code == 200:
+                return process, url
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    sys.exit(f"{name} server did not come up")
+
+
+async def _drive(url: str, route: str, concurrency: int, total: int, access: str, refresh_tokens):
+    import httpx
+
+    remaining = total
+    latencies: list[float] = []
+    rejected = 0
+
+    async def client_loop(http, chain: int):
+        nonlocal remaining, rejected
+        while remaining > 0:
+            remaining -= 1
+            if route == "me":
+                request = http.build_request(
+                    "GET", "/api/v1/auth/me", headers={"Authorization": f"Bearer {access}"}
+                )
+            elif route == "introspect":
+                request = http.build_request(
+                    "POST", "/api/v1/auth/introspect", json={"tokens": [access] * 10}
+                )
+            elif route == "refresh":
+                request = http.build_request(
+                    "POST", "/api/v1/auth/refresh",
+                    json={"refresh_token": refresh_tokens[chain]},
+                )
+            else:
+                request = http.build_request(
+                    "POST", "/api/v1/auth/login",
+                    json={"email": BENCH_EMAIL, "password": PASSWORD},
+                )
+            start = time.perf_counter()
+            response = await http.send(request)
+            elapsed = time.perf_counter() - start
+            if response.status_code == 200:
+                latencies.append(elapsed)
+                if route == "refresh":
+                    refresh_tokens[chain] = response.json()["refresh_token"]
+            elif response.status_code == 503:
+                rejected += 1
+            else:
+                sys.exit(f"{route}: unexpected {response.status_code} {response.text[:200]}")
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as http:
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop(http, i) for i in range(concurrency)))
+        wall = time.perf_counter() - start
+    return sorted(latencies), rejected, wall
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--workers", type=int, default=3)
+    parser.add_argument("--servers", default="wsgi,asgi")
+    parser.add_argument("--routes", default=",".join(ROUTES))
+    parser.add_argument("--url", help="benchmark this running server instead of launching any")
+    args = parser.parse_args()
+
+    import django
+
+    django.setup()
+    from authsvc.apps.accounts.models import User
+    from authsvc.apps.tokens.services import issue_token_pair
+
+    User.objects.filter(email=BENCH_EMAIL).delete()
+    user = User.objects.create_user(
+        email=BENCH_EMAIL, password=PASSWORD, is_active=True, is_email_verified=True
+    )
+    access, _ = issue_token_pair(user, request=None)
+    targets = [("url", None)] if args.url else [(name, name) for name in args.servers.split(",")]
+
+    rows = []
+    try:
+        for label, server in targets:
+            process, url = (None, args.url) if server is None else _start(server, args.workers)
+            try:
+                for route in args.routes.split(","):
+                    chains = [issue_token_pair(user, request=None)[1] for _ in range(args.concurrency)]
+                    latencies, rejected, wall = asyncio.run(
+                        _drive(url, route, args.concurrency, args.requests, access, chains)
+                    )
+                    rows.append((label, route, latencies, rejected, wall))
+            finally:
+                if process is not None:
+                    process.terminate()
+                    process.wait()
+    finally:
+        User.objects.filter(email=BENCH_EMAIL).delete()
+
+    print(f"{'server':<7}{'route':<12}{'p50 (ms)':>10}{'p99 (ms)':>10}{'req/s':>9}{'503s':>7}")
+    for label, route, latencies, rejected, wall in rows:
+        if not latencies:
+            print(f"{label:<7}{route:<12}{'-':>10}{'-':>10}{0:>9}{rejected:>7}")
+            continue
+        p99 = latencies[max(int(len(latencies) * 0.99) - 1, 0)]
+        print(
+            f"{label:<7}{route:<12}{statistics.median(latencies) * 1e3:>10.2f}"
+            f"{p99 * 1e3:>10.2f}{len(latencies) / wall:>9.0f}{rejected:>7}"
+        )
+    print(f"({args.concurrency} in flight, {args.requests} requests per route, {args.workers} workers)")
+
+
+if __name__ == "__main__":
+    main()
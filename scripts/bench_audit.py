@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+"""p50/p99 of ``/refresh`` and ``/logout`` with synchronous vs buffered audit writes.
+
+Each worker thread repeatedly takes a fresh token pair (untimed), then
+rotates it with ``POST /api/v1/auth/refresh`` and ends the session with
+``POST /api/v1/auth/logout``. Both calls are timed, through the whole
+middleware stack via Django's test client. Together they record three audit
+events: ``refresh_success``, ``logout`` and ``session_revocation``. Each mode
+runs in a fresh process:
+
+    sync      AUDIT_BUFFERED=0   (one INSERT per event, in the request)
+    buffered  AUDIT_BUFFERED=1   (bulk INSERT from the writer thread)
+
+    DJANGO_SETTINGS_MODULE=authsvc.config.settings.dev \\
+        python scripts/bench_audit.py [--threads 8] [--iterations 500]
+
+"events" counts the audit rows the run wrote once the buffer was flushed. It
+should match across the two modes. Needs a migrated database (``DB_*`` env
+vars) and the JWT keys. Rate limits are turned off, and the script creates
+and removes its own bench user.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "authsvc.config.settings.dev")
+
+BENCH_EMAIL = "bench-audit@example.invalid"
+MODES = {"sync": {"AUDIT_BUFFERED": "0"}, "buffered": {"AUDIT_BUFFERED": "1"}}
+
+
+def _p99(latencies: list[float]) -> float:
+    return latencies[max(int(len(latencies) * 0.99) - 1, 0)]
+
+
+def _measure(threads: int, iterations: int) -> dict:
+    import django
+
+    django.setup()
+    from django.db import connection
+    from django.test import Client
+
+    from authsvc.apps.accounts.models import User
+    from authsvc.apps.audit import writer
+    from authsvc.apps.audit.models import AuditEvent
+    from authsvc.apps.tokens.services import issue_token_pair
+
+    User.objects.filter(email=BENCH_EMAIL).delete()
+    user = User.objects.create_user(
+        email=BENCH_EMAIL, password="bench password that is long enough", is_active=True
+    )
+    before = AuditEvent.objects.filter(actor_id=str(user.uuid)).count()
+    timings = {"refresh": [], "logout": []}
+    lock = threading.Lock()
+
+    def worker():
+        client = Client()
+        mine = {"refresh": [], "logout": []}
+        for _ in range(iterations):
+            _, refresh_token = issue_token_pair(user, request=None)
+            start = time.perf_counter()
+            rotated = client.post(
+                "/api/v1/auth/refresh", data={"refresh_token": refresh_token},
+                content_type="application/json",
+            )
+            mine["refresh"].append(time.perf_counter() - start)
+            start = time.perf_counter()
+            client.post(
+                "/api/v1/auth/logout", data={"refresh_token": rotated.json()["refresh_token"]},
+                content_type="application/json",
+            )
+            mine["logout"].append(time.perf_counter() - start)
+        connection.close()
+        with lock:
+            for route, values in mine.items():
+                timings[route].extend(values)
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    writer.flush()
+    events = AuditEvent.objects.filter(actor_id=str(user.uuid)).count() - before
+    User.objects.filter(email=BENCH_EMAIL).delete()
+    row = {"events": events}
+    for route, values in timings.items():
+        values.sort()
+        row[route] = {"p50": statistics.median(values), "p99": _p99(values)}
+    return row
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(_measure(args.threads, args.iterations)))
+        return
+
+    env = {**os.environ, "RATELIMIT_ENABLE": "0", "LOGIN_THROTTLE_ENABLED": "0"}
+    print(f"{'mode':<10}{'route':<9}{'p50 (ms)':>10}{'p99 (ms)':>10}{'events':>8}")
+    for mode, mode_env in MODES.items():
+        out = subprocess.run(
+            [sys.executable, __file__, "--mode", mode,
+             "--threads", str(args.threads), "--iterations", str(args.iterations)],
+            env={**env, **mode_env}, capture_output=True, text=True, check=True,
+        ).stdout
+        row = json.loads(out.strip().splitlines()[-1])
+        for route in ("refresh", "logout"):
+            print(
+                f"{mode:<10}{route:<9}{row[route]['p50'] * 1e3:>10.2f}"
+                f"{row[route]['p99'] * 1e3:>10.2f}{row['events']:>8}"
+            )
+    print(f"({args.threads} threads x {args.iterations} refresh+logout pairs per mode)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+"""Audit ingestion throughput: single-row INSERT vs ``bulk_create`` vs ``COPY``.
+
+Writes ``--events`` ``login_failure`` events shaped like the ones
+``_audit_failure`` records during a credential-stuffing wave (an account
+identifier target, request id, IP, user agent and a ``reason``), three ways:
+
+    insert       AuditEvent.objects.create() per event, autocommit
+                 (what record_event did before buffering)
+    bulk_create  one multi-row INSERT per --batch events
+    copy         copy_insert(): one COPY FROM STDIN per --batch events
+                 (PostgreSQL only; what the audit writer uses there)
+
+    DJANGO_SETTINGS_MODULE=authsvc.config.settings.dev \\
+        python scripts/bench_audit_ingest.py [--events 20000] [--batch 5000]
+
+Needs a migrated database (``DB_*`` env vars). The model refuses deletes, so
+the bench rows (``request_id`` "bench-ingest") are removed with raw SQL
+afterwards.
+
+Only SQLite has been measured so far (a development container, 20000
+events, batches of 5000): insert 683-834 events/s, bulk_create 6910-7558
+events/s. The ``copy`` row has not been run on PostgreSQL yet, so COPY's
+gain over ``bulk_create`` is unmeasured.
+"""
+import argparse
+import hashlib
+import os
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "authsvc.config.settings.dev")
+
+REQUEST_ID = "bench-ingest"
+
+
+def _events(count: int):
+    from authsvc.apps.audit.models import AuditEvent
+
+    return [
+        AuditEvent(
+            event_type=AuditEvent.EventType.LOGIN_FAILURE,
+            result=AuditEvent.Result.FAILURE,
+            target_type="account_identifier",
+            target_id=hashlib.sha256(f"victim-{i}@example.com".encode()).hexdigest(),
+            request_id=REQUEST_ID,
+            ip_address=f"198.51.100.{i % 250 + 1}",
+            user_agent="python-requests/2.32",
+            metadata={"reason": "bad_credentials", "attempt": str(uuid.uuid4())},
+        )
+        for i in range(count)
+    ]
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--batch", type=int, default=5000)
+    args = parser.parse_args()
+
+    import django
+
+    django.setup()
+    from django.db import connection
+
+    from authsvc.apps.audit.models import AuditEvent
+    from authsvc.infrastructure.database import copy_insert
+
+    def insert(events):
+        for event in events:
+            event.save(force_insert=True)
+
+    def bulk_create(events):
+        for chunk in _chunks(events, args.batch):
+            AuditEvent.objects.bulk_create(chunk)
+
+    def copy(events):
+        for chunk in _chunks(events, args.batch):
+            copy_insert(AuditEvent, chunk)
+
+    modes = {"insert": insert, "bulk_create": bulk_create}
+    if connection.vendor == "postgresql":
+        modes["copy"] = copy
+
+    print(f"{'mode':<13}{'events':>8}{'seconds':>10}{'events/s':>11}")
+    try:
+        for name, write in modes.items():
+            events = _events(args.events)
+            start = time.perf_counter()
+            write(events)
+            elapsed = time.perf_counter() - start
+            print(f"{name:<13}{len(events):>8}{elapsed:>10.2f}{len(events) / elapsed:>11.0f}")
+    finally:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {connection.ops.quote_name(AuditEvent._meta.db_table)} "
+                "WHERE request_id = %s",
+                [REQUEST_ID],
+            )
+    if "copy" not in modes:
+        print(f"(copy skipped: {connection.vendor} has no COPY; copy_insert uses bulk_create)")
+    print(f"(batches of {args.batch}; {connection.vendor})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+"""Per-request database latency: new connection vs persistent vs pooled.
+
+Each simulated request does what a login does before hashing: one indexed
+user lookup. It then ends the request the way Django does
+(``request_started`` / ``request_finished``). Three modes each run in a fresh
+process with the matching ``DB_*`` env:
+
+    connect     DB_POOL=0 DB_CONN_MAX_AGE=0   (a new connection per request)
+    persistent  DB_POOL=0 DB_CONN_MAX_AGE=60
+    pool        DB_POOL=1                     (psycopg_pool, the default)
+
+    DJANGO_SETTINGS_MODULE=authsvc.config.settings.dev \\
+        python scripts/bench_db_pool.py [--threads 16] [--requests 4000]
+
+"connections" is how many connections each mode opened. It should be about
+``--requests`` for connect and about ``--threads`` (or ``DB_POOL_MAX_SIZE``)
+for the others; the p50 difference is the connection setup taken off every
+request. Needs a migrated PostgreSQL database (``DB_*`` env vars).
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "authsvc.config.settings.dev")
+
+MODES = {
+    "connect": {"DB_POOL": "0", "DB_CONN_MAX_AGE": "0"},
+    "persistent": {"DB_POOL": "0", "DB_CONN_MAX_AGE": "60"},
+    "pool": {"DB_POOL": "1"},
+}
+
+
+def _measure(threads: int, requests: int) -> dict:
+    import django
+
+    django.setup()
+    from django.core.signals import request_finished, request_started
+    from django.db import connection
+    from django.db.backends.signals import connection_created
+
+    from authsvc.apps.accounts.models import User
+    from authsvc.infrastructure.database import pool_stats
+
+    opened = []
+    connection_created.connect(lambda **kwargs: opened.append(1), weak=False)
+    latencies: list[float] = []
+    lock = threading.Lock()
+    remaining = [requests]
+
+    def worker():
+        mine = []
+        while True:
+            with lock:
+                if remaining[0] <= 0:
+                    break
+                remaining[0] -= 1
+            start = time.perf_counter()
+            request_started.send(sender=None)
+            User.objects.filter(email__iexact="nobody@example.com").first()
+            request_finished.send(sender=None)
+            mine.append(time.perf_counter() - start)
+        connection.close()
+        with lock:
+            latencies.extend(mine)
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    wall = time.perf_counter() - start
+    latencies.sort()
+    stats = pool_stats().get("default", {})
+    return {
+        "p50": statistics.median(latencies),
+        "p99": latencies[max(int(len(latencies) * 0.99) - 1, 0)],
+        "rps": len(latencies) / wall,
+        "connections": stats.get("connections_num", len(opened)),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(_measure(args.threads, args.requests)))
+        return
+
+    print(f"{'mode':<12}{'p50 (ms)':>10}{'p99 (ms)':>10}{'req/s':>9}{'connections':>13}")
+    for mode, env in MODES.items():
+        out = subprocess.run(
+            [sys.executable, __file__, "--mode", mode,
+             "--threads", str(args.threads), "--requests", str(args.requests)],
+            env={**os.environ, **env}, capture_output=True, text=True, check=True,
+        ).stdout
+        row = json.loads(out.strip().splitlines()[-1])
+        print(
+            f"{mode:<12}{row['p50'] * 1e3:>10.2f}{row['p99'] * 1e3:>10.2f}"
+            f"{row['rps']:>9.0f}{row['connections']:>13}"
+        )
+    print(f"({args.threads} threads, {args.requests} requests per mode)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+"""Benchmark of the login e-mail lookup (``email__iexact``) on PostgreSQL.
+
+Seeds ``--users`` accounts (default 1,000,000) with one INSERT ... SELECT
+FROM generate_series, then times ``User.objects.filter(email__iexact=...)``
+for random existing and missing addresses with the ``UPPER(email)``
+functional index, and again with it dropped inside a rolled-back transaction
+(the sequential scan every unauthenticated route used to pay).
+
+    DJANGO_SETTINGS_MODULE=authsvc.config.settings.dev \\
+        python scripts/bench_email_lookup.py [--users 1000000] [--lookups 200]
+
+Needs a migrated PostgreSQL database (``DB_*`` env vars). The seeded rows use
+the ``bench-lookup-`` prefix and are removed afterwards unless ``--keep``.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "authsvc.config.settings.dev")
+
+PREFIX = "bench-lookup-"
+DOMAIN = "@example.invalid"
+
+
+def _seed(users: int) -> None:
+    from django.db import connection, transaction
+
+    from authsvc.apps.accounts.models import User
+
+    table = User._meta.db_table
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"SELECT count(*) FROM {table} WHERE email LIKE %s", [PREFIX + "%"])
+        have = cursor.fetchone()[0]
+        if have >= users:
+            return
+        # Mixed-case addresses so the lookup really is case-insensitive.
+        cursor.execute(
+            f"""
+            INSERT INTO {table} (uuid, email, password, first_name, last_name, is_active,
+                                 is_staff, is_superuser, is_email_verified, mfa_enabled,
+                                 created_at, updated_at, custom_fields)
+            SELECT gen_random_uuid(), %s || n || 'User' || %s, '!', '', '', true,
+                   false, false, true, false, now(), now(), '{{}}'::jsonb
+            FROM generate_series(%s, %s) AS n
+            """,
+            [PREFIX, DOMAIN, have, users - 1],
+        )
+        cursor.execute(f"ANALYZE {table}")
+
+
+def _time(lookups: int, users: int) -> list[float]:
+    from authsvc.apps.accounts.models import User
+
+    latencies = []
+    for i in range(lookups):
+        # Every other lookup misses, like a login with an unknown address.
+        n = random.randrange(users) if i % 2 == 0 else users + i
+        email = f"{PREFIX}{n}user{DOMAIN}".upper()
+        start = time.perf_counter()
+        User.objects.filter(email__iexact=email).first()
+        latencies.append(time.perf_counter() - start)
+    return sorted(latencies)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=200)
+    parser.add_argument("--keep", action="store_true", help="keep the seeded users for the next run")
+    args = parser.parse_args()
+
+    import django
+
+    django.setup()
+    from django.db import connection, transaction
+
+    from authsvc.apps.accounts.models import User
+
+    if connection.vendor != "postgresql":
+        sys.exit(f"bench_email_lookup needs PostgreSQL (got {connection.vendor})")
+
+    start = time.perf_counter()
+    _seed(args.users)
+    print(f"seeded {args.users:,} users in {time.perf_counter() - start:.1f}s")
+
+    rows = [("UPPER(email) index", _time(args.lookups, args.users))]
+    plan = User.objects.filter(email__iexact=f"{PREFIX}1user{DOMAIN}").explain()
+    try:
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute("DROP INDEX user_email_upper_idx")
+            rows.append(("no index (seq scan)", _time(max(args.lookups // 10, 10), args.users)))
+            transaction.set_rollback(True)
+    finally:
+        if not args.keep:
+            # Raw DELETE: the ORM would collect a million rows for cascades
+            # the bench users do not have.
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"DELETE FROM {User._meta.db_table} WHERE email LIKE %s", [PREFIX + "%"]
+                )
+
+    print(f"{'lookup':<22}{'p50 (ms)':>10}{'p95 (ms)':>10}{'max (ms)':>10}")
+    for name, latencies in rows:
+        p95 = latencies[int(len(latencies) * 0.95) - 1]
+        print(
+            f"{name:<22}{statistics.median(latencies) * 1e3:>10.2f}"
+            f"{p95 * 1e3:>10.2f}{latencies[-1] * 1e3:>10.2f}"
+        )
+    print("plan with index:")
+    print("  " + plan.replace("\n", "\n  "))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+"""Micro-benchmark for first-party JWT signing and verification.
+
+Compares the per-call latency of re-reading and re-parsing the PEM files on
+every call (the old behaviour) against the process-wide key cache, then the
+sign/verify throughput of each supported algorithm (RS256, ES256, EdDSA).
+
+    python scripts/bench_jwt.py [--iterations 2000]
+
+Uses an ephemeral RSA-2048 keypair in a temp dir; needs no database.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+
+def _configure(key_dir: Path) -> None:
+    import django
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    from django.conf import settings
+
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    priv, pub = key_dir / "jwt_private.pem", key_dir / "jwt_public.pem"
+    priv.write_bytes(
+        key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+    )
+    pub.write_bytes(
+        key.public_key().public_bytes(
+            serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+        )
+    )
+    settings.configure(
+        JWT_ISSUER="bench",
+        JWT_AUDIENCE="bench",
+        JWT_ACCESS_TTL_SECONDS=600,
+        JWT_PRIVATE_KEY_PATH=str(priv),
+        JWT_PUBLIC_KEY_PATH=str(pub),
+        JWT_KEY_RELOAD_CHECK_SECONDS=5,
+        JWT_KEYRING_DIR="",
+    )
+    django.setup()
+
+
+def _per_call_us(fn, iterations: int) -> float:
+    fn()  # warm-up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def _algorithm_keyring(root: Path, alg: str) -> Path:
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+
+    from authsvc.apps.common import keyring
+
+    if alg == "ES256":
+        key = ec.generate_private_key(ec.SECP256R1())
+    elif alg == "EdDSA":
+        key = ed25519.Ed25519PrivateKey.generate()
+    else:
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    keyring_dir = root / alg
+    keyring_dir.mkdir()
+    kid = keyring.jwk_thumbprint_kid(key.public_key())
+    (keyring_dir / f"{kid}.pem").write_bytes(
+        key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+    )
+    keyring.write_manifest(keyring_dir, {"keys": [{"kid": kid, "state": "active", "alg": alg}]})
+    return keyring_dir
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        _configure(Path(tmp))
+        from authsvc.apps.common import keyring, security
+
+        token = security.make_access_jwt("bench-user", "bench@example.com")
+
+        def sign():
+            security.make_access_jwt("bench-user", "bench@example.com")
+
+        def verify():
+            security.jwt_verify_rs256(token)
+
+        def uncached(fn):
+            def run():
+                keyring._key_cache.clear()
+                fn()
+
+            return run
+
+        rows = [
+            ("sign", _per_call_us(uncached(sign), args.iterations), _per_call_us(sign, args.iterations)),
+            ("verify", _per_call_us(uncached(verify), args.iterations), _per_call_us(verify, args.iterations)),
+        ]
+
+        from django.conf import settings
+
+        throughput = []
+        for alg in ("RS256", "ES256", "EdDSA"):
+            settings.JWT_KEYRING_DIR = str(_algorithm_keyring(Path(tmp), alg))
+            token = security.make_access_jwt("bench-user", "bench@example.com")
+            throughput.append(
+                (alg, 1e6 / _per_call_us(sign, args.iterations), 1e6 / _per_call_us(verify, args.iterations))
+            )
+
+    print(f"{'op':<8}{'reload each call (us)':>24}{'cached key (us)':>18}{'speedup':>10}")
+    for op, before, after in rows:
+        print(f"{op:<8}{before:>24.1f}{after:>18.1f}{before / after:>9.1f}x")
+    print()
+    print(f"{'alg':<8}{'sign ops/s':>14}{'verify ops/s':>14}")
+    for alg, sign_rate, verify_rate in throughput:
+        print(f"{alg:<8}{sign_rate:>14,.0f}{verify_rate:>14,.0f}")
+    print(f"({args.iterations} iterations, single thread, pid {os.getpid()})")
+
+
+if __name__ == "__main__":
+    main()
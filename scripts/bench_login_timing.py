@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+"""Login latency per outcome: unknown account vs wrong password vs success.
+
+Every outcome should cost one password hash, so their latency distributions
+should overlap (no account enumeration by timing) and the throughput of a
+password spray against unknown addresses should equal that against real
+accounts. Runs ``POST /api/v1/auth/login`` through the Django test client
+with the configured hasher profile and hashing pool; rate limiting is turned
+off for the run.
+
+    DJANGO_SETTINGS_MODULE=authsvc.config.settings.dev \\
+        python scripts/bench_login_timing.py [--attempts 200]
+
+Needs a migrated database (``DB_*`` env vars); creates and removes its own
+bench user.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "authsvc.config.settings.dev")
+
+BENCH_EMAIL = "bench-login@example.com"
+PASSWORD = "bench password that is long enough"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--attempts", type=int, default=200)
+    args = parser.parse_args()
+
+    import django
+
+    django.setup()
+    from django.conf import settings
+    from django.test import Client
+
+    from authsvc.apps.accounts.models import User
+    from authsvc.apps.common import hashing
+
+    settings.RATELIMIT_ENABLE = False
+    settings.LOGIN_THROTTLE_ENABLED = False
+    User.objects.filter(email=BENCH_EMAIL).delete()
+    User.objects.create_user(
+        email=BENCH_EMAIL, password=PASSWORD, is_active=True, is_email_verified=True
+    )
+    client = Client()
+    outcomes = {
+        "unknown account": ("nobody-" + BENCH_EMAIL, PASSWORD, 401),
+        "wrong password": (BENCH_EMAIL, "not the password at all", 401),
+        "success": (BENCH_EMAIL, PASSWORD, 200),
+    }
+    rows = []
+    try:
+        for name, (email, password, expected) in outcomes.items():
+            body = {"email": email, "password": password}
+            response = client.post("/api/v1/auth/login", data=body, content_type="application/json")
+            if response.status_code != expected:
+                sys.exit(f"{name}: expected {expected}, got {response.status_code} {response.content!r}")
+            hashes = hashing.HASH_SECONDS.count(endpoint="login")
+            latencies = []
+            for _ in range(args.attempts):
+                start = time.perf_counter()
+                client.post("/api/v1/auth/login", data=body, content_type="application/json")
+                latencies.append(time.perf_counter() - start)
+            hashes = hashing.HASH_SECONDS.count(endpoint="login") - hashes
+            rows.append((name, sorted(latencies), hashes / args.attempts))
+    finally:
+        User.objects.filter(email=BENCH_EMAIL).delete()
+
+    print(f"{'outcome':<18}{'p50 (ms)':>10}{'p95 (ms)':>10}{'attempts/s':>12}{'hashes/attempt':>16}")
+    for name, latencies, per_attempt in rows:
+        p95 = latencies[int(len(latencies) * 0.95) - 1]
+        print(
+            f"{name:<18}{statistics.median(latencies) * 1e3:>10.2f}{p95 * 1e3:>10.2f}"
+            f"{len(latencies) / sum(latencies):>12.1f}{per_attempt:>16.2f}"
+        )
+    print(f"(hasher {settings.PASSWORD_HASHERS[0].rsplit('.', 1)[-1]}, {args.attempts} attempts each)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+"""Logins per second per core for each password-hasher profile.
+
+A login costs one hash verification, so a profile's per-core login ceiling is
+1 / verify latency. Each profile is timed in one process (one core), then in
+one process per core to show how it scales once memory bandwidth is shared:
+
+    python scripts/bench_password_hashers.py [--seconds 3] [--processes N]
+
+Profiles: Django's PBKDF2 default, argon2id at the RFC 9106 / OWASP floor,
+this service's configured argon2id (``ARGON2_*`` env, as in settings) and
+Django's stock Argon2 (8 lanes). Needs no database.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+PASSWORD = "correct horse battery staple"
+
+
+def _profiles() -> dict:
+    from django.contrib.auth.hashers import Argon2PasswordHasher, PBKDF2PasswordHasher
+
+    def argon2(time_cost, memory_kib, parallelism):
+        return type(
+            "Profile",
+            (Argon2PasswordHasher,),
+            {"time_cost": time_cost, "memory_cost": memory_kib, "parallelism": parallelism},
+        )()
+
+    return {
+        "pbkdf2_sha256 (django)": PBKDF2PasswordHasher(),
+        "argon2id floor 19MiB t2": argon2(2, 19 * 1024, 1),
+        "argon2id configured": argon2(
+            int(os.getenv("ARGON2_TIME_COST", "2")),
+            int(os.getenv("ARGON2_MEMORY_COST_KIB", "19456")),
+            int(os.getenv("ARGON2_PARALLELISM", "1")),
+        ),
+        "argon2id django p8": Argon2PasswordHasher(),
+    }
+
+
+def _setup() -> None:
+    import django
+    from django.conf import settings
+
+    if not settings.configured:
+        settings.configure()
+        django.setup()
+
+
+def _logins(name: str, seconds: float) -> int:
+    """Verifications completed by this process in ``seconds``."""
+    _setup()
+    hasher = _profiles()[name]
+    encoded = hasher.encode(PASSWORD, hasher.salt())
+    count = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        hasher.verify(PASSWORD, encoded)
+        count += 1
+    return count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+    _setup()
+
+    print(f"{'profile':<26}{'ms/login':>10}{'logins/s/core':>15}{f'{args.processes} procs/core':>16}")
+    with ProcessPoolExecutor(max_workers=args.processes) as pool:
+        for name in _profiles():
+            single = _logins(name, args.seconds) / args.seconds
+            total = sum(pool.map(_logins, [name] * args.processes, [args.seconds] * args.processes))
+            print(
+                f"{name:<26}{1e3 / single:>10.1f}{single:>15.1f}"
+                f"{total / args.seconds / args.processes:>16.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
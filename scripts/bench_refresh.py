@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+"""Concurrency benchmark for refresh-token rotation on PostgreSQL.
+
+Each worker thread owns one session and rotates its refresh token in a loop,
+so the run measures per-rotation cost under concurrent load (connection
+round-trips, row locks, index maintenance). The locking path (SELECT FOR
+UPDATE + saves + lazy loads) and the single-statement claim path
+(UPDATE ... RETURNING) are measured back to back; a final contended round has
+every worker present the *same* token. With ``REFRESH_REUSE_GRACE_SECONDS`` > 0
+all of them should receive one identical successor; with 0, exactly one wins.
+
+    DJANGO_SETTINGS_MODULE=authsvc.config.settings.dev \\
+        python scripts/bench_refresh.py [--threads 16] [--seconds 10]
+
+Needs a migrated PostgreSQL database (``DB_*`` env vars); creates and removes
+its own bench user.
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "authsvc.config.settings.dev")
+
+BENCH_EMAIL = "bench-refresh@example.invalid"
+
+
+def _run(threads: int, seconds: float, user) -> tuple[int, list[float]]:
+    from django.db import connection
+
+    from authsvc.apps.tokens.services import issue_token_pair, rotate_refresh_token
+
+    latencies: list[float] = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(threads)
+
+    def worker():
+        mine = []
+        try:
+            _, raw = issue_token_pair(user, request=None)
+            barrier.wait()
+            deadline = time.perf_counter() + seconds
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                _, _, raw = rotate_refresh_token(raw, request=None)
+                mine.append(time.perf_counter() - start)
+        finally:
+            connection.close()
+        with lock:
+            latencies.extend(mine)
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return len(latencies), latencies
+
+
+def _contended(threads: int, user) -> tuple[list[str], set[str]]:
+    from django.db import connection
+
+    from authsvc.apps.tokens.services import issue_token_pair, rotate_refresh_token
+
+    _, raw = issue_token_pair(user, request=None)
+    results = []
+    successors = set()
+    barrier = threading.Barrier(threads)
+
+    def worker():
+        barrier.wait()
+        try:
+            _, _, successor = rotate_refresh_token(raw, request=None)
+            results.append("ok")
+            successors.add(successor)
+        except ValueError:
+            results.append("rejected")
+        finally:
+            connection.close()
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return results, successors
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    args = parser.parse_args()
+
+    import django
+
+    django.setup()
+    from django.conf import settings
+    from django.db import connection
+
+    from authsvc.apps.accounts.models import User
+    from authsvc.apps.tokens import stores
+
+    if connection.vendor != "postgresql":
+        sys.exit(f"bench_refresh needs PostgreSQL (got {connection.vendor})")
+
+    User.objects.filter(email=BENCH_EMAIL).delete()
+    user = User.objects.create_user(email=BENCH_EMAIL, password=None, is_active=True)
+    claim = stores._claim_refresh_token
+    rows = []
+    try:
+        stores._claim_refresh_token = lambda token_hash, now: None
+        rows.append(("select for update", *_run(args.threads, args.seconds, user)))
+        stores._claim_refresh_token = claim
+        rows.append(("update returning", *_run(args.threads, args.seconds, user)))
+        contended, successors = _contended(args.threads, user)
+    finally:
+        stores._claim_refresh_token = claim
+        User.objects.filter(email=BENCH_EMAIL).delete()
+
+    print(f"{'path':<20}{'rotations/s':>14}{'p50 (ms)':>10}{'p99 (ms)':>10}")
+    for name, count, latencies in rows:
+        latencies.sort()
+        p99 = latencies[int(len(latencies) * 0.99) - 1] if latencies else 0.0
+        print(
+            f"{name:<20}{count / args.seconds:>14,.0f}"
+            f"{statistics.median(latencies) * 1e3:>10.2f}{p99 * 1e3:>10.2f}"
+        )
+    grace = getattr(settings, "REFRESH_REUSE_GRACE_SECONDS", 0)
+    expected = f"all ok, 1 successor (grace {grace}s)" if grace > 0 else "1 ok (no grace)"
+    print(
+        f"contended: {contended.count('ok')} ok / {contended.count('rejected')} rejected, "
+        f"{len(successors)} distinct successor(s) (expected {expected})"
+    )
+    print(f"({args.threads} threads, {args.seconds:g}s per path)")
+
+
+if __name__ == "__main__":
+    main()
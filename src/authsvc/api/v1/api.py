@@ -1,22 +1,53 @@
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
 from ninja import NinjaAPI
 
+from authsvc.api.v1.routers.audit import router as audit_router
 from authsvc.api.v1.routers.auth import router as auth_router
 from authsvc.api.v1.routers.health import router as health_router
 from authsvc.api.v1.routers.mfa import router as mfa_router
 from authsvc.api.v1.routers.webhooks import router as webhooks_router
-from authsvc.apps.common.security import get_jwks
+from authsvc.apps.common.hashing import HashingUnavailable
+from authsvc.apps.common.security import get_jwks_document
 
 api_v1 = NinjaAPI(title="Auth Service API", version="1.0.0")
 api_v1.add_router("/auth", auth_router)
 api_v1.add_router("/auth/mfa", mfa_router)
+api_v1.add_router("/audit", audit_router)
 api_v1.add_router("/health", health_router)
 api_v1.add_router("/webhooks", webhooks_router)
 
+
+@api_v1.exception_handler(HashingUnavailable)
+def hashing_unavailable(request, exc):
+    """Password work is saturated: shed load fast instead of queueing."""
+    response = JsonResponse(
+        {"detail": "Service busy, please retry shortly."}, status=503
+    )
+    response["Retry-After"] = str(exc.retry_after)
+    return response
+
+
 @api_v1.get("/.well-known/jwks.json", response=dict, tags=["auth"])
 def well_known_jwks(request):
     """
     Returns the JSON Web Key Set (JWKS) containing the public keys
     used to sign the JWTs. Downstream applications can use this to
     verify tokens statelessly.
+
+    The body is pre-serialized once per key change and served with a strong
+    ETag and ``Cache-Control`` so gateways can cache it and revalidate with
+    ``If-None-Match`` (answered with an empty 304).
     """
-    return get_jwks()
+    body, etag = get_jwks_document()
+    tags = [tag.strip().removeprefix("W/") for tag in request.headers.get("If-None-Match", "").split(",")]
+    if etag in tags or "*" in tags:
+        response = HttpResponse(status=304)
+    else:
+        response = HttpResponse(body, content_type="application/json")
+    response["ETag"] = etag
+    response["Cache-Control"] = (
+        f"public, max-age={settings.JWKS_CACHE_MAX_AGE_SECONDS}, "
+        f"stale-while-revalidate={settings.JWKS_STALE_WHILE_REVALIDATE_SECONDS}"
+    )
+    return response
@@ -1,15 +1,163 @@
-from ninja.security import HttpBearer
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
 
-from authsvc.apps.common.security import jwt_verify_rs256
+from django.conf import settings
+from django.contrib.auth.hashers import check_password
+from django.utils.crypto import constant_time_compare
+from ninja.security import HttpBasicAuth, HttpBearer
+
+from authsvc.apps.common.hashing import _dummy_hash
+from authsvc.apps.common.keyring import get_keyring
+from authsvc.apps.common.security import b64url_decode, jwt_verify
+from authsvc.apps.tokens.revocation import revoked_sessions
+
+
+class VerifiedTokenCache:
+    """Bounded per-process LRU of already-verified bearer tokens.
+
+    The same access token is presented many times during its lifetime, so the
+    decoded payload is kept (keyed by the token's SHA-256) until the token's
+    ``exp``. When the keyring changes, entries signed by keys that are no longer
+    accepted (retired) are dropped. ``AUTH_TOKEN_CACHE_SIZE=0`` disables it.
+    """
+
+    def __init__(self):
+        self._entries: OrderedDict[bytes, tuple[dict, int, str | None]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._keyring = None
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def _sync_keyring(self) -> None:
+        keyring = get_keyring()
+        if keyring is self._keyring:
+            return
+        with self._lock:
+            self._keyring = keyring
+            for key in [
+                k for k, (_, _, kid) in self._entries.items()
+                if keyring.verification_key(kid) is None
+            ]:
+                del self._entries[key]
+
+    def get(self, token: str) -> dict | None:
+        self._sync_keyring()
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            payload, exp, _ = entry
+            if exp <= time.time():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return dict(payload)
+
+    def put(self, token: str, payload: dict, kid: str | None) -> None:
+        maxsize = getattr(settings, "AUTH_TOKEN_CACHE_SIZE", 10000)
+        if maxsize <= 0:
+            return
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (dict(payload), int(payload.get("exp", 0)), kid)
+            self._entries.move_to_end(key)
+            while len(self._entries) > maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> dict:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+verified_tokens = VerifiedTokenCache()
+
+
+def _token_kid(token: str) -> str | None:
+    try:
+        return json.loads(b64url_decode(token.split(".", 1)[0])).get("kid")
+    except ValueError:
+        return None
 
 
 class AuthBearer(HttpBearer):
     def authenticate(self, request, token):
-        try:
-            payload = jwt_verify_rs256(token)
-        except Exception:
+        payload = verified_tokens.get(token)
+        if payload is None:
+            try:
+                payload = jwt_verify(token)
+            except Exception:
+                return None
+            verified_tokens.put(token, payload, _token_kid(token))
+        # Revoked sessions are mirrored in memory, so this is a dict lookup.
+        if revoked_sessions.is_revoked(payload.get("sid")):
             return None
         request.jwt = payload
         return payload
 
+
 auth = AuthBearer()
+
+
+class ResourceServerAuth(HttpBasicAuth):
+    """HTTP Basic client authentication for token introspection (RFC 7662 §2.1).
+
+    Resource servers authenticate as a confidential OAuth application, with
+    its ``client_id`` and secret. Secrets are stored hashed, so a verified
+    pair is remembered for ``INTROSPECTION_CLIENT_CACHE_SECONDS`` rather than
+    hashed on every call; a disabled or deleted application stops working
+    once its entry expires. An unknown ``client_id`` is checked against a
+    dummy hash, so response time does not reveal which clients exist.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._verified: dict[bytes, tuple[float, object]] = {}
+        self._lock = threading.Lock()
+
+    def authenticate(self, request, username, password):
+        from oauth2_provider.models import get_application_model
+
+        key = hashlib.sha256(f"{username}\0{password}".encode("utf-8")).digest()
+        now = time.monotonic()
+        entry = self._verified.get(key)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+
+        Application = get_application_model()
+        application = Application.objects.filter(
+            client_id=username, client_type=Application.CLIENT_CONFIDENTIAL
+        ).first()
+        if application is None:
+            check_password(password, _dummy_hash())
+            return None
+        if getattr(application, "hash_client_secret", True):
+            valid = check_password(password, application.client_secret)
+        else:
+            valid = constant_time_compare(password, application.client_secret)
+        if not valid:
+            return None
+        ttl = getattr(settings, "INTROSPECTION_CLIENT_CACHE_SECONDS", 60)
+        with self._lock:
+            # Few resource servers call introspection; expired pairs go first.
+            self._verified = {k: v for k, v in self._verified.items() if v[0] > now}
+            if ttl > 0:
+                self._verified[key] = (now + ttl, application)
+        return application
+
+
+resource_server_auth = ResourceServerAuth()
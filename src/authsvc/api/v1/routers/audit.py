@@ -0,0 +1,62 @@
+"""Read-only audit log API for staff."""
+from datetime import datetime
+
+from django.conf import settings
+from ninja import Router
+from ninja.errors import HttpError
+
+from authsvc.api.v1.auth import auth
+from authsvc.api.v1.schemas import AuditEventPageOut
+from authsvc.apps.accounts.models import User
+from authsvc.apps.audit.services import event_page
+from authsvc.infrastructure.database import read_from_replicas
+
+router = Router(tags=["audit"])
+
+
+def _require_staff(request) -> None:
+    # Checked on the primary, before any replica read: a revoked staff flag
+    # must take effect immediately.
+    if not User.objects.filter(uuid=request.jwt["sub"], is_active=True, is_staff=True).exists():
+        raise HttpError(403, "Staff only.")
+
+
+@router.get("/events", response=AuditEventPageOut, auth=auth)
+def events(
+    request,
+    event_type: str | None = None,
+    result: str | None = None,
+    actor_id: str | None = None,
+    target_type: str | None = None,
+    target_id: str | None = None,
+    request_id: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    cursor: str | None = None,
+    limit: int = 50,
+):
+    """Audit events, newest first, filtered by exact matches and a time range.
+
+    Pass ``next_cursor`` from the response as ``cursor`` to get the next
+    page. Cursors are opaque; the filters must stay the same between pages.
+    ``limit`` is capped at ``AUDIT_QUERY_MAX_LIMIT``. Reads may go to a
+    replica, and buffered events show up once they are flushed.
+    """
+    _require_staff(request)
+    try:
+        with read_from_replicas():
+            page, next_cursor = event_page(
+                event_type=event_type,
+                result=result,
+                actor_id=actor_id,
+                target_type=target_type,
+                target_id=target_id,
+                request_id=request_id,
+                since=since,
+                until=until,
+                cursor=cursor,
+                limit=max(1, min(limit, getattr(settings, "AUDIT_QUERY_MAX_LIMIT", 200))),
+            )
+    except ValueError as exc:
+        raise HttpError(400, str(exc)) from exc
+    return {"events": page, "next_cursor": next_cursor}
@@ -5,10 +5,13 @@ from django_ratelimit.decorators import ratelimit
 from ninja import Router, Status
 from ninja.errors import HttpError
 
-from authsvc.api.v1.auth import auth
+from authsvc.api.v1.auth import auth, resource_server_auth
 from authsvc.api.v1.schemas import (
     ChangePasswordIn,
     EmailIn,
+    IntrospectBatchOut,
+    IntrospectIn,
+    IntrospectionOut,
     LoginIn,
     LoginOut,
     LogoutIn,
@@ -24,20 +27,26 @@ from authsvc.api.v1.schemas import (
 from authsvc.apps.accounts.models import EmailOTP, RegistrationField, User
 from authsvc.apps.accounts.utils import generate_otp_code
 from authsvc.apps.audit.models import AuditEvent
-from authsvc.apps.audit.services import record_event
+from authsvc.apps.audit.services import arecord_event, record_event
+from authsvc.apps.common import hashing
+from authsvc.apps.common.offload import run_cpu
 from authsvc.apps.common.pwned import check_password_complexity
 from authsvc.apps.common.security import make_mfa_challenge
+from authsvc.apps.common.throttle import aratelimit
 from authsvc.apps.notifications import services as email_services
 from authsvc.apps.tokens.models import OneTimeToken
 from authsvc.apps.tokens.services import (
+    aintrospect_tokens,
+    aissue_token_pair,
+    arotate_refresh_token,
     consume_one_time_token,
     create_one_time_token,
     issue_token_pair,
     revoke_all_refresh_tokens,
     revoke_refresh_token,
-    rotate_refresh_token,
     send_reset_password_email,
 )
+from authsvc.infrastructure.database import replica_reads
 
 router = Router(tags=["auth"])
 
@@ -59,9 +68,21 @@ def _audit_failure(event_type, request, target, reason):
     )
 
 
+async def _aaudit_failure(event_type, request, target, reason):
+    await arecord_event(
+        event_type,
+        result=AuditEvent.Result.FAILURE,
+        request=request,
+        target=target,
+        metadata={"reason": reason},
+    )
+
+
 @router.get("/registration-fields", response=list[RegistrationFieldOut])
+@replica_reads
 def get_registration_fields(request):
-    return RegistrationField.objects.filter(is_active=True)
+    # Evaluated here, inside @replica_reads, not later by the serializer.
+    return list(RegistrationField.objects.filter(is_active=True))
 
 
 @router.post("/register", response={201: dict})
@@ -91,10 +112,11 @@ def register(request, data: RegisterIn):
         if value is not None:
              custom_data[field.name] = value
 
+    password_hash = hashing.hash_password(data.password, endpoint="register")
     with transaction.atomic():
         user = User.objects.create_user(
             email=data.email,
-            password=data.password,
+            password_hash=password_hash,
             first_name=data.first_name or "",
             last_name=data.last_name or "",
             is_active=False,  # Inactive until verified
@@ -209,20 +231,27 @@ def resend_verification(request, data: ResendVerificationIn):
     return {"message": "If the account exists, we sent a code."}
 
 
+# login, refresh, introspect and me are the hot routes: they are async, so
+# under ASGI they hold no thread while waiting on the database or Redis, and
+# only password hashing and token signing go to a thread (common.offload).
+
+
 @router.post("/login", response={200: LoginOut})
-@ratelimit(key="ip", rate="5/15m", block=True)
-def login(request, data: LoginIn):
-    user = User.objects.filter(email__iexact=data.email).first()
+async def login(request, data: LoginIn):
+    # Throttled attempts never get here (common.throttle.LoginThrottleMiddleware).
+    # Past this point every attempt costs exactly one hash: unknown accounts
+    # verify against a dummy hash, so response time does not reveal which exist.
+    user = await User.objects.filter(email__iexact=data.email).afirst()
 
-    if user and user.check_password(data.password):
+    if await hashing.averify_password(user, data.password, endpoint="login"):
         if not user.is_email_verified:
-            _audit_failure(
+            await _aaudit_failure(
                 AuditEvent.EventType.LOGIN_FAILURE, request, user, "email_unverified"
             )
             raise HttpError(401, "Email is not verified. Please verify your email address.")
 
         if not user.is_active:
-            _audit_failure(
+            await _aaudit_failure(
                 AuditEvent.EventType.LOGIN_FAILURE, request, user, "account_disabled"
             )
             raise HttpError(401, "Account is disabled.")
@@ -230,10 +259,11 @@ def login(request, data: LoginIn):
         # MFA users get a short-lived challenge instead of tokens; they must
         # complete POST /api/v1/auth/mfa/verify with a code to receive tokens.
         if user.mfa_enabled:
-            return {"mfa_required": True, "mfa_token": make_mfa_challenge(str(user.uuid))}
+            challenge = await run_cpu(make_mfa_challenge, str(user.uuid))
+            return {"mfa_required": True, "mfa_token": challenge}
 
-        access, refresh = issue_token_pair(user, request)
-        record_event(
+        access, refresh = await aissue_token_pair(user, request)
+        await arecord_event(
             AuditEvent.EventType.LOGIN_SUCCESS,
             actor=user,
             target=user,
@@ -241,7 +271,7 @@ def login(request, data: LoginIn):
         )
         return {"mfa_required": False, "access_token": access, "refresh_token": refresh}
 
-    _audit_failure(
+    await _aaudit_failure(
         AuditEvent.EventType.LOGIN_FAILURE,
         request,
         user or _account_target(data.email),
@@ -251,12 +281,12 @@ def login(request, data: LoginIn):
 
 
 @router.post("/refresh", response={200: TokenOut})
-@ratelimit(key="ip", rate="20/m", block=True)
-def refresh(request, data: RefreshIn):
+@aratelimit("20/m", group="refresh")
+async def refresh(request, data: RefreshIn):
     try:
-        user, access, new_refresh = rotate_refresh_token(data.refresh_token, request)
+        user, access, new_refresh = await arotate_refresh_token(data.refresh_token, request)
     except ValueError as e:
-        _audit_failure(
+        await _aaudit_failure(
             AuditEvent.EventType.REFRESH_FAILURE,
             request,
             ("refresh_token", "redacted"),
@@ -264,7 +294,7 @@ def refresh(request, data: RefreshIn):
         )
         raise HttpError(401, "Invalid refresh token") from e
 
-    record_event(
+    await arecord_event(
         AuditEvent.EventType.REFRESH_SUCCESS,
         actor=user,
         target=user,
@@ -273,6 +303,35 @@ def refresh(request, data: RefreshIn):
     return {"access_token": access, "refresh_token": new_refresh}
 
 
+@router.post(
+    "/introspect",
+    response={200: IntrospectionOut | IntrospectBatchOut},
+    auth=resource_server_auth,
+    exclude_none=True,
+)
+@aratelimit("300/m", group="introspect")
+async def introspect(request, data: IntrospectIn):
+    """Token introspection for resource servers (RFC 7662 shaped).
+
+    Callers authenticate with HTTP Basic as a confidential OAuth client
+    (``client_id:client_secret``); anonymous calls get 401.
+
+    Send ``{"token": ...}`` for a single RFC 7662 response, or
+    ``{"tokens": [...]}`` (up to ``INTROSPECTION_MAX_TOKENS``) to validate a
+    burst in one round trip; results come back in request order. Signatures
+    are checked locally and session liveness with a single query.
+    """
+    if (data.token is None) == (not data.tokens):
+        raise HttpError(400, "Provide either token or tokens")
+    if data.token is not None:
+        return (await aintrospect_tokens([data.token]))[0]
+
+    max_tokens = int(getattr(settings, "INTROSPECTION_MAX_TOKENS", 100))
+    if len(data.tokens) > max_tokens:
+        raise HttpError(400, f"At most {max_tokens} tokens per request")
+    return {"results": await aintrospect_tokens(data.tokens)}
+
+
 @router.post("/logout", response={200: dict})
 def logout(request, data: LogoutIn):
     refresh_token = revoke_refresh_token(data.refresh_token)
@@ -309,9 +368,10 @@ def logout_all(request):
 
 
 @router.get("/me", response=MeOut, auth=auth)
-def me(request):
+@replica_reads
+async def me(request):
     user_uuid = request.jwt["sub"]
-    user = User.objects.get(uuid=user_uuid)
+    user = await User.objects.aget(uuid=user_uuid)
     return {
         "id": user.id,
         "email": user.email,
@@ -326,7 +386,7 @@ def me(request):
 def change_password(request, data: ChangePasswordIn):
     user_uuid = request.jwt["sub"]
     user = User.objects.get(uuid=user_uuid)
-    if not user.check_password(data.current_password):
+    if not hashing.verify_password(user, data.current_password, endpoint="password_change"):
         _audit_failure(
             AuditEvent.EventType.PASSWORD_CHANGE,
             request,
@@ -337,7 +397,7 @@ def change_password(request, data: ChangePasswordIn):
 
     check_password_complexity(data.new_password)
 
-    user.set_password(data.new_password)
+    user.password = hashing.hash_password(data.new_password, endpoint="password_change")
     user.save(update_fields=["password", "updated_at"])
     revoke_all_refresh_tokens(user)
     email_services.send_password_changed_email(user)
@@ -377,7 +437,7 @@ def reset_password(request, data: ResetPasswordIn):
 
     check_password_complexity(data.new_password)
 
-    user.set_password(data.new_password)
+    user.password = hashing.hash_password(data.new_password, endpoint="password_reset")
     user.save(update_fields=["password", "updated_at"])
     revoke_all_refresh_tokens(user)
     email_services.send_password_changed_email(user)
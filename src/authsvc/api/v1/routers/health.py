@@ -1,5 +1,5 @@
 from django.db import connection
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
 from ninja import Router
 
 router = Router()
@@ -48,3 +48,12 @@ def ready(request):
     if not ok:
         return JsonResponse(body, status=503)
     return body
+
+
+@router.get("/metrics")
+def metrics(request):
+    """Process metrics (hashing pool, DB connection pool, ...) in the Prometheus text format."""
+    from authsvc.apps.common import hashing  # noqa: F401  (registers its metrics)
+    from authsvc.apps.common.metrics import render
+
+    return HttpResponse(render(), content_type="text/plain; version=0.0.4")
@@ -1,3 +1,4 @@
+from asgiref.sync import sync_to_async
 from django_ratelimit.decorators import ratelimit
 from ninja import Router
 from ninja.errors import HttpError
@@ -14,11 +15,14 @@ from authsvc.api.v1.schemas import (
 )
 from authsvc.apps.accounts.models import User
 from authsvc.apps.audit.models import AuditEvent
-from authsvc.apps.audit.services import record_event
+from authsvc.apps.audit.services import arecord_event, record_event
+from authsvc.apps.common import hashing
 from authsvc.apps.common.security import verify_mfa_challenge
+from authsvc.apps.common.throttle import aratelimit
 from authsvc.apps.mfa import services as mfa_services
 from authsvc.apps.notifications import services as email_services
-from authsvc.apps.tokens.services import issue_token_pair
+from authsvc.apps.tokens.services import aissue_token_pair
+from authsvc.infrastructure.database import replica_reads
 
 router = Router(tags=["mfa"])
 
@@ -28,6 +32,7 @@ def _current_user(request) -> User:
 
 
 @router.get("/status", response=MfaStatusOut, auth=auth)
+@replica_reads
 def status(request):
     user = _current_user(request)
     return {
@@ -81,7 +86,7 @@ def disable(request, data: MfaReauthIn):
     user = _current_user(request)
     if not user.mfa_enabled:
         raise HttpError(400, "MFA is not enabled")
-    if not user.check_password(data.password):
+    if not hashing.verify_password(user, data.password, endpoint="mfa"):
         raise HttpError(400, "Password incorrect")
     if mfa_services.verify_factor(user, data.code) is None:
         raise HttpError(400, "Invalid code")
@@ -103,7 +108,7 @@ def regenerate_recovery_codes(request, data: MfaReauthIn):
     user = _current_user(request)
     if not user.mfa_enabled:
         raise HttpError(400, "MFA is not enabled")
-    if not user.check_password(data.password):
+    if not hashing.verify_password(user, data.password, endpoint="mfa"):
         raise HttpError(400, "Password incorrect")
     if mfa_services.verify_factor(user, data.code) is None:
         raise HttpError(400, "Invalid code")
@@ -112,32 +117,33 @@ def regenerate_recovery_codes(request, data: MfaReauthIn):
 
 
 @router.post("/verify", response=TokenOut)
-@ratelimit(key="ip", rate="10/m", block=True)
-def verify(request, data: MfaVerifyIn):
+@aratelimit("10/m", group="mfa_verify")
+async def verify(request, data: MfaVerifyIn):
     """Second login step: exchange a valid MFA challenge + code for tokens."""
     payload = verify_mfa_challenge(data.mfa_token)
     if payload is None:
         raise HttpError(401, "Invalid or expired MFA session")
 
     try:
-        user = User.objects.get(uuid=payload["sub"])
+        user = await User.objects.aget(uuid=payload["sub"])
     except User.DoesNotExist:
         raise HttpError(401, "Invalid MFA session")
 
-    factor = mfa_services.verify_factor(user, data.code)
+    # Recovery codes are consumed under a row lock, which needs a transaction.
+    factor = await sync_to_async(mfa_services.verify_factor)(user, data.code)
     if factor is None:
         raise HttpError(401, "Invalid code")
     if factor == "recovery":
-        email_services.send_mfa_recovery_used_email(user)
-        record_event(
+        await sync_to_async(email_services.send_mfa_recovery_used_email)(user)
+        await arecord_event(
             AuditEvent.EventType.RECOVERY_CODE_USAGE,
             actor=user,
             target=user,
             request=request,
         )
 
-    access, refresh = issue_token_pair(user, request)
-    record_event(
+    access, refresh = await aissue_token_pair(user, request)
+    await arecord_event(
         AuditEvent.EventType.LOGIN_SUCCESS,
         actor=user,
         target=user,
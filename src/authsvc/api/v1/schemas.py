@@ -1,3 +1,6 @@
+from datetime import datetime
+from uuid import UUID
+
 from ninja import Schema
 from pydantic import EmailStr
 
@@ -44,6 +47,27 @@ class RefreshIn(Schema):
 class LogoutIn(Schema):
     refresh_token: str
 
+class IntrospectIn(Schema):
+    # RFC 7662 single-token form, or a batch via `tokens` (not both).
+    token: str | None = None
+    tokens: list[str] = []
+
+class IntrospectionOut(Schema):
+    active: bool
+    token_type: str | None = None
+    sub: str | None = None
+    email: str | None = None
+    roles: list[str] | None = None
+    sid: str | None = None
+    iss: str | None = None
+    aud: str | None = None
+    iat: int | None = None
+    exp: int | None = None
+    jti: str | None = None
+
+class IntrospectBatchOut(Schema):
+    results: list[IntrospectionOut]
+
 class MeOut(Schema):
     id: int
     email: EmailStr
@@ -85,3 +109,21 @@ class MfaReauthIn(Schema):
 class MfaVerifyIn(Schema):
     mfa_token: str
     code: str
+
+# --- Audit -------------------------------------------------------------------
+class AuditEventOut(Schema):
+    id: UUID
+    occurred_at: datetime
+    event_type: str
+    result: str
+    actor_type: str
+    actor_id: str
+    target_type: str
+    target_id: str
+    request_id: str
+    ip_address: str | None = None
+    metadata: dict
+
+class AuditEventPageOut(Schema):
+    events: list[AuditEventOut]
+    next_cursor: str | None = None
@@ -0,0 +1,25 @@
+"""Password hasher profile.
+
+``Argon2idPasswordHasher`` is Django's Argon2 hasher (argon2id) with its cost
+taken from settings instead of class constants, so a calibrated profile
+(``manage.py calibrate_password_hasher``) is deployed through the
+environment. Raising any parameter makes ``must_update`` true for older
+hashes, which are then re-hashed transparently at the next successful login
+(see ``authsvc.apps.common.hashing``); current hashes are never rewritten.
+"""
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher
+
+
+class Argon2idPasswordHasher(Argon2PasswordHasher):
+    @property
+    def time_cost(self) -> int:
+        return settings.ARGON2_TIME_COST
+
+    @property
+    def memory_cost(self) -> int:
+        return settings.ARGON2_MEMORY_COST_KIB
+
+    @property
+    def parallelism(self) -> int:
+        return settings.ARGON2_PARALLELISM
@@ -0,0 +1,85 @@
+"""Pick Argon2id parameters that hit a target hash latency on this machine.
+
+    manage.py calibrate_password_hasher [--target-ms 250] [--max-memory-mib 64]
+                                        [--parallelism 1] [--samples 5]
+
+Memory is fixed first (the largest power-of-two MiB up to ``--max-memory-mib``
+that fits the target at one pass), then passes are added while the median
+latency stays within the target. Run it on the production instance type
+(one hash per core: keep parallelism at 1) and copy the printed ``ARGON2_*``
+values into the environment; existing hashes upgrade at their next login.
+"""
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+# RFC 9106 / OWASP floor for argon2id: 19 MiB with two passes.
+MIN_MEMORY_KIB = 19 * 1024
+
+
+def _size(kib: int) -> str:
+    return f"{kib // 1024}MiB" if kib >= 1024 else f"{kib}KiB"
+
+
+def _measure(time_cost: int, memory_kib: int, parallelism: int, samples: int) -> float:
+    """Median seconds per hash for one parameter set."""
+    from argon2 import PasswordHasher
+
+    hasher = PasswordHasher(time_cost=time_cost, memory_cost=memory_kib, parallelism=parallelism)
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        hasher.hash("calibration password")
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+class Command(BaseCommand):
+    help = "Calibrate ARGON2_TIME_COST / ARGON2_MEMORY_COST_KIB to a target latency."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--target-ms", type=float, default=250.0, help="Latency per hash.")
+        parser.add_argument("--max-memory-mib", type=int, default=64, help="Memory ceiling per hash.")
+        parser.add_argument("--parallelism", type=int, default=1, help="Lanes per hash (default 1).")
+        parser.add_argument("--samples", type=int, default=5, help="Hashes timed per candidate.")
+        parser.add_argument("--max-time-cost", type=int, default=20)
+
+    def handle(self, *args, **options):
+        target = options["target_ms"] / 1000
+        parallelism = options["parallelism"]
+        samples = options["samples"]
+        if target <= 0 or options["max_memory_mib"] < 1 or parallelism < 1:
+            raise CommandError("--target-ms, --max-memory-mib and --parallelism must be positive.")
+
+        memory = 1024 * 2 ** (options["max_memory_mib"].bit_length() - 1)
+        latency = _measure(1, memory, parallelism, samples)
+        self.stdout.write(f"t=1 m={_size(memory)}: {latency * 1e3:.1f}ms")
+        while latency > target and memory > 8 * parallelism * 2:
+            memory //= 2
+            latency = _measure(1, memory, parallelism, samples)
+            self.stdout.write(f"t=1 m={_size(memory)}: {latency * 1e3:.1f}ms")
+
+        time_cost = 1
+        while time_cost < options["max_time_cost"]:
+            candidate = _measure(time_cost + 1, memory, parallelism, samples)
+            self.stdout.write(f"t={time_cost + 1} m={_size(memory)}: {candidate * 1e3:.1f}ms")
+            if candidate > target:
+                break
+            time_cost, latency = time_cost + 1, candidate
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"\n{latency * 1e3:.1f}ms per hash, ~{1 / latency:,.1f} hashes/s per core. Set:"
+            )
+        )
+        self.stdout.write(f"ARGON2_TIME_COST={time_cost}")
+        self.stdout.write(f"ARGON2_MEMORY_COST_KIB={memory}")
+        self.stdout.write(f"ARGON2_PARALLELISM={parallelism}")
+        if memory < MIN_MEMORY_KIB or (memory == MIN_MEMORY_KIB and time_cost < 2):
+            self.stdout.write(
+                self.style.WARNING(
+                    "Below the recommended argon2id floor (19 MiB, 2 passes); "
+                    "raise --target-ms or use faster hardware."
+                )
+            )
@@ -0,0 +1,23 @@
+from django.db import migrations, models
+
+from authsvc.infrastructure.operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('accounts', '0005_user_mfa_enabled'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='emailotp',
+            index=models.Index(models.F('user'), models.OrderBy(models.F('created_at'), descending=True), name='emailotp_user_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='usersession',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['user'], name='usersession_user_active_idx'),
+        ),
+    ]
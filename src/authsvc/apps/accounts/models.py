@@ -2,16 +2,22 @@ import uuid
 
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 from django.db import models
+from django.db.models.functions import Upper
 from django.utils import timezone
 
 
 class UserManager(BaseUserManager):
-    def create_user(self, email: str, password: str | None = None, **extra):
+    def create_user(
+        self, email: str, password: str | None = None, *, password_hash: str | None = None, **extra
+    ):
+        """``password_hash`` stores an already-encoded hash (see common.hashing)."""
         if not email:
             raise ValueError("Email is required")
         email = self.normalize_email(email)
         user = self.model(email=email, **extra)
-        if password:
+        if password_hash:
+            user.password = password_hash
+        elif password:
             user.set_password(password)
         else:
             user.set_unusable_password()
@@ -45,6 +51,11 @@ class User(AbstractBaseUser, PermissionsMixin):
     # Dynamic fields storage
     custom_fields = models.JSONField(default=dict, blank=True)
 
+    class Meta:
+        # email__iexact compiles to UPPER(email) = UPPER(%s) on PostgreSQL,
+        # which the plain unique index on email cannot serve.
+        indexes = [models.Index(Upper("email"), name="user_email_upper_idx")]
+
     def __str__(self) -> str:
         return self.email
 
@@ -57,6 +68,11 @@ class UserSession(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     is_active = models.BooleanField(default=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["user"], condition=models.Q(is_active=True), name="usersession_user_active_idx"),
+        ]
+
     def __str__(self):
         return str(self.session_id)
 
@@ -94,6 +110,10 @@ class EmailOTP(models.Model):
     # Track attempts to prevent brute force
     attempts = models.IntegerField(default=0)
 
+    class Meta:
+        # Newest OTP per user (verify / resend) without a sort.
+        indexes = [models.Index("user", models.F("created_at").desc(), name="emailotp_user_created_idx")]
+
     def is_valid(self):
         return (
             not self.is_verified and 
@@ -9,6 +9,8 @@ class AuditEventAdmin(admin.ModelAdmin):
     list_filter = ("event_type", "result", "actor_type", "target_type")
     search_fields = ("actor_id", "target_id", "request_id")
     readonly_fields = tuple(field.name for field in AuditEvent._meta.fields)
+    # No COUNT(*) over the whole table on every changelist page.
+    show_full_result_count = False
 
     def has_add_permission(self, request):
         return False
@@ -0,0 +1,164 @@
+"""Cold archival of whole audit partitions: compressed JSONL + manifest, then DETACH.
+
+Audit events are never updated or deleted row by row. Once ``manage.py
+audit_partitions enable`` has partitioned ``audit_auditevent`` by month on
+``occurred_at``, a month whose newest event is older than
+``AUDIT_ARCHIVE_AFTER_DAYS`` leaves the live table as a unit:
+
+1. ``export_partition`` writes its rows, oldest first, to
+   ``<dir>/<partition>.jsonl.gz`` and ``<dir>/<partition>.manifest.json``.
+   The manifest records the bounds, the columns, the row count and the
+   SHA-256 of the compressed file. Both files are written under a temporary
+   name and then renamed, so a crash never leaves a partial file behind.
+2. ``verify_archive`` reads the file back and checks it against the manifest.
+3. The partition is detached (``DETACH PARTITION CONCURRENTLY``). The
+   detached table's row count must then match the manifest again.
+
+The detached table is kept. Dropping it is a separate opt-in (``archive
+--drop``) that runs only after both checks have passed, so no event is
+removed from a table the application still writes to.
+"""
+import gzip
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils import timezone
+
+from authsvc.infrastructure import partitioning
+from authsvc.infrastructure.partitioning import Partition
+
+from .models import AuditEvent
+
+
+@dataclass(frozen=True)
+class Archive:
+    table: str
+    partition: str
+    lower: str | None  # None = MINVALUE (the adopted legacy partition)
+    upper: str
+    columns: list[str]
+    rows: int
+    file: str
+    bytes: int
+    sha256: str
+    created_at: str
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()  # full microseconds, unlike DjangoJSONEncoder
+    return str(value)
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _write_atomically(path: Path, write) -> None:
+    part = path.with_name(path.name + ".part")
+    with open(part, "wb") as fh:
+        write(fh)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(part, path)
+
+
+def manifest_path(directory: Path, partition: str) -> Path:
+    return Path(directory) / f"{partition}.manifest.json"
+
+
+def export_partition(
+    partition: Partition, directory: Path, *, chunk_size: int = 2000, using: str = DEFAULT_DB_ALIAS
+) -> Archive:
+    """Write ``partition``'s events to compressed JSONL plus a manifest."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    columns = [f.attname for f in AuditEvent._meta.concrete_fields]
+    events = AuditEvent.objects.using(using).filter(occurred_at__lt=partition.upper)
+    if partition.lower is not None:
+        events = events.filter(occurred_at__gte=partition.lower)
+    events = events.order_by("occurred_at", "id").values_list(*columns)
+
+    data = directory / f"{partition.name}.jsonl.gz"
+    rows = 0
+
+    def write_rows(fh):
+        nonlocal rows
+        # mtime=0: the same rows always produce the same bytes (and checksum).
+        with gzip.GzipFile(fileobj=fh, mode="wb", mtime=0) as gz:
+            for row in events.iterator(chunk_size=chunk_size):
+                line = json.dumps(dict(zip(columns, row)), default=_json_default, separators=(",", ":"))
+                gz.write(line.encode() + b"\n")
+                rows += 1
+
+    _write_atomically(data, write_rows)
+    archive = Archive(
+        table=AuditEvent._meta.db_table,
+        partition=partition.name,
+        lower=None if partition.lower is None else partition.lower.isoformat(),
+        upper=partition.upper.isoformat(),
+        columns=columns,
+        rows=rows,
+        file=data.name,
+        bytes=data.stat().st_size,
+        sha256=_sha256(data),
+        created_at=timezone.now().isoformat(),
+    )
+    _write_atomically(
+        manifest_path(directory, partition.name),
+        lambda fh: fh.write(json.dumps(asdict(archive), indent=2).encode() + b"\n"),
+    )
+    return archive
+
+
+def verify_archive(path: Path) -> Archive:
+    """Check an archive file against its manifest; raise ``ValueError`` on any mismatch."""
+    path = Path(path)
+    archive = Archive(**json.loads(path.read_text()))
+    data = path.parent / archive.file
+    if not data.exists():
+        raise ValueError(f"{data} is missing.")
+    if _sha256(data) != archive.sha256:
+        raise ValueError(f"{data} does not match the manifest checksum.")
+    with gzip.open(data, "rb") as gz:
+        rows = sum(1 for _ in gz)
+    if rows != archive.rows:
+        raise ValueError(f"{data} holds {rows} events, the manifest says {archive.rows}.")
+    return archive
+
+
+def archive_partition(
+    partition: Partition,
+    directory: Path,
+    *,
+    drop: bool = False,
+    concurrently: bool = True,
+    using: str = DEFAULT_DB_ALIAS,
+) -> Archive:
+    """Export, verify and detach one partition (then drop it, if asked)."""
+    archive = export_partition(partition, directory, using=using)
+    verify_archive(manifest_path(directory, partition.name))
+    partitioning.detach_partition(
+        archive.table, partition.name, concurrently=concurrently, using=using
+    )
+    qn = connections[using].ops.quote_name
+    with connections[using].cursor() as cursor:
+        cursor.execute(f"SELECT count(*) FROM {qn(partition.name)}")
+        detached = cursor.fetchone()[0]
+        if detached != archive.rows:
+            raise ValueError(
+                f"{partition.name} holds {detached} events but {archive.rows} were archived; "
+                "the detached table is kept, export it again before dropping it."
+            )
+        if drop:
+            cursor.execute(f"DROP TABLE {qn(partition.name)}")
+    return archive
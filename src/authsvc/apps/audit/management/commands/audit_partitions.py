@@ -0,0 +1,141 @@
+"""Optional monthly partitioning and cold archival of audit_auditevent (PostgreSQL only).
+
+    manage.py audit_partitions status
+    manage.py audit_partitions enable [--months-ahead N]
+    manage.py audit_partitions maintain [--months-ahead N]
+    manage.py audit_partitions archive [--older-than-days N] [--dir PATH] [--drop] [--dry-run]
+    manage.py audit_partitions verify MANIFEST
+
+``enable`` converts the live table (existing events become one legacy
+partition; see ``authsvc.infrastructure.partitioning``). ``maintain`` only
+creates upcoming monthly partitions; Celery beat runs it daily once the
+table is partitioned. ``archive`` exports each partition whose events are all
+older than AUDIT_ARCHIVE_AFTER_DAYS to AUDIT_ARCHIVE_DIR and detaches it (see
+``authsvc.apps.audit.archive``). ``verify`` re-checks an archive against its
+manifest.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from authsvc.apps.audit import archive
+from authsvc.apps.audit.models import AuditEvent
+from authsvc.infrastructure import partitioning
+
+
+class Command(BaseCommand):
+    help = "Partition audit_auditevent by month, and archive and detach old partitions (PostgreSQL)."
+
+    def add_arguments(self, parser):
+        sub = parser.add_subparsers(dest="action", required=True)
+        sub.add_parser("status", help="List partitions and which ones are due for archival.")
+        for name, text in (
+            ("enable", "Convert the live table to a partitioned one."),
+            ("maintain", "Create upcoming partitions."),
+        ):
+            action = sub.add_parser(name, help=text)
+            action.add_argument(
+                "--months-ahead",
+                type=int,
+                default=settings.AUDIT_PARTITION_MONTHS_AHEAD,
+                help="Future monthly partitions to keep ready "
+                "(default: AUDIT_PARTITION_MONTHS_AHEAD).",
+            )
+        action = sub.add_parser("archive", help="Export, verify and detach old partitions.")
+        action.add_argument(
+            "--older-than-days",
+            type=float,
+            default=settings.AUDIT_ARCHIVE_AFTER_DAYS,
+            help="Archive partitions whose newest event is older than this "
+            "(default: AUDIT_ARCHIVE_AFTER_DAYS).",
+        )
+        action.add_argument(
+            "--dir", default=settings.AUDIT_ARCHIVE_DIR, help="Default: AUDIT_ARCHIVE_DIR."
+        )
+        action.add_argument(
+            "--drop", action="store_true", help="Drop each detached table once it is verified."
+        )
+        action.add_argument("--dry-run", action="store_true", help="Only list partitions.")
+        action = sub.add_parser("verify", help="Check an archive file against its manifest.")
+        action.add_argument("manifest")
+
+    def handle(self, *args, action, **options):
+        if action == "verify":
+            try:
+                result = archive.verify_archive(options["manifest"])
+            except (OSError, ValueError) as exc:
+                raise CommandError(str(exc)) from exc
+            self.stdout.write(f"ok {result.file}: {result.rows} events, sha256 {result.sha256}")
+            return
+        if connection.vendor != "postgresql":
+            raise CommandError("Partitioning requires PostgreSQL.")
+        self.table = AuditEvent._meta.db_table
+        partitioned = partitioning.is_partitioned(self.table)
+        if action == "enable":
+            if partitioned:
+                raise CommandError(f"{self.table} is already partitioned.")
+            return self._enable(options["months_ahead"])
+        if not partitioned:
+            raise CommandError(f"{self.table} is not partitioned; run 'enable' first.")
+        if action == "status":
+            return self._status()
+        if action == "maintain":
+            created = partitioning.create_monthly_partitions(
+                self.table, start=timezone.now(), months=options["months_ahead"] + 1
+            )
+            for name in created:
+                self.stdout.write(f"created {name}")
+            return
+        self._archive(
+            timedelta(days=options["older_than_days"]),
+            options["dir"],
+            drop=options["drop"],
+            dry_run=options["dry_run"],
+        )
+
+    def _enable(self, months_ahead: int):
+        now = timezone.now()
+        cutoff = partitioning.add_months(partitioning.month_floor(now), 1)
+        # The interim CHECK on the live table rejects events at/after the
+        # cutoff, so never cut over right before a month boundary.
+        if cutoff - now < timedelta(days=1):
+            cutoff = partitioning.add_months(cutoff, 1)
+        try:
+            partitioning.partition_existing_table(
+                AuditEvent, key="occurred_at", cutoff=cutoff, months_ahead=months_ahead
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc)) from exc
+        self.stdout.write(f"{self.table} partitioned; existing events cover up to {cutoff:%Y-%m-%d}")
+        self._status()
+
+    def _archive(self, keep: timedelta, directory: str, *, drop: bool, dry_run: bool):
+        due = partitioning.expired_partitions(
+            partitioning.list_partitions(self.table), keep=keep, now=timezone.now()
+        )
+        for partition in due:
+            if dry_run:
+                self.stdout.write(f"would archive {partition.name}")
+                continue
+            try:
+                result = archive.archive_partition(partition, directory, drop=drop)
+            except ValueError as exc:
+                raise CommandError(str(exc)) from exc
+            self.stdout.write(
+                f"archived {partition.name}: {result.rows} events -> {directory}/{result.file} "
+                f"(sha256 {result.sha256}); {'dropped' if drop else 'detached'}"
+            )
+
+    def _status(self):
+        keep = timedelta(days=settings.AUDIT_ARCHIVE_AFTER_DAYS)
+        partitions = partitioning.list_partitions(self.table)
+        due = {
+            p.name for p in partitioning.expired_partitions(partitions, keep=keep, now=timezone.now())
+        }
+        for p in partitions:
+            lower = "MINVALUE" if p.lower is None else f"{p.lower:%Y-%m-%d}"
+            flag = "  archivable" if p.name in due else ""
+            self.stdout.write(f"{p.name}  [{lower}, {p.upper:%Y-%m-%d}){flag}")
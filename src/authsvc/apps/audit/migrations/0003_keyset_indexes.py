@@ -0,0 +1,85 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:39
+
+import django.utils.timezone
+from django.db import migrations, models
+
+from authsvc.infrastructure.operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction. The keyset
+    # indexes are built before the single-column indexes they replace are dropped.
+    atomic = False
+
+    dependencies = [
+        ('audit', '0002_occurred_at_default'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='auditevent',
+            index=models.Index(fields=['occurred_at', 'id'], name='auditevent_time_keyset_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='auditevent',
+            index=models.Index(fields=['event_type', 'occurred_at', 'id'], name='auditevent_type_keyset_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='auditevent',
+            index=models.Index(fields=['result', 'occurred_at', 'id'], name='auditevent_result_keyset_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='auditevent',
+            index=models.Index(fields=['actor_id', 'occurred_at', 'id'], name='auditevent_actor_keyset_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='auditevent',
+            index=models.Index(fields=['target_type', 'target_id', 'occurred_at', 'id'], name='auditevent_target_keyset_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='auditevent',
+            index=models.Index(fields=['request_id', 'occurred_at', 'id'], name='auditevent_request_keyset_idx'),
+        ),
+        migrations.AlterModelOptions(
+            name='auditevent',
+            options={'ordering': ['-occurred_at', '-id']},
+        ),
+        migrations.RemoveIndex(
+            model_name='auditevent',
+            name='audit_audit_event_t_14e051_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='auditevent',
+            name='audit_audit_target__59bbff_idx',
+        ),
+        migrations.AlterField(
+            model_name='auditevent',
+            name='actor_id',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='auditevent',
+            name='event_type',
+            field=models.CharField(choices=[('registration', 'Registration'), ('verification', 'Verification'), ('login_success', 'Login success'), ('login_failure', 'Login failure'), ('refresh_success', 'Refresh success'), ('refresh_failure', 'Refresh failure'), ('refresh_token_reuse', 'Refresh-token reuse'), ('logout', 'Logout'), ('logout_all', 'Logout all'), ('password_change', 'Password change'), ('password_reset', 'Password reset'), ('mfa_enrollment', 'MFA enrollment'), ('mfa_removal', 'MFA removal'), ('recovery_code_usage', 'Recovery-code usage'), ('session_revocation', 'Session revocation'), ('account_lock', 'Account lock'), ('account_suspension', 'Account suspension'), ('role_change', 'Role change'), ('permission_change', 'Permission change'), ('oauth_client_created', 'OAuth client created'), ('oauth_client_updated', 'OAuth client updated'), ('oauth_client_deleted', 'OAuth client deleted'), ('signing_key_change', 'Signing-key change'), ('email_submission', 'Email submission'), ('email_bounce', 'Email bounce'), ('email_complaint', 'Email complaint'), ('admin_action', 'Administrative action')], max_length=64),
+        ),
+        migrations.AlterField(
+            model_name='auditevent',
+            name='occurred_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AlterField(
+            model_name='auditevent',
+            name='request_id',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AlterField(
+            model_name='auditevent',
+            name='result',
+            field=models.CharField(choices=[('success', 'Success'), ('failure', 'Failure')], max_length=16),
+        ),
+        migrations.AlterField(
+            model_name='auditevent',
+            name='target_id',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+    ]
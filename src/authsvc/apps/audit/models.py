@@ -4,6 +4,7 @@ import uuid
 
 from django.core.exceptions import ValidationError
 from django.db import models
+from django.utils import timezone
 
 
 class AuditEventQuerySet(models.QuerySet):
@@ -58,25 +59,41 @@ class AuditEvent(models.Model):
         FAILURE = "failure", "Failure"
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    event_type = models.CharField(max_length=64, choices=EventType.choices, db_index=True)
-    result = models.CharField(max_length=16, choices=Result.choices, db_index=True)
+    event_type = models.CharField(max_length=64, choices=EventType.choices)
+    result = models.CharField(max_length=16, choices=Result.choices)
     actor_type = models.CharField(max_length=32, default="anonymous")
-    actor_id = models.CharField(max_length=255, blank=True, default="", db_index=True)
+    actor_id = models.CharField(max_length=255, blank=True, default="")
     target_type = models.CharField(max_length=64, blank=True, default="")
-    target_id = models.CharField(max_length=255, blank=True, default="", db_index=True)
-    request_id = models.CharField(max_length=64, blank=True, default="", db_index=True)
+    target_id = models.CharField(max_length=255, blank=True, default="")
+    request_id = models.CharField(max_length=64, blank=True, default="")
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     user_agent = models.CharField(max_length=512, blank=True, default="")
     metadata = models.JSONField(default=dict, blank=True)
-    occurred_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    # Set when the event is recorded, not when a buffered batch is flushed.
+    occurred_at = models.DateTimeField(default=timezone.now)
 
     objects = AuditEventQuerySet.as_manager()
 
     class Meta:
-        ordering = ["-occurred_at"]
+        ordering = ["-occurred_at", "-id"]
+        # One (filter, occurred_at, id) index for each filter the audit API
+        # can lead with. Every filter combination, plus the keyset on
+        # (occurred_at, id), is then read from an index in order, with no sort.
+        # These replace the old single-column indexes.
         indexes = [
-            models.Index(fields=["event_type", "occurred_at"]),
-            models.Index(fields=["target_type", "target_id"]),
+            models.Index(fields=["occurred_at", "id"], name="auditevent_time_keyset_idx"),
+            models.Index(
+                fields=["event_type", "occurred_at", "id"], name="auditevent_type_keyset_idx"
+            ),
+            models.Index(fields=["result", "occurred_at", "id"], name="auditevent_result_keyset_idx"),
+            models.Index(fields=["actor_id", "occurred_at", "id"], name="auditevent_actor_keyset_idx"),
+            models.Index(
+                fields=["target_type", "target_id", "occurred_at", "id"],
+                name="auditevent_target_keyset_idx",
+            ),
+            models.Index(
+                fields=["request_id", "occurred_at", "id"], name="auditevent_request_keyset_idx"
+            ),
         ]
 
     def save(self, *args, **kwargs):
@@ -1,8 +1,24 @@
-"""Small, synchronous API for recording sanitized audit events."""
+"""Small API for recording sanitized audit events (sync and async) and reading them back.
 
+Events are sanitized in the caller and, with ``AUDIT_BUFFERED`` on, written in
+batches by ``writer``; types in ``AUDIT_DURABLE_EVENT_TYPES`` (or calls with
+``durable=True``) are still inserted before returning. ``event_page`` reads
+them newest first with keyset pagination on ``(occurred_at, id)``.
+"""
+
+import json
 import uuid
 from collections.abc import Mapping
+from datetime import datetime
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+from authsvc.apps.common.security import b64url_decode, b64url_encode
 
+from . import writer
 from .models import AuditEvent
 
 _SENSITIVE_KEY_PARTS = (
@@ -67,6 +83,37 @@ def _request_context(request) -> tuple[str, str | None, str]:
     )
 
 
+def _event_fields(event_type, result, actor, target, request, metadata) -> dict:
+    actor_type, actor_id = _identity(actor, "anonymous")
+    target_type, target_id = _identity(target, "object")
+    request_id, ip_address, user_agent = _request_context(request)
+    return {
+        "event_type": event_type,
+        "result": result,
+        "actor_type": actor_type,
+        "actor_id": actor_id,
+        "target_type": target_type,
+        "target_id": target_id,
+        "request_id": request_id,
+        "ip_address": ip_address,
+        "user_agent": user_agent,
+        "metadata": _sanitize(metadata or {}),
+    }
+
+
+def _durable(event_type: str, durable: bool) -> bool:
+    return (
+        durable
+        or not getattr(settings, "AUDIT_BUFFERED", True)
+        or event_type in getattr(settings, "AUDIT_DURABLE_EVENT_TYPES", ())
+    )
+
+
+def _enqueue(event: AuditEvent) -> None:
+    if not writer.buffer.add(event):
+        event.save(force_insert=True)
+
+
 def record_event(
     event_type: str,
     *,
@@ -75,20 +122,121 @@ def record_event(
     target=None,
     request=None,
     metadata: dict | None = None,
+    durable: bool = False,
 ) -> AuditEvent:
-    """Persist one immutable event without retaining secrets or raw tokens."""
-    actor_type, actor_id = _identity(actor, "anonymous")
-    target_type, target_id = _identity(target, "object")
-    request_id, ip_address, user_agent = _request_context(request)
-    return AuditEvent.objects.create(
-        event_type=event_type,
-        result=result,
-        actor_type=actor_type,
-        actor_id=actor_id,
-        target_type=target_type,
-        target_id=target_id,
-        request_id=request_id,
-        ip_address=ip_address,
-        user_agent=user_agent,
-        metadata=_sanitize(metadata or {}),
-    )
+    """Record one immutable event without retaining secrets or raw tokens.
+
+    Buffered events join the write buffer once the surrounding transaction (if
+    any) commits, so the returned instance may not be saved yet.
+    """
+    event = AuditEvent(**_event_fields(event_type, result, actor, target, request, metadata))
+    if _durable(event_type, durable):
+        event.save(force_insert=True)
+    else:
+        transaction.on_commit(partial(_enqueue, event))
+    return event
+
+
+async def arecord_event(
+    event_type: str,
+    *,
+    result: str = AuditEvent.Result.SUCCESS,
+    actor=None,
+    target=None,
+    request=None,
+    metadata: dict | None = None,
+    durable: bool = False,
+) -> AuditEvent:
+    """``record_event`` for async views."""
+    event = AuditEvent(**_event_fields(event_type, result, actor, target, request, metadata))
+    if _durable(event_type, durable) or not writer.buffer.add(event):
+        await event.asave(force_insert=True)
+    return event
+
+
+# Columns served by the audit API; user agents and the rest stay in the table.
+EVENT_COLUMNS = (
+    "id",
+    "occurred_at",
+    "event_type",
+    "result",
+    "actor_type",
+    "actor_id",
+    "target_type",
+    "target_id",
+    "request_id",
+    "ip_address",
+    "metadata",
+)
+
+
+def encode_cursor(occurred_at: datetime, event_id) -> str:
+    return b64url_encode(json.dumps([occurred_at.isoformat(), str(event_id)]).encode())
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    """Invert ``encode_cursor``; ``ValueError`` for anything it did not produce."""
+    try:
+        occurred_at, event_id = json.loads(b64url_decode(cursor))
+        occurred_at = datetime.fromisoformat(occurred_at)
+        event_id = uuid.UUID(event_id)
+    except (TypeError, ValueError) as exc:
+        raise ValueError("Invalid cursor.") from exc
+    if occurred_at.tzinfo is None:
+        raise ValueError("Invalid cursor.")
+    return occurred_at, event_id
+
+
+def event_queryset(
+    *,
+    event_type: str | None = None,
+    result: str | None = None,
+    actor_id: str | None = None,
+    target_type: str | None = None,
+    target_id: str | None = None,
+    request_id: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    cursor: str | None = None,
+):
+    """Matching events as ``EVENT_COLUMNS`` dicts, newest first, after ``cursor``.
+
+    Filters are exact matches (``since`` inclusive, ``until`` exclusive), each
+    leading one of the model's ``(filter, occurred_at, id)`` indexes. The
+    cursor becomes a range condition on that same pair, so a page costs the
+    same at any depth, unlike OFFSET. ``target_id`` needs ``target_type``,
+    because only that pair is indexed.
+    """
+    if target_id is not None and target_type is None:
+        raise ValueError("target_id requires target_type.")
+    exact = {
+        "event_type": event_type,
+        "result": result,
+        "actor_id": actor_id,
+        "target_type": target_type,
+        "target_id": target_id,
+        "request_id": request_id,
+    }
+    events = AuditEvent.objects.filter(**{k: v for k, v in exact.items() if v is not None})
+    if since is not None:
+        events = events.filter(occurred_at__gte=since)
+    if until is not None:
+        events = events.filter(occurred_at__lt=until)
+    if cursor:
+        occurred_at, event_id = decode_cursor(cursor)
+        # (occurred_at, id) < cursor, spelled out: the leading bound is the
+        # index range the scan starts from, the OR breaks timestamp ties.
+        events = events.filter(
+            Q(occurred_at__lt=occurred_at) | Q(occurred_at=occurred_at, id__lt=event_id),
+            occurred_at__lte=occurred_at,
+        )
+    return events.order_by("-occurred_at", "-id").values(*EVENT_COLUMNS)
+
+
+def event_page(*, limit: int = 50, **filters) -> tuple[list[dict], str | None]:
+    """One page of ``event_queryset(**filters)`` and the next page's cursor (or None)."""
+    rows = list(event_queryset(**filters)[: limit + 1])
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1]["occurred_at"], rows[-1]["id"])
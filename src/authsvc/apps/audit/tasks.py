@@ -0,0 +1,30 @@
+"""Periodic audit-table maintenance (Celery beat)."""
+import logging
+
+from celery import shared_task
+from django.conf import settings
+from django.utils import timezone
+
+from authsvc.infrastructure import partitioning
+
+from .models import AuditEvent
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def maintain_audit_partitions():
+    """Create upcoming audit partitions; a no-op unless partitioning is enabled.
+
+    Old partitions are never dropped here: they leave via ``audit_partitions
+    archive``, which exports them first.
+    """
+    table = AuditEvent._meta.db_table
+    if not partitioning.is_partitioned(table):
+        return None
+    created = partitioning.create_monthly_partitions(
+        table, start=timezone.now(), months=settings.AUDIT_PARTITION_MONTHS_AHEAD + 1
+    )
+    if created:
+        logger.info("Audit partitions created=%s", created)
+    return {"created": created}
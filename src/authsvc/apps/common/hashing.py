@@ -0,0 +1,245 @@
+"""Password hashing off the request thread, with backpressure.
+
+Verifying or setting a password is by far the most expensive thing a request
+can ask for, so it runs on a small process pool (``PASSWORD_HASHING_WORKERS``
+per web process) instead of in the Gunicorn thread, and admission is bounded
+twice, without ever blocking:
+
+* ``PASSWORD_HASHING_MAX_PENDING`` hashes per process may be running or
+  queued for the pool;
+* each endpoint has its own concurrency quota (``PASSWORD_HASHING_QUOTAS``),
+  so a credential-stuffing burst on login cannot take registration or
+  password changes down with it.
+
+When either is full the request fails immediately with 503 + ``Retry-After``
+(``HashingUnavailable``) while refreshes and other cheap endpoints keep their
+threads. ``PASSWORD_HASHING_WORKERS = 0`` hashes inline (tests, management
+commands); the admission limits still apply. Async views call
+``averify_password``, which makes the same call from the CPU thread pool
+(``offload``).
+"""
+import logging
+import multiprocessing
+import secrets
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+
+from django.conf import settings
+
+from authsvc.apps.common.metrics import Counter, Gauge, Histogram
+from authsvc.apps.common.offload import run_cpu
+
+logger = logging.getLogger(__name__)
+
+HASH_PENDING = Gauge(
+    "authsvc_password_hash_pending", "Password hashes running or queued in this process."
+)
+HASH_SECONDS = Histogram(
+    "authsvc_password_hash_seconds",
+    "Wall time of a password hash including queueing, by endpoint.",
+)
+HASH_REJECTED = Counter(
+    "authsvc_password_hash_rejected_total",
+    "Password hashes refused for backpressure, by endpoint and reason.",
+)
+
+
+class HashingUnavailable(Exception):
+    """The hashing pool is saturated; answer 503 and let the client retry."""
+
+    def __init__(self, endpoint: str, reason: str):
+        super().__init__(f"Password hashing saturated ({endpoint}: {reason})")
+        self.endpoint = endpoint
+        self.reason = reason
+        self.retry_after = getattr(settings, "PASSWORD_HASHING_RETRY_AFTER_SECONDS", 1)
+
+
+_lock = threading.Lock()
+_executor: ProcessPoolExecutor | None = None
+_executor_workers = 0
+_pending: tuple[int, threading.BoundedSemaphore] | None = None
+_quotas: dict[str, tuple[int, threading.BoundedSemaphore]] = {}
+
+
+def _init_worker() -> None:
+    import django
+
+    django.setup()
+
+
+def _get_executor() -> ProcessPoolExecutor | None:
+    global _executor, _executor_workers
+    workers = getattr(settings, "PASSWORD_HASHING_WORKERS", 0)
+    if workers <= 0:
+        return None
+    with _lock:
+        if _executor is None or _executor_workers != workers:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            # spawn, not fork: the web process has threads (and DB sockets).
+            _executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+            _executor_workers = workers
+        return _executor
+
+
+def _semaphore(current, size: int):
+    """``current`` if it still matches ``size``, else a fresh semaphore."""
+    if current is not None and current[0] == size:
+        return current
+    return size, threading.BoundedSemaphore(size) if size > 0 else None
+
+
+def _pending_slot():
+    global _pending
+    with _lock:
+        _pending = _semaphore(_pending, getattr(settings, "PASSWORD_HASHING_MAX_PENDING", 8))
+        return _pending[1]
+
+
+def _quota(endpoint: str):
+    quotas = getattr(settings, "PASSWORD_HASHING_QUOTAS", {})
+    size = quotas.get(endpoint, getattr(settings, "PASSWORD_HASHING_MAX_PENDING", 8))
+    with _lock:
+        _quotas[endpoint] = _semaphore(_quotas.get(endpoint), size)
+        return _quotas[endpoint][1]
+
+
+def _reject(endpoint: str, reason: str):
+    HASH_REJECTED.inc(endpoint=endpoint, reason=reason)
+    raise HashingUnavailable(endpoint, reason)
+
+
+def _run(endpoint: str, fn, *args):
+    quota = _quota(endpoint)
+    if quota is None or not quota.acquire(blocking=False):
+        _reject(endpoint, "quota")
+    pending = _pending_slot()
+    if pending is None or not pending.acquire(blocking=False):
+        quota.release()
+        _reject(endpoint, "queue")
+    HASH_PENDING.inc()
+
+    def release(_future=None):
+        HASH_PENDING.dec()
+        pending.release()
+        quota.release()
+
+    start = time.perf_counter()
+    try:
+        executor = _get_executor()
+        if executor is None:
+            try:
+                return fn(*args)
+            finally:
+                release()
+        try:
+            future = executor.submit(fn, *args)
+        except BaseException:
+            release()
+            raise
+        # The slots are freed when the hash finishes, not when this caller
+        # stops waiting: a timed-out hash still occupies its worker, so
+        # admitting new work in its place would let the pool's queue grow.
+        future.add_done_callback(release)
+        try:
+            return future.result(timeout=getattr(settings, "PASSWORD_HASHING_TIMEOUT_SECONDS", 5))
+        except FutureTimeout:
+            future.cancel()  # frees the slots at once if the hash never started
+            logger.warning("Password hash timed out for %s", endpoint)
+            _reject(endpoint, "timeout")
+    finally:
+        HASH_SECONDS.observe(time.perf_counter() - start, endpoint=endpoint)
+
+
+# --- pool-side work (module level so it pickles) ----------------------------
+
+def _verify(raw: str, encoded: str) -> tuple[bool, str | None]:
+    """``(matches, new_encoded)``; ``new_encoded`` only when the hash is stale."""
+    from django.contrib.auth.hashers import (
+        check_password,
+        get_hasher,
+        identify_hasher,
+        make_password,
+    )
+
+    if not check_password(raw, encoded):
+        return False, None
+    preferred = get_hasher("default")
+    hasher = identify_hasher(encoded)
+    if hasher.algorithm != preferred.algorithm or preferred.must_update(encoded):
+        return True, make_password(raw)
+    return True, None
+
+
+def _make(raw: str) -> str:
+    from django.contrib.auth.hashers import make_password
+
+    return make_password(raw)
+
+
+# --- public API ---------------------------------------------------------------
+
+_dummy: str | None = None
+
+
+def _dummy_hash() -> str:
+    """A hash of a random secret at the current hasher and work factor.
+
+    Computed once per process (again only if the hasher settings change) so
+    an unknown account costs one verification, exactly like a wrong password.
+    """
+    from django.contrib.auth.hashers import get_hasher, make_password
+
+    global _dummy
+    preferred = get_hasher("default")
+    dummy = _dummy
+    if (
+        dummy is None
+        or not dummy.startswith(preferred.algorithm + "$")
+        or preferred.must_update(dummy)
+    ):
+        dummy = _dummy = make_password(secrets.token_urlsafe(32))
+    return dummy
+
+
+def verify_password(user, raw: str, *, endpoint: str) -> bool:
+    """``user.check_password`` on the hashing pool, including the stale-hash upgrade.
+
+    ``user=None`` (no such account) verifies against a dummy hash and returns
+    False, so every attempt costs exactly one hash whatever the outcome.
+    """
+    if user is None:
+        _run(endpoint, _verify, raw, _dummy_hash())
+        return False
+    matches, upgraded = _run(endpoint, _verify, raw, user.password)
+    if upgraded:
+        user.password = upgraded
+        user.save(update_fields=["password"])
+    return matches
+
+
+async def averify_password(user, raw: str, *, endpoint: str) -> bool:
+    """``verify_password`` for async views.
+
+    The hash runs on the CPU pool (``offload``), so the event loop never
+    blocks on it; a stale-hash upgrade is saved through the async ORM.
+    """
+    if user is None:
+        await run_cpu(_run, endpoint, _verify, raw, await run_cpu(_dummy_hash))
+        return False
+    matches, upgraded = await run_cpu(_run, endpoint, _verify, raw, user.password)
+    if upgraded:
+        user.password = upgraded
+        await user.asave(update_fields=["password"])
+    return matches
+
+
+def hash_password(raw: str, *, endpoint: str) -> str:
+    """An encoded hash for ``raw`` (what ``set_password`` would store)."""
+    return _run(endpoint, _make, raw)
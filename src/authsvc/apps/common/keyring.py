@@ -0,0 +1,304 @@
+"""JWT signing keys: a per-process PEM cache and the multi-key keyring.
+
+Two layouts are supported:
+
+* **Legacy single key** (``JWT_KEYRING_DIR`` unset): ``JWT_PRIVATE_KEY_PATH`` /
+  ``JWT_PUBLIC_KEY_PATH`` form one active key whose ``kid`` is derived from the
+  issuer, exactly as before the keyring existed.
+* **Keyring directory**: ``<dir>/keyring.json`` lists keys by ``kid`` with a
+  lifecycle state, and ``<dir>/<kid>.pem`` holds each private key. Each key
+  carries its own JWS algorithm (RS256, ES256 or EdDSA), inferred from the key
+  type, so the keyring can rotate between algorithms like any other key change.
+
+Key states::
+
+    next      published in JWKS and accepted, not yet used for signing
+    active    signs new tokens (exactly one)
+    previous  the former active key; still published and accepted so tokens
+              it signed keep working until they expire
+    retired   neither published nor accepted
+
+Rotation is ``generate`` (new key as ``next``) -> wait for downstream JWKS
+caches to pick it up -> ``activate`` -> wait one access-token TTL ->
+``retire`` the previous key. See ``manage.py signing_keys``.
+"""
+
+import json
+import os
+import signal
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+from django.conf import settings
+
+STATE_NEXT = "next"
+STATE_ACTIVE = "active"
+STATE_PREVIOUS = "previous"
+STATE_RETIRED = "retired"
+STATES = (STATE_NEXT, STATE_ACTIVE, STATE_PREVIOUS, STATE_RETIRED)
+PUBLISHED_STATES = (STATE_NEXT, STATE_ACTIVE, STATE_PREVIOUS)
+
+MANIFEST_NAME = "keyring.json"
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _stamp(path: str, depends: tuple[str, ...]) -> tuple:
+    """(inode, mtime, size) of ``path`` and of each dependency (None if missing)."""
+    stamps = []
+    for name in (path, *depends):
+        try:
+            st = os.stat(name)
+        except FileNotFoundError:
+            if name == path:
+                raise
+            stamps.append(None)
+        else:
+            stamps.append((st.st_ino, st.st_mtime_ns, st.st_size))
+    return tuple(stamps)
+
+
+class KeyCache:
+    """Process-wide cache of parsed key material, keyed by file path.
+
+    Parsing a PEM file (file I/O + ASN.1 decoding) costs far more than the
+    signature itself, so keys are loaded once and reused. The file is re-stat'ed
+    at most every ``JWT_KEY_RELOAD_CHECK_SECONDS`` and reloaded only when its
+    inode, mtime or size changed; ``clear()`` (wired to SIGHUP) forces a reload.
+
+    ``depends`` names further files the parsed value was built from (the
+    keyring manifest lists its key files); a change to any of them reloads
+    the value as well.
+    """
+
+    def __init__(self):
+        self._entries: dict[str, tuple[tuple, float, Any, tuple[str, ...]]] = {}
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        path: str,
+        loader: Callable[[bytes], Any],
+        depends: Callable[[Any], Iterable[str]] | None = None,
+    ) -> Any:
+        entry = self._entries.get(path)
+        now = time.monotonic()
+        interval = getattr(settings, "JWT_KEY_RELOAD_CHECK_SECONDS", 5)
+        if entry is not None and now - entry[1] < interval:
+            return entry[2]
+
+        if entry is not None:
+            stamp = _stamp(path, entry[3])
+            if entry[0] == stamp:
+                with self._lock:
+                    self._entries[path] = (stamp, now, entry[2], entry[3])
+                return entry[2]
+        # Parsed outside the lock: loaders may themselves use the cache
+        # (the keyring manifest loads its key files), and a racing
+        # duplicate parse is harmless. ``path`` is stat'ed before it is read,
+        # so a write that lands in between is picked up by the next check.
+        before = _stamp(path, ())
+        value = loader(_read_file(path))
+        deps = tuple(depends(value)) if depends is not None else ()
+        stamp = before + _stamp(path, deps)[1:]
+        with self._lock:
+            self._entries[path] = (stamp, now, value, deps)
+        return value
+
+    def discard(self, path: str) -> None:
+        with self._lock:
+            self._entries.pop(path, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_key_cache = KeyCache()
+
+
+def load_private_key(path: str):
+    from cryptography.hazmat.primitives.serialization import load_pem_private_key
+
+    return _key_cache.get(path, lambda data: load_pem_private_key(data, password=None))
+
+
+def load_public_key(path: str):
+    from cryptography.hazmat.primitives.serialization import load_pem_public_key
+
+    return _key_cache.get(path, load_pem_public_key)
+
+
+def install_key_reload_signal() -> None:
+    """Drop cached keys on SIGHUP (chaining any existing handler).
+
+    Called from the WSGI/ASGI entry points; a no-op off the main thread or on
+    platforms without SIGHUP.
+    """
+    if not hasattr(signal, "SIGHUP") or threading.current_thread() is not threading.main_thread():
+        return
+    previous = signal.getsignal(signal.SIGHUP)
+
+    def _handler(signum, frame):
+        _key_cache.clear()
+        if callable(previous):
+            previous(signum, frame)
+
+    signal.signal(signal.SIGHUP, _handler)
+
+
+def algorithm_for_key(key) -> str:
+    from authsvc.apps.common.security import algorithm_for_key
+
+    return algorithm_for_key(key)
+
+
+def legacy_kid() -> str:
+    """The ``kid`` used for the single-key layout (and imported legacy keys)."""
+    from authsvc.apps.common.security import sha256_hex
+
+    return sha256_hex(settings.JWT_ISSUER)[:16]
+
+
+@dataclass(frozen=True)
+class SigningKey:
+    kid: str
+    state: str
+    public_key: Any
+    private_key_path: str
+    alg: str = "RS256"
+
+    @property
+    def private_key(self):
+        return load_private_key(self.private_key_path)
+
+
+class Keyring:
+    """An immutable snapshot of the signing keys; lookups by ``kid`` are O(1)."""
+
+    def __init__(self, keys: list[SigningKey]):
+        self._keys = {key.kid: key for key in keys}
+        active = [key for key in keys if key.state == STATE_ACTIVE]
+        if len(active) != 1:
+            raise ValueError(f"Keyring must have exactly one active key, found {len(active)}")
+        self.active = active[0]
+        self._verification = {
+            kid: key for kid, key in self._keys.items() if key.state in PUBLISHED_STATES
+        }
+
+    def verification_key(self, kid: str | None) -> SigningKey | None:
+        """Key to verify a token with ``kid``; None for unknown or retired keys.
+
+        Tokens without a ``kid`` header are checked against the active key.
+        """
+        if kid is None:
+            return self.active
+        return self._verification.get(kid)
+
+    def published(self) -> list[SigningKey]:
+        return list(self._verification.values())
+
+    def __iter__(self):
+        return iter(self._keys.values())
+
+
+def _build_from_manifest(keyring_dir: Path, data: bytes) -> Keyring:
+    manifest = json.loads(data.decode("utf-8"))
+    keys = []
+    for entry in manifest.get("keys", []):
+        if entry["state"] not in STATES:
+            raise ValueError(f"Unknown key state {entry['state']!r} for kid {entry['kid']!r}")
+        path = str(keyring_dir / f"{entry['kid']}.pem")
+        # Rebuilt because the manifest or a key file changed: re-read each
+        # key instead of trusting its own, possibly not yet re-checked, entry.
+        _key_cache.discard(path)
+        if entry["state"] == STATE_RETIRED:
+            keys.append(SigningKey(entry["kid"], entry["state"], None, path))
+            continue
+        public_key = load_private_key(path).public_key()
+        keys.append(
+            SigningKey(entry["kid"], entry["state"], public_key, path, algorithm_for_key(public_key))
+        )
+    return Keyring(keys)
+
+
+def _key_files(keyring: Keyring) -> list[str]:
+    return [key.private_key_path for key in keyring if key.state != STATE_RETIRED]
+
+
+_legacy_keyring: tuple[Any, Keyring] | None = None
+
+
+def get_keyring() -> Keyring:
+    """The current keyring, reloaded when the manifest or key files change."""
+    global _legacy_keyring
+
+    keyring_dir = getattr(settings, "JWT_KEYRING_DIR", "")
+    if keyring_dir:
+        keyring_dir = Path(keyring_dir)
+        return _key_cache.get(
+            str(keyring_dir / MANIFEST_NAME),
+            lambda data: _build_from_manifest(keyring_dir, data),
+            depends=_key_files,
+        )
+
+    public_key = load_public_key(settings.JWT_PUBLIC_KEY_PATH)
+    cached = _legacy_keyring
+    if (
+        cached is not None
+        and cached[0] is public_key
+        and cached[1].active.kid == legacy_kid()
+        and cached[1].active.private_key_path == settings.JWT_PRIVATE_KEY_PATH
+    ):
+        return cached[1]
+    keyring = Keyring(
+        [
+            SigningKey(
+                legacy_kid(),
+                STATE_ACTIVE,
+                public_key,
+                settings.JWT_PRIVATE_KEY_PATH,
+                algorithm_for_key(public_key),
+            )
+        ]
+    )
+    _legacy_keyring = (public_key, keyring)
+    return keyring
+
+
+# --- Manifest management (used by `manage.py signing_keys`) -------------------
+
+def read_manifest(keyring_dir: Path) -> dict:
+    path = keyring_dir / MANIFEST_NAME
+    if not path.exists():
+        return {"keys": []}
+    return json.loads(path.read_text())
+
+
+def write_manifest(keyring_dir: Path, manifest: dict) -> None:
+    """Atomically replace the manifest so readers never see a partial file."""
+    path = keyring_dir / MANIFEST_NAME
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    os.replace(tmp, path)
+
+
+def jwk_thumbprint_kid(public_key) -> str:
+    """RFC 7638 JWK thumbprint of a public key, used as a new key's ``kid``.
+
+    Hex-encoded rather than base64url: a base64url kid can start with "-",
+    which ``manage.py signing_keys activate KID`` would parse as an option.
+    """
+    import hashlib
+
+    from authsvc.apps.common.security import public_jwk
+
+    # public_jwk() emits exactly the RFC 7638 required members for each kty.
+    canonical = json.dumps(public_jwk(public_key), separators=(",", ":"), sort_keys=True)
+    return hashlib.sha256(canonical.encode("ascii")).hexdigest()
@@ -0,0 +1,104 @@
+"""Minimal in-process metrics, rendered in the Prometheus text format.
+
+Served at ``GET /api/v1/health/metrics``. Values are per process: scrape each
+worker (or aggregate in the collector) rather than expecting one total from a
+load-balanced request.
+"""
+import threading
+
+_registry: list["_Metric"] = []
+_collectors: list = []
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def _labels(pairs) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self._lock = threading.Lock()
+        self._values: dict[tuple, float] = {}
+        _registry.append(self)
+
+    def value(self, **labels) -> float:
+        return self._values.get(tuple(sorted(labels.items())), 0.0)
+
+    def _samples(self):
+        for key, value in self._values.items():
+            yield self.name, key, value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            lines += [f"{name}{_labels(key)} {value:g}" for name, key, value in self._samples()]
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[tuple(sorted(labels.items()))] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation)
+        self.buckets = tuple(buckets)
+        self._counts: dict[tuple, list[int]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            counts = self._counts.setdefault(key, [0] * (len(self.buckets) + 1))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            counts[-1] += 1
+            self._values[key] = self._values.get(key, 0.0) + value
+
+    def count(self, **labels) -> int:
+        return self._counts.get(tuple(sorted(labels.items())), [0])[-1]
+
+    def _samples(self):
+        for key, counts in self._counts.items():
+            for bound, count in zip(self.buckets, counts):
+                yield f"{self.name}_bucket", (*key, ("le", f"{bound:g}")), count
+            yield f"{self.name}_bucket", (*key, ("le", "+Inf")), counts[-1]
+            yield f"{self.name}_sum", key, self._values[key]
+            yield f"{self.name}_count", key, counts[-1]
+
+
+def collector(fn):
+    """Register ``fn`` to update gauges from another source before each render."""
+    _collectors.append(fn)
+    return fn
+
+
+def render() -> str:
+    for fn in _collectors:
+        fn()
+    return "\n".join(line for metric in _registry for line in metric.render()) + "\n"
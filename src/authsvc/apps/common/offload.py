@@ -0,0 +1,38 @@
+"""CPU-bound work for the async (ASGI) routes, kept off the event loop.
+
+Async views talk to the database through Django's async ORM and to Redis
+through ``redis.asyncio``; the only steps that still need a thread are the
+CPU-heavy ones: password hashing (which feeds the bounded hashing pool, see
+``hashing``) and RSA signing of tokens. They run on one dedicated pool of
+``ASYNC_CPU_THREADS`` threads per process instead of the default executor, so
+a burst of logins cannot starve anything else that uses threads.
+
+Nothing run here may touch the database: connections opened on these threads
+are never returned at the end of a request.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+_lock = threading.Lock()
+_executor: ThreadPoolExecutor | None = None
+
+
+def cpu_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, "ASYNC_CPU_THREADS", 10),
+                thread_name_prefix="authsvc-cpu",
+            )
+        return _executor
+
+
+async def run_cpu(fn, *args, **kwargs):
+    """Await ``fn(*args, **kwargs)`` run on the CPU pool."""
+    return await sync_to_async(fn, thread_sensitive=False, executor=cpu_executor())(
+        *args, **kwargs
+    )
@@ -7,6 +7,8 @@ from typing import Any, Dict
 
 from django.conf import settings
 
+from authsvc.apps.common.keyring import get_keyring
+
 
 def b64url_encode(raw: bytes) -> str:
     return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
@@ -21,32 +23,126 @@ def sha256_hex(s: str) -> str:
 def secure_random_token(nbytes: int = 32) -> str:
     return b64url_encode(os.urandom(nbytes))
 
-def _read_file(path: str) -> bytes:
-    with open(path, "rb") as f:
-        return f.read()
-
-def jwt_sign_rs256(payload: Dict[str, Any], kid: str | None = None) -> str:
-    from cryptography.hazmat.primitives import hashes
-    from cryptography.hazmat.primitives.asymmetric import padding
-    from cryptography.hazmat.primitives.serialization import load_pem_private_key
-
-    header = {"alg": "RS256", "typ": "JWT"}
-    if kid:
-        header["kid"] = kid
+def _int_b64(value: int, length: int | None = None) -> str:
+    length = length or (value.bit_length() + 7) // 8
+    return b64url_encode(value.to_bytes(length, byteorder="big"))
+
+class RS256:
+    """RSASSA-PKCS1-v1_5 with SHA-256 (the default; what OIDC clients expect)."""
+
+    name = "RS256"
+
+    @staticmethod
+    def sign(private_key, data: bytes) -> bytes:
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives.asymmetric import padding
+
+        return private_key.sign(data, padding.PKCS1v15(), hashes.SHA256())
+
+    @staticmethod
+    def verify(public_key, signature: bytes, data: bytes) -> None:
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives.asymmetric import padding
+
+        public_key.verify(signature, data, padding.PKCS1v15(), hashes.SHA256())
+
+    @staticmethod
+    def public_jwk(public_key) -> Dict[str, str]:
+        numbers = public_key.public_numbers()
+        return {"kty": "RSA", "n": _int_b64(numbers.n), "e": _int_b64(numbers.e)}
+
+class ES256:
+    """ECDSA on P-256 with SHA-256; JOSE signatures are raw ``r || s``, not DER."""
+
+    name = "ES256"
+
+    @staticmethod
+    def sign(private_key, data: bytes) -> bytes:
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives.asymmetric import ec
+        from cryptography.hazmat.primitives.asymmetric.utils import decode_dss_signature
+
+        r, s = decode_dss_signature(private_key.sign(data, ec.ECDSA(hashes.SHA256())))
+        return r.to_bytes(32, "big") + s.to_bytes(32, "big")
+
+    @staticmethod
+    def verify(public_key, signature: bytes, data: bytes) -> None:
+        from cryptography.exceptions import InvalidSignature
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives.asymmetric import ec
+        from cryptography.hazmat.primitives.asymmetric.utils import encode_dss_signature
+
+        if len(signature) != 64:
+            raise InvalidSignature()
+        der = encode_dss_signature(
+            int.from_bytes(signature[:32], "big"), int.from_bytes(signature[32:], "big")
+        )
+        public_key.verify(der, data, ec.ECDSA(hashes.SHA256()))
+
+    @staticmethod
+    def public_jwk(public_key) -> Dict[str, str]:
+        numbers = public_key.public_numbers()
+        return {
+            "kty": "EC",
+            "crv": "P-256",
+            "x": _int_b64(numbers.x, 32),
+            "y": _int_b64(numbers.y, 32),
+        }
+
+class EdDSA:
+    """Ed25519 (RFC 8037) — the cheapest to sign of the three."""
+
+    name = "EdDSA"
+
+    @staticmethod
+    def sign(private_key, data: bytes) -> bytes:
+        return private_key.sign(data)
+
+    @staticmethod
+    def verify(public_key, signature: bytes, data: bytes) -> None:
+        public_key.verify(signature, data)
+
+    @staticmethod
+    def public_jwk(public_key) -> Dict[str, str]:
+        from cryptography.hazmat.primitives import serialization
+
+        raw = public_key.public_bytes(serialization.Encoding.Raw, serialization.PublicFormat.Raw)
+        return {"kty": "OKP", "crv": "Ed25519", "x": b64url_encode(raw)}
+
+ALGORITHMS = {alg.name: alg for alg in (RS256, ES256, EdDSA)}
+
+def algorithm_for_key(key) -> str:
+    """The JWS ``alg`` matching a (public or private) key's type."""
+    from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+
+    if isinstance(key, (rsa.RSAPrivateKey, rsa.RSAPublicKey)):
+        return RS256.name
+    if isinstance(key, (ec.EllipticCurvePrivateKey, ec.EllipticCurvePublicKey)):
+        if key.curve.name != "secp256r1":
+            raise ValueError(f"Unsupported EC curve {key.curve.name}")
+        return ES256.name
+    if isinstance(key, (ed25519.Ed25519PrivateKey, ed25519.Ed25519PublicKey)):
+        return EdDSA.name
+    raise ValueError(f"Unsupported key type {type(key).__name__}")
+
+def jwt_sign(payload: Dict[str, Any], kid: str | None = None) -> str:
+    """Sign ``payload`` with the keyring's active key (or the key ``kid``),
+    using that key's algorithm."""
+    keyring = get_keyring()
+    key = keyring.active if kid is None else keyring.verification_key(kid)
+    if key is None:
+        raise ValueError("Unknown signing key")
+
+    header = {"alg": key.alg, "typ": "JWT", "kid": key.kid}
     header_b64 = b64url_encode(json.dumps(header, separators=(",", ":")).encode())
     payload_b64 = b64url_encode(json.dumps(payload, separators=(",", ":")).encode())
     signing_input = f"{header_b64}.{payload_b64}".encode("ascii")
 
-    private_key = load_pem_private_key(_read_file(settings.JWT_PRIVATE_KEY_PATH), password=None)
-    signature = private_key.sign(signing_input, padding.PKCS1v15(), hashes.SHA256())
+    signature = ALGORITHMS[key.alg].sign(key.private_key, signing_input)
     sig_b64 = b64url_encode(signature)
     return f"{header_b64}.{payload_b64}.{sig_b64}"
 
-def jwt_verify_rs256(token: str) -> Dict[str, Any]:
-    from cryptography.hazmat.primitives import hashes
-    from cryptography.hazmat.primitives.asymmetric import padding
-    from cryptography.hazmat.primitives.serialization import load_pem_public_key
-
+def jwt_verify(token: str) -> Dict[str, Any]:
     parts = token.split(".")
     if len(parts) != 3:
         raise ValueError("Invalid token format")
@@ -54,8 +150,14 @@ def jwt_verify_rs256(token: str) -> Dict[str, Any]:
     signing_input = f"{header_b64}.{payload_b64}".encode("ascii")
     signature = b64url_decode(sig_b64)
 
-    public_key = load_pem_public_key(_read_file(settings.JWT_PUBLIC_KEY_PATH))
-    public_key.verify(signature, signing_input, padding.PKCS1v15(), hashes.SHA256())
+    header = json.loads(b64url_decode(header_b64).decode("utf-8"))
+    key = get_keyring().verification_key(header.get("kid"))
+    if key is None:
+        raise ValueError("Unknown signing key")
+    # The key, not the token, decides the algorithm (no alg confusion).
+    if header.get("alg") != key.alg:
+        raise ValueError("Unsupported algorithm")
+    ALGORITHMS[key.alg].verify(key.public_key, signature, signing_input)
 
     payload = json.loads(b64url_decode(payload_b64).decode("utf-8"))
     now = int(time.time())
@@ -67,32 +169,42 @@ def jwt_verify_rs256(token: str) -> Dict[str, Any]:
         raise ValueError("Token expired")
     return payload
 
+# Pre-keyring names; tokens may now use any algorithm in ALGORITHMS.
+jwt_sign_rs256 = jwt_sign
+jwt_verify_rs256 = jwt_verify
+
+def public_jwk(public_key) -> Dict[str, str]:
+    """The key-type members (kty/crv/n/e/x/y) of a public key's JWK."""
+    return ALGORITHMS[algorithm_for_key(public_key)].public_jwk(public_key)
+
 def get_jwks() -> Dict[str, Any]:
-    from cryptography.hazmat.primitives.serialization import load_pem_public_key
-    
-    public_key = load_pem_public_key(_read_file(settings.JWT_PUBLIC_KEY_PATH))
-    numbers = public_key.public_numbers()
-    
-    # n and e need to be base64url encoded without padding
-    n_bytes = numbers.n.to_bytes((numbers.n.bit_length() + 7) // 8, byteorder="big")
-    e_bytes = numbers.e.to_bytes((numbers.e.bit_length() + 7) // 8, byteorder="big")
-    
-    # We use a static key ID based on the issuer for simplicity
-    kid = sha256_hex(settings.JWT_ISSUER)[:16]
-    
+    """Public JWKs for every published (next/active/previous) key."""
     return {
         "keys": [
-            {
-                "kty": "RSA",
-                "alg": "RS256",
-                "use": "sig",
-                "kid": kid,
-                "n": b64url_encode(n_bytes),
-                "e": b64url_encode(e_bytes),
-            }
+            {**public_jwk(key.public_key), "alg": key.alg, "use": "sig", "kid": key.kid}
+            for key in get_keyring().published()
         ]
     }
 
+_jwks_document: tuple[Any, bytes, str] | None = None
+
+def get_jwks_document() -> tuple[bytes, str]:
+    """Pre-serialized JWKS body and its strong ETag.
+
+    Built once per keyring (i.e. once per key change) and reused, so serving
+    the JWKS endpoint costs a dict lookup rather than a PEM/bigint/base64 pass.
+    """
+    global _jwks_document
+
+    keyring = get_keyring()
+    cached = _jwks_document
+    if cached is not None and cached[0] is keyring:
+        return cached[1], cached[2]
+    body = json.dumps(get_jwks(), separators=(",", ":"), sort_keys=True).encode()
+    etag = '"%s"' % hashlib.sha256(body).hexdigest()[:32]
+    _jwks_document = (keyring, body, etag)
+    return body, etag
+
 def make_access_jwt(user_uuid: str, email: str, roles: list[str] | None = None, session_id: str | None = None) -> str:
     import uuid
     now = int(time.time())
@@ -109,8 +221,7 @@ def make_access_jwt(user_uuid: str, email: str, roles: list[str] | None = None,
     if session_id:
         payload["sid"] = str(session_id)
 
-    kid = sha256_hex(settings.JWT_ISSUER)[:16]
-    return jwt_sign_rs256(payload, kid=kid)
+    return jwt_sign(payload)
 
 def make_mfa_challenge(user_uuid: str) -> str:
     """Short-lived signed token proving the password step passed, pending MFA.
@@ -130,13 +241,12 @@ def make_mfa_challenge(user_uuid: str) -> str:
         "exp": now + ttl,
         "jti": str(uuid.uuid4()),
     }
-    kid = sha256_hex(settings.JWT_ISSUER)[:16]
-    return jwt_sign_rs256(payload, kid=kid)
+    return jwt_sign(payload)
 
 def verify_mfa_challenge(token: str) -> Dict[str, Any] | None:
     """Return the payload of a valid MFA challenge token, or None."""
     try:
-        payload = jwt_verify_rs256(token)
+        payload = jwt_verify(token)
     except Exception:
         return None
     if payload.get("purpose") != "mfa":
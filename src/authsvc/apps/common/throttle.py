@@ -0,0 +1,393 @@
+"""Sliding-window login throttling, applied before any DB or hashing work.
+
+``LoginThrottleMiddleware`` runs ahead of the API for ``POST`` to the login
+route. It reads only the client IP and the e-mail field, and counts attempts
+in three sliding windows:
+
+    ip          LOGIN_THROTTLE_IP_RATE          many accounts from one address
+    account     LOGIN_THROTTLE_ACCOUNT_RATE     one account from many addresses
+    ip_account  LOGIN_THROTTLE_IP_ACCOUNT_RATE  one account from one address
+
+An attempt over any limit gets 429 with ``Retry-After`` (until the oldest
+counted attempt leaves its window) and is not counted itself. The first
+rejection by the account rule in a window records an ``ACCOUNT_LOCK`` audit
+event. Accounts are keyed by a hash of the normalized e-mail address.
+
+With the ``redis`` backend all windows are checked and updated in one Lua
+script (sorted sets of attempt timestamps), so every web process shares
+them; ``local`` keeps them in process memory (tests, single-process dev). If
+Redis is unreachable logins are let through rather than locked out.
+
+Under ASGI the middleware runs async and talks to Redis through
+``redis.asyncio``. ``aratelimit`` applies the same windows as a per-IP limit
+to async views, where ``django_ratelimit``'s decorator cannot be used.
+"""
+import asyncio
+import functools
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse
+from django.utils.decorators import sync_and_async_middleware
+from django_ratelimit.exceptions import Ratelimited
+
+from authsvc.apps.common.metrics import Counter
+from authsvc.apps.common.security import sha256_hex
+
+logger = logging.getLogger(__name__)
+
+THROTTLED = Counter("authsvc_login_throttled_total", "Login attempts rejected by throttle rule.")
+
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+# KEYS: one sorted set per rule. ARGV: now (ms), member, then limit and window
+# (ms) per key. Returns the retry-after in ms followed by the 1-based indexes
+# of the rules that are full; nothing is recorded unless all have room.
+SLIDING_WINDOW_SCRIPT = """
+local now = tonumber(ARGV[1])
+local retry = 0
+local full = {}
+for i, key in ipairs(KEYS) do
+  local limit = tonumber(ARGV[1 + 2 * i])
+  local window = tonumber(ARGV[2 + 2 * i])
+  redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+  if redis.call('ZCARD', key) >= limit then
+    local oldest = tonumber(redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')[2])
+    retry = math.max(retry, oldest + window - now)
+    full[#full + 1] = i
+  end
+end
+if #full == 0 then
+  for i, key in ipairs(KEYS) do
+    redis.call('ZADD', key, now, ARGV[2])
+    redis.call('PEXPIRE', key, ARGV[2 + 2 * i])
+  end
+end
+local result = {retry}
+for _, i in ipairs(full) do
+  result[#result + 1] = i
+end
+return result
+"""
+
+
+def parse_rate(rate: str) -> tuple[int, int]:
+    """``"5/15m"`` -> ``(5, 900)``: attempts per window in seconds."""
+    count, _, period = rate.partition("/")
+    number = period[:-1] or "1"
+    return int(count), int(number) * _UNITS[period[-1]]
+
+
+@dataclass(frozen=True)
+class Window:
+    rule: str
+    key: str
+    limit: int
+    seconds: int
+
+
+@dataclass(frozen=True)
+class Decision:
+    retry_after: int
+    rules: tuple[str, ...]
+
+
+class LocalWindows:
+    """In-process sliding windows (one deque of timestamps per key).
+
+    Keys are per IP and per account, so a spray of one-off identifiers would
+    grow the maps without bound; every ``SWEEP_SECONDS`` the keys whose
+    window (or mark) has fully expired are dropped.
+    """
+
+    SWEEP_SECONDS = 60.0
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hits: dict[str, deque] = {}
+        self._expires: dict[str, float] = {}
+        self._marks: dict[str, float] = {}
+        self._next_sweep = 0.0
+
+    def _sweep(self, now: float) -> None:
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + self.SWEEP_SECONDS
+        for key in [k for k in self._hits if self._expires.get(k, 0) <= now]:
+            del self._hits[key]
+            self._expires.pop(key, None)
+        for key in [k for k, until in self._marks.items() if until <= now]:
+            del self._marks[key]
+
+    def hit(self, windows: list[Window], now: float) -> tuple[float, list[int]]:
+        with self._lock:
+            self._sweep(now)
+            retry, full = 0.0, []
+            for i, window in enumerate(windows):
+                hits = self._hits.setdefault(window.key, deque())
+                while hits and hits[0] <= now - window.seconds:
+                    hits.popleft()
+                if len(hits) >= window.limit:
+                    retry = max(retry, hits[0] + window.seconds - now)
+                    full.append(i)
+            if not full:
+                for window in windows:
+                    self._hits[window.key].append(now)
+                    self._expires[window.key] = now + window.seconds
+            return retry, full
+
+    def mark(self, key: str, seconds: float, now: float) -> bool:
+        with self._lock:
+            self._sweep(now)
+            if self._marks.get(key, 0) > now:
+                return False
+            self._marks[key] = now + seconds
+            return True
+
+    async def ahit(self, windows: list[Window], now: float) -> tuple[float, list[int]]:
+        return self.hit(windows, now)
+
+    async def amark(self, key: str, seconds: float, now: float) -> bool:
+        return self.mark(key, seconds, now)
+
+
+class RedisWindows:
+    def __init__(self):
+        import redis
+
+        self._url = getattr(settings, "LOGIN_THROTTLE_REDIS_URL", "") or settings.CACHES["default"]["LOCATION"]
+        self._client = redis.Redis.from_url(self._url, socket_timeout=1, socket_connect_timeout=1)
+        self._script = self._client.register_script(SLIDING_WINDOW_SCRIPT)
+        self._async = None
+
+    @staticmethod
+    def _args(windows: list[Window], now: float) -> list:
+        args = [int(now * 1000), uuid.uuid4().hex]
+        for window in windows:
+            args += [window.limit, window.seconds * 1000]
+        return args
+
+    @staticmethod
+    def _decode(result) -> tuple[float, list[int]]:
+        retry_ms, *full = result
+        return int(retry_ms) / 1000, [int(i) - 1 for i in full]
+
+    def hit(self, windows: list[Window], now: float) -> tuple[float, list[int]]:
+        keys = [w.key for w in windows]
+        return self._decode(self._script(keys=keys, args=self._args(windows, now)))
+
+    def mark(self, key: str, seconds: float, now: float) -> bool:
+        return bool(self._client.set(key, 1, nx=True, px=max(int(seconds * 1000), 1)))
+
+    def _async_client(self):
+        # redis.asyncio connections belong to the event loop that opened them.
+        loop = asyncio.get_running_loop()
+        if self._async is None or self._async[0] is not loop:
+            import redis.asyncio
+
+            client = redis.asyncio.Redis.from_url(self._url, socket_timeout=1, socket_connect_timeout=1)
+            self._async = loop, client, client.register_script(SLIDING_WINDOW_SCRIPT)
+        return self._async[1:]
+
+    async def ahit(self, windows: list[Window], now: float) -> tuple[float, list[int]]:
+        _, script = self._async_client()
+        keys = [w.key for w in windows]
+        return self._decode(await script(keys=keys, args=self._args(windows, now)))
+
+    async def amark(self, key: str, seconds: float, now: float) -> bool:
+        client, _ = self._async_client()
+        return bool(await client.set(key, 1, nx=True, px=max(int(seconds * 1000), 1)))
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def _windows_backend():
+    global _backend
+    kind = getattr(settings, "LOGIN_THROTTLE_BACKEND", "redis")
+    with _backend_lock:
+        if _backend is None or _backend[0] != kind:
+            _backend = kind, RedisWindows() if kind == "redis" else LocalWindows()
+        return _backend[1]
+
+
+def _email(request) -> str:
+    try:
+        email = json.loads(request.body or b"{}").get("email") or ""
+    except (ValueError, AttributeError):
+        return ""
+    return str(email).strip().lower()
+
+
+def login_windows(ip: str, email: str) -> list[Window]:
+    prefix = getattr(settings, "LOGIN_THROTTLE_KEY_PREFIX", "authsvc:throttle:login")
+    rules = [("ip", settings.LOGIN_THROTTLE_IP_RATE, f"ip:{ip}")]
+    if email:
+        account = sha256_hex(email)
+        rules += [
+            ("account", settings.LOGIN_THROTTLE_ACCOUNT_RATE, f"acct:{account}"),
+            ("ip_account", settings.LOGIN_THROTTLE_IP_ACCOUNT_RATE, f"ipacct:{sha256_hex(f'{ip}|{email}')}"),
+        ]
+    return [Window(rule, f"{prefix}:{key}", *parse_rate(rate)) for rule, rate, key in rules]
+
+
+def _decision(windows: list[Window], retry: float, full: list[int]) -> Decision:
+    rules = tuple(windows[i].rule for i in full)
+    for rule in rules:
+        THROTTLED.inc(rule=rule)
+    return Decision(retry_after=max(int(retry + 0.999), 1), rules=rules)
+
+
+def _lock_key(windows: list[Window], full: list[int]) -> str | None:
+    """The account's lock marker, if the account rule is among ``full``."""
+    for i in full:
+        if windows[i].rule == "account":
+            return windows[i].key + ":locked"
+    return None
+
+
+def check_login(request) -> Decision | None:
+    """Count this attempt, or a ``Decision`` to reject it (nothing counted)."""
+    email = _email(request)
+    windows = login_windows(request.META.get("REMOTE_ADDR", ""), email)
+    backend = _windows_backend()
+    now = time.time()
+    try:
+        retry, full = backend.hit(windows, now)
+        if not full:
+            return None
+        lock_key = _lock_key(windows, full)
+        if lock_key and backend.mark(lock_key, retry, now):
+            _record_lock(request, email, retry)
+    except Exception:
+        logger.warning("Login throttle unavailable; allowing the attempt", exc_info=True)
+        return None
+    return _decision(windows, retry, full)
+
+
+async def acheck_login(request) -> Decision | None:
+    """``check_login`` for the async middleware path (``redis.asyncio``)."""
+    email = _email(request)
+    windows = login_windows(request.META.get("REMOTE_ADDR", ""), email)
+    backend = _windows_backend()
+    now = time.time()
+    try:
+        retry, full = await backend.ahit(windows, now)
+        if not full:
+            return None
+        lock_key = _lock_key(windows, full)
+        if lock_key and await backend.amark(lock_key, retry, now):
+            await _arecord_lock(request, email, retry)
+    except Exception:
+        logger.warning("Login throttle unavailable; allowing the attempt", exc_info=True)
+        return None
+    return _decision(windows, retry, full)
+
+
+def _lock_event(email: str, retry: float) -> dict:
+    from authsvc.apps.audit.models import AuditEvent
+
+    return {
+        "event_type": AuditEvent.EventType.ACCOUNT_LOCK,
+        "result": AuditEvent.Result.FAILURE,
+        "target": ("account_identifier", sha256_hex(email)),
+        "metadata": {"reason": "login_throttle", "lock_seconds": int(retry + 0.999)},
+    }
+
+
+def _record_lock(request, email: str, retry: float) -> None:
+    from authsvc.apps.audit.services import record_event
+
+    record_event(request=request, **_lock_event(email, retry))
+
+
+async def _arecord_lock(request, email: str, retry: float) -> None:
+    from authsvc.apps.audit.services import arecord_event
+
+    await arecord_event(request=request, **_lock_event(email, retry))
+
+
+def _throttles(request) -> bool:
+    return (
+        request.method == "POST"
+        and request.path in getattr(settings, "LOGIN_THROTTLE_PATHS", ())
+        and getattr(settings, "LOGIN_THROTTLE_ENABLED", True)
+    )
+
+
+def _rejected(decision: Decision) -> JsonResponse:
+    response = JsonResponse({"detail": "Too many login attempts. Try again later."}, status=429)
+    response["Retry-After"] = str(decision.retry_after)
+    return response
+
+
+@sync_and_async_middleware
+def LoginThrottleMiddleware(get_response):
+    if iscoroutinefunction(get_response):
+
+        async def middleware(request):
+            if _throttles(request):
+                decision = await acheck_login(request)
+                if decision is not None:
+                    return _rejected(decision)
+            return await get_response(request)
+
+    else:
+
+        def middleware(request):
+            if _throttles(request):
+                decision = check_login(request)
+                if decision is not None:
+                    return _rejected(decision)
+            return get_response(request)
+
+    return middleware
+
+
+async def _ahit(request, windows: list[Window], now: float) -> tuple[float, list[int]]:
+    backend = _windows_backend()
+    if isinstance(request, ASGIRequest):
+        return await backend.ahit(windows, now)
+    # Under WSGI an async view runs on a throwaway event loop, which would
+    # cost a new Redis connection per request; the sync client's pool is kept.
+    return backend.hit(windows, now)
+
+
+def aratelimit(rate: str, *, group: str):
+    """Per-IP limit for async views, counted in the throttle backend.
+
+    The async counterpart of ``django_ratelimit``'s
+    ``@ratelimit(key="ip", rate=rate, block=True)``: over the limit it raises
+    ``Ratelimited`` just the same. Honours ``RATELIMIT_ENABLE``; lets the
+    request through if the backend is unreachable.
+    """
+    limit, seconds = parse_rate(rate)
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapped(request, *args, **kwargs):
+            if getattr(settings, "RATELIMIT_ENABLE", True):
+                ip = request.META.get("REMOTE_ADDR", "")
+                window = Window(group, f"authsvc:throttle:{group}:ip:{ip}", limit, seconds)
+                try:
+                    _, full = await _ahit(request, [window], time.time())
+                except Exception:
+                    logger.warning("Rate limit backend unavailable", exc_info=True)
+                    full = []
+                if full:
+                    THROTTLED.inc(rule=group)
+                    raise Ratelimited()
+            return await fn(request, *args, **kwargs)
+
+        return wrapped
+
+    return decorator
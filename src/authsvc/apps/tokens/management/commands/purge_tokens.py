@@ -0,0 +1,50 @@
+"""Delete expired/revoked refresh tokens, one-time tokens and email OTPs.
+
+    manage.py purge_tokens [--retention-days N] [--batch-size N]
+                           [--pause S] [--max-seconds S] [--dry-run]
+
+Defaults come from the TOKEN_PURGE_* settings. The same job runs periodically
+from Celery beat (``authsvc.apps.tokens.tasks.purge_expired_tokens``).
+"""
+from django.core.management.base import BaseCommand
+
+from authsvc.apps.tokens.purge import purge_tokens
+
+
+class Command(BaseCommand):
+    help = "Delete expired/revoked token rows in small keyset-paginated batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--retention-days",
+            type=float,
+            help="Keep rows for this long after they expire/are revoked "
+            "(default: TOKEN_PURGE_RETENTION_DAYS).",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, help="Rows per delete transaction (default: TOKEN_PURGE_BATCH_SIZE)."
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            help="Seconds to sleep between batches (default: TOKEN_PURGE_BATCH_PAUSE_SECONDS).",
+        )
+        parser.add_argument("--max-seconds", type=float, help="Stop after roughly this long.")
+        parser.add_argument("--dry-run", action="store_true", help="Only count eligible rows.")
+
+    def handle(self, *args, **options):
+        results = purge_tokens(
+            retention_days=options["retention_days"],
+            batch_size=options["batch_size"],
+            pause=options["pause"],
+            max_seconds=options["max_seconds"],
+            dry_run=options["dry_run"],
+        )
+        for result in results:
+            if options["dry_run"]:
+                self.stdout.write(f"{result.label}: {result.deleted} eligible")
+                continue
+            self.stdout.write(
+                f"{result.label}: deleted {result.deleted} in {result.batches} batch(es), "
+                f"{result.seconds:.2f}s ({result.rows_per_second:,.0f} rows/s)"
+            )
@@ -0,0 +1,100 @@
+"""Optional monthly partitioning of tokens_refreshtoken (PostgreSQL only).
+
+    manage.py refresh_token_partitions status
+    manage.py refresh_token_partitions enable [--months-ahead N]
+    manage.py refresh_token_partitions maintain [--months-ahead N] [--dry-run]
+
+``enable`` converts the live table (existing rows become one legacy
+partition; see ``authsvc.infrastructure.partitioning``). ``maintain`` creates
+upcoming monthly partitions and detaches/drops partitions whose tokens are all
+past JWT_REFRESH_TTL_SECONDS + TOKEN_PURGE_RETENTION_DAYS; Celery beat runs it
+daily once the table is partitioned.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from authsvc.apps.tokens.models import RefreshToken
+from authsvc.apps.tokens.purge import partition_retention
+from authsvc.infrastructure import partitioning
+
+
+class Command(BaseCommand):
+    help = "Partition tokens_refreshtoken by month and manage its partitions (PostgreSQL)."
+
+    def add_arguments(self, parser):
+        sub = parser.add_subparsers(dest="action", required=True)
+        sub.add_parser("status", help="List partitions and which ones have expired.")
+        for name, text in (
+            ("enable", "Convert the live table to a partitioned one."),
+            ("maintain", "Create upcoming partitions and drop expired ones."),
+        ):
+            action = sub.add_parser(name, help=text)
+            action.add_argument(
+                "--months-ahead",
+                type=int,
+                default=settings.REFRESH_TOKEN_PARTITION_MONTHS_AHEAD,
+                help="Future monthly partitions to keep ready "
+                "(default: REFRESH_TOKEN_PARTITION_MONTHS_AHEAD).",
+            )
+            if name == "maintain":
+                action.add_argument(
+                    "--dry-run", action="store_true", help="Only list partitions to drop."
+                )
+
+    def handle(self, *args, action, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Partitioning requires PostgreSQL.")
+        self.table = RefreshToken._meta.db_table
+        partitioned = partitioning.is_partitioned(self.table)
+        if action == "enable":
+            if partitioned:
+                raise CommandError(f"{self.table} is already partitioned.")
+            return self._enable(options["months_ahead"])
+        if not partitioned:
+            raise CommandError(f"{self.table} is not partitioned; run 'enable' first.")
+        if action == "status":
+            return self._status()
+        created, dropped = partitioning.maintain_partitions(
+            self.table,
+            months_ahead=options["months_ahead"],
+            keep=partition_retention(),
+            now=timezone.now(),
+            dry_run=options["dry_run"],
+        )
+        for name in created:
+            self.stdout.write(f"created {name}")
+        for name in dropped:
+            self.stdout.write(f"{'would drop' if options['dry_run'] else 'dropped'} {name}")
+
+    def _enable(self, months_ahead: int):
+        now = timezone.now()
+        cutoff = partitioning.add_months(partitioning.month_floor(now), 1)
+        # The interim CHECK on the live table rejects rows at/after the cutoff,
+        # so never cut over right before a month boundary.
+        if cutoff - now < timedelta(days=1):
+            cutoff = partitioning.add_months(cutoff, 1)
+        try:
+            partitioning.partition_existing_table(
+                RefreshToken, key="created_at", cutoff=cutoff, months_ahead=months_ahead
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc)) from exc
+        self.stdout.write(f"{self.table} partitioned; existing rows cover up to {cutoff:%Y-%m-%d}")
+        self._status()
+
+    def _status(self):
+        now = timezone.now()
+        expired = {
+            p.name
+            for p in partitioning.expired_partitions(
+                partitioning.list_partitions(self.table), keep=partition_retention(), now=now
+            )
+        }
+        for p in partitioning.list_partitions(self.table):
+            lower = "MINVALUE" if p.lower is None else f"{p.lower:%Y-%m-%d}"
+            flag = "  expired" if p.name in expired else ""
+            self.stdout.write(f"{p.name}  [{lower}, {p.upper:%Y-%m-%d}){flag}")
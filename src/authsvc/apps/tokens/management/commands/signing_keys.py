@@ -0,0 +1,166 @@
+"""Manage the JWT signing keyring (``JWT_KEYRING_DIR``).
+
+    manage.py signing_keys list
+    manage.py signing_keys generate [--alg A]   # new key, state "next"
+    manage.py signing_keys import PEM [--kid K] # adopt an existing key
+    manage.py signing_keys activate KID         # next -> active, active -> previous
+    manage.py signing_keys retire KID           # stop publishing/accepting a key
+
+Every state transition is recorded as a SIGNING_KEY_CHANGE audit event.
+"""
+import os
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from authsvc.apps.audit.models import AuditEvent
+from authsvc.apps.audit.services import record_event
+from authsvc.apps.common import keyring
+from authsvc.apps.common.security import ALGORITHMS, algorithm_for_key
+
+# Kids name files in JWT_KEYRING_DIR and are passed as CLI arguments.
+KID_PATTERN = re.compile(r"[A-Za-z0-9_-]+")
+
+
+class Command(BaseCommand):
+    help = "Manage the JWT signing keyring (generate, activate and retire keys)."
+
+    def add_arguments(self, parser):
+        sub = parser.add_subparsers(dest="action", required=True)
+        sub.add_parser("list", help="Show keys and their states.")
+        gen = sub.add_parser("generate", help="Create a new key in the 'next' state.")
+        gen.add_argument(
+            "--alg",
+            choices=sorted(ALGORITHMS),
+            default="RS256",
+            help="Signing algorithm of the new key (default: RS256).",
+        )
+        imp = sub.add_parser("import", help="Adopt an existing PEM private key.")
+        imp.add_argument("pem", help="Path to a PEM-encoded private key.")
+        imp.add_argument(
+            "--kid",
+            help="Key ID to use (default: the legacy issuer-derived kid, so tokens "
+            "signed before the keyring was enabled stay valid).",
+        )
+        act = sub.add_parser("activate", help="Start signing with a 'next' key.")
+        act.add_argument("kid")
+        ret = sub.add_parser("retire", help="Stop publishing and accepting a key.")
+        ret.add_argument("kid")
+
+    def handle(self, *args, action, **options):
+        keyring_dir = getattr(settings, "JWT_KEYRING_DIR", "")
+        if not keyring_dir:
+            raise CommandError("JWT_KEYRING_DIR is not set.")
+        self.keyring_dir = Path(keyring_dir)
+        self.keyring_dir.mkdir(parents=True, exist_ok=True)
+        self.manifest = keyring.read_manifest(self.keyring_dir)
+        self.transitions = []
+
+        if action == "list":
+            for entry in self.manifest["keys"]:
+                self.stdout.write(
+                    f"{entry['kid']}  {entry['state']}  {entry.get('alg', '')}  "
+                    f"{entry.get('created_at', '')}"
+                )
+            return
+        getattr(self, f"_{action}")(**options)
+        keyring.write_manifest(self.keyring_dir, self.manifest)
+        # Audit only once the new manifest is in place.
+        for kid, previous, state in self.transitions:
+            record_event(
+                AuditEvent.EventType.SIGNING_KEY_CHANGE,
+                actor=("system", "signing_keys"),
+                target=("signing_key", kid),
+                metadata={"from": previous, "to": state},
+            )
+            self.stdout.write(f"{kid}: {previous or 'new'} -> {state}")
+
+    # --- actions -------------------------------------------------------------
+
+    def _generate(self, alg="RS256", **options):
+        from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+
+        if alg == "ES256":
+            private_key = ec.generate_private_key(ec.SECP256R1())
+        elif alg == "EdDSA":
+            private_key = ed25519.Ed25519PrivateKey.generate()
+        else:
+            private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        kid = keyring.jwk_thumbprint_kid(private_key.public_key())
+        self._add_key(kid, private_key)
+
+    def _import(self, pem, kid=None, **options):
+        from cryptography.hazmat.primitives.serialization import load_pem_private_key
+
+        private_key = load_pem_private_key(Path(pem).read_bytes(), password=None)
+        try:
+            algorithm_for_key(private_key)
+        except ValueError as exc:
+            raise CommandError(str(exc)) from exc
+        self._add_key(kid or keyring.legacy_kid(), private_key)
+
+    def _activate(self, kid, **options):
+        entry = self._entry(kid)
+        if entry["state"] != keyring.STATE_NEXT:
+            raise CommandError(f"Only a 'next' key can be activated ({kid} is {entry['state']}).")
+        for other in self.manifest["keys"]:
+            if other["state"] == keyring.STATE_ACTIVE:
+                self._transition(other, keyring.STATE_PREVIOUS)
+        self._transition(entry, keyring.STATE_ACTIVE)
+
+    def _retire(self, kid, **options):
+        entry = self._entry(kid)
+        if entry["state"] == keyring.STATE_ACTIVE:
+            raise CommandError("The active key cannot be retired; activate another key first.")
+        self._transition(entry, keyring.STATE_RETIRED)
+
+    # --- helpers -------------------------------------------------------------
+
+    def _entry(self, kid: str) -> dict:
+        for entry in self.manifest["keys"]:
+            if entry["kid"] == kid:
+                return entry
+        raise CommandError(f"Unknown kid {kid!r}.")
+
+    def _add_key(self, kid: str, private_key) -> None:
+        from cryptography.hazmat.primitives import serialization
+
+        if not KID_PATTERN.fullmatch(kid):
+            raise CommandError(f"Key ID {kid!r} may only contain letters, digits, '_' and '-'.")
+        if kid.startswith("-"):
+            raise CommandError(f"Key ID {kid!r} must not start with '-'.")
+        if any(entry["kid"] == kid for entry in self.manifest["keys"]):
+            raise CommandError(f"Key {kid!r} already exists.")
+        path = self.keyring_dir / f"{kid}.pem"
+        # Owner-only from creation: the key is never readable under the umask,
+        # and O_EXCL refuses to overwrite a stray <kid>.pem.
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError as exc:
+            raise CommandError(f"{path} already exists.") from exc
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(
+                private_key.private_bytes(
+                    encoding=serialization.Encoding.PEM,
+                    format=serialization.PrivateFormat.PKCS8,
+                    encryption_algorithm=serialization.NoEncryption(),
+                )
+            )
+        # The first key in an empty keyring signs immediately; later keys are
+        # pre-published as "next" so downstream JWKS caches can warm first.
+        has_active = any(e["state"] == keyring.STATE_ACTIVE for e in self.manifest["keys"])
+        entry = {
+            "kid": kid,
+            "state": None,
+            "alg": algorithm_for_key(private_key),
+            "created_at": timezone.now().isoformat(),
+        }
+        self.manifest["keys"].append(entry)
+        self._transition(entry, keyring.STATE_NEXT if has_active else keyring.STATE_ACTIVE)
+
+    def _transition(self, entry: dict, state: str) -> None:
+        self.transitions.append((entry["kid"], entry["state"], state))
+        entry["state"] = state
@@ -0,0 +1,27 @@
+from django.db import migrations, models
+
+from authsvc.infrastructure.operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('tokens', '0003_onetimetoken_attempts_refreshtoken_family_id_and_more'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='refreshtoken',
+            index=models.Index(condition=models.Q(('revoked_at__isnull', True)), fields=['user'], name='refreshtoken_user_live_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='refreshtoken',
+            index=models.Index(condition=models.Q(('revoked_at__isnull', True)), fields=['session'], name='refreshtoken_session_live_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='refreshtoken',
+            index=models.Index(condition=models.Q(('revoked_at__isnull', True)), fields=['family_id'], name='refreshtoken_family_live_idx'),
+        ),
+    ]
@@ -17,6 +17,15 @@ class RefreshToken(models.Model):
     expires_at = models.DateTimeField()
     revoked_at = models.DateTimeField(null=True, blank=True)
 
+    class Meta:
+        # Live-token lookups for logout-all / reuse detection; partial so they
+        # only hold the (small) set of unrevoked rows.
+        indexes = [
+            models.Index(fields=["user"], condition=models.Q(revoked_at__isnull=True), name="refreshtoken_user_live_idx"),
+            models.Index(fields=["session"], condition=models.Q(revoked_at__isnull=True), name="refreshtoken_session_live_idx"),
+            models.Index(fields=["family_id"], condition=models.Q(revoked_at__isnull=True), name="refreshtoken_family_live_idx"),
+        ]
+
     def save(self, *args, **kwargs):
         if not getattr(self, '_raw_token', None) and not self.pk:
             raw_token = secure_random_token()
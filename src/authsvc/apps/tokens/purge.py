@@ -0,0 +1,132 @@
+"""Batched deletion of dead token rows.
+
+Every refresh inserts a ``RefreshToken`` row and nothing else ever removes
+them, so without a purge the token tables (and their unique ``token`` indexes)
+grow without bound. Rows become eligible once they have been expired, revoked
+or consumed for ``TOKEN_PURGE_RETENTION_DAYS``; the retention keeps recently
+revoked refresh tokens around so replaying one still trips reuse detection
+instead of looking like an unknown token.
+
+Deletion walks the primary key in ascending batches (keyset pagination: each
+batch starts after the last id seen, so no OFFSET and no rescans) and each
+batch is its own short transaction, which keeps row locks brief and makes the
+job safe to run alongside production traffic.
+
+When ``tokens_refreshtoken`` is partitioned (``manage.py
+refresh_token_partitions``), refresh tokens are left to partition drops and
+only the other tables are purged here.
+"""
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from authsvc.apps.accounts.models import EmailOTP
+from authsvc.apps.tokens.models import OneTimeToken, RefreshToken
+from authsvc.infrastructure.partitioning import is_partitioned
+
+
+@dataclass
+class PurgeResult:
+    label: str
+    deleted: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.deleted / self.seconds if self.seconds else 0.0
+
+
+def partition_retention() -> timedelta:
+    """How long a refresh-token partition outlives its last possible insert."""
+    return timedelta(
+        seconds=settings.JWT_REFRESH_TTL_SECONDS,
+        days=settings.TOKEN_PURGE_RETENTION_DAYS,
+    )
+
+
+def _targets(cutoff):
+    """``(label, model, filter)`` for each purgeable table."""
+    targets = []
+    if not is_partitioned(RefreshToken._meta.db_table):
+        targets.append(
+            (
+                "refresh_tokens",
+                RefreshToken,
+                Q(expires_at__lt=cutoff) | Q(revoked_at__lt=cutoff),
+            )
+        )
+    return targets + [
+        (
+            "one_time_tokens",
+            OneTimeToken,
+            Q(expires_at__lt=cutoff) | Q(consumed_at__lt=cutoff),
+        ),
+        ("email_otps", EmailOTP, Q(expires_at__lt=cutoff)),
+    ]
+
+
+def _delete_batch(model, ids: list) -> int:
+    # For refresh tokens, replaced_by is SET_NULL: survivors whose successor
+    # is in this batch (a chain cut mid-way) are unlinked by the same
+    # collector in one UPDATE ... WHERE replaced_by_id IN (batch).
+    with transaction.atomic():
+        _, per_model = model.objects.filter(pk__in=ids).delete()
+    return per_model.get(model._meta.label, 0)
+
+
+def purge_tokens(
+    *,
+    retention_days: float | None = None,
+    batch_size: int | None = None,
+    pause: float | None = None,
+    max_seconds: float | None = None,
+    dry_run: bool = False,
+) -> list[PurgeResult]:
+    """Delete expired/revoked/consumed token rows older than the retention.
+
+    ``pause`` sleeps between batches to leave room for foreground traffic;
+    ``max_seconds`` stops early (the next run picks up where this one left
+    off, since eligibility is recomputed). ``dry_run`` only counts.
+    """
+    if retention_days is None:
+        retention_days = settings.TOKEN_PURGE_RETENTION_DAYS
+    if batch_size is None:
+        batch_size = settings.TOKEN_PURGE_BATCH_SIZE
+    if pause is None:
+        pause = settings.TOKEN_PURGE_BATCH_PAUSE_SECONDS
+    cutoff = timezone.now() - timedelta(days=retention_days)
+    deadline = time.monotonic() + max_seconds if max_seconds else None
+
+    results = []
+    for label, model, condition in _targets(cutoff):
+        result = PurgeResult(label)
+        results.append(result)
+        queryset = model.objects.filter(condition)
+        if dry_run:
+            result.deleted = queryset.count()
+            continue
+
+        start = time.monotonic()
+        last_id = None
+        while deadline is None or time.monotonic() < deadline:
+            page = queryset.order_by("pk")
+            if last_id is not None:
+                page = page.filter(pk__gt=last_id)
+            ids = list(page.values_list("pk", flat=True)[:batch_size])
+            if not ids:
+                break
+            last_id = ids[-1]
+            result.deleted += _delete_batch(model, ids)
+            result.batches += 1
+            if len(ids) < batch_size:
+                break
+            if pause:
+                time.sleep(pause)
+        result.seconds = time.monotonic() - start
+    return results
@@ -0,0 +1,331 @@
+"""Redis-backed refresh-token store.
+
+Takes refresh rotation, the highest-QPS write path, off PostgreSQL. Keys
+(``REFRESH_TOKEN_REDIS_PREFIX``, default ``authsvc:rt``)::
+
+    <prefix>:tok:<sha256>     hash: user, session, sid, family, created,
+                              expires, revoked, successor, ip, ua
+    <prefix>:fam:<family>     set of token hashes in a family (= one session)
+    <prefix>:user:<user pk>   set of the user's family ids
+
+Every key expires ``JWT_REFRESH_TTL_SECONDS + TOKEN_PURGE_RETENTION_DAYS``
+after its last write, so revoked tokens are kept (for reuse detection) exactly
+as long as the database purge keeps them, and nothing needs deleting.
+
+Rotation is one Lua script: it checks and claims the presented token and
+writes its successor atomically, so of two concurrent rotations exactly one
+wins and the other sees a revoked token (reuse, or the grace window). The
+scripts build family/user key names at run time, so they need a single Redis
+node (or a proxy that routes all keys of the prefix to one shard).
+
+With ``REFRESH_TOKEN_WRITE_BEHIND`` every issue/rotation/revocation is also
+mirrored into the ``RefreshToken`` table by a Celery task, for audit and
+reporting; Redis stays the source of truth.
+"""
+import logging
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+
+from django.conf import settings
+
+from authsvc.apps.accounts.models import User, UserSession
+from authsvc.apps.common.security import secure_random_token, sha256_hex
+from authsvc.apps.tokens.stores import (
+    RefreshTokenStore,
+    announce_revoked_sessions,
+    client_meta,
+    grace_successor,
+    mint_access_token,
+    record_reuse,
+    refresh_ttl,
+    remember_successor,
+)
+
+logger = logging.getLogger(__name__)
+
+# KEYS: presented token, successor token.
+# ARGV: prefix, now, successor hash, successor expiry, key ttl, ip, ua.
+ROTATE_SCRIPT = """
+local f = redis.call('HMGET', KEYS[1], 'user', 'session', 'sid', 'family',
+                     'expires', 'revoked', 'successor', 'created', 'ip', 'ua')
+if not f[1] then
+  return {'missing'}
+end
+if f[6] and f[6] ~= '' then
+  return {'revoked', f[1], f[2], f[3], f[4], f[6], f[7] or ''}
+end
+if tonumber(f[5]) <= tonumber(ARGV[2]) then
+  return {'expired', f[1], f[2], f[3], f[4]}
+end
+redis.call('HSET', KEYS[1], 'revoked', ARGV[2], 'successor', ARGV[3])
+redis.call('HSET', KEYS[2], 'user', f[1], 'session', f[2], 'sid', f[3],
+           'family', f[4], 'created', ARGV[2], 'expires', ARGV[4],
+           'revoked', '', 'successor', '', 'ip', ARGV[6], 'ua', ARGV[7])
+redis.call('EXPIRE', KEYS[2], ARGV[5])
+local family = ARGV[1] .. ':fam:' .. f[4]
+redis.call('SADD', family, ARGV[3])
+redis.call('EXPIRE', family, ARGV[5])
+redis.call('EXPIRE', ARGV[1] .. ':user:' .. f[1], ARGV[5])
+return {'ok', f[1], f[2], f[3], f[4], f[5], f[8] or '', f[9] or '', f[10] or ''}
+"""
+
+# Revoke every live token of the given families (ARGV[3..]) or, with no
+# families, of the user whose set key is KEYS[1]. Returns one
+# {hash, user, session, family, created, expires, ip, ua} per revoked token.
+# ARGV: prefix, now, family...
+REVOKE_SCRIPT = """
+local families = {}
+for i = 3, #ARGV do
+  families[#families + 1] = ARGV[i]
+end
+if #families == 0 and KEYS[1] then
+  families = redis.call('SMEMBERS', KEYS[1])
+end
+local revoked = {}
+for _, family in ipairs(families) do
+  for _, h in ipairs(redis.call('SMEMBERS', ARGV[1] .. ':fam:' .. family)) do
+    local key = ARGV[1] .. ':tok:' .. h
+    if redis.call('HGET', key, 'revoked') == '' then
+      redis.call('HSET', key, 'revoked', ARGV[2])
+      local t = redis.call('HMGET', key, 'user', 'session', 'family', 'created',
+                           'expires', 'ip', 'ua')
+      revoked[#revoked + 1] = {h, t[1], t[2], t[3], t[4], t[5], t[6] or '', t[7] or ''}
+    end
+  end
+end
+return revoked
+"""
+
+
+@dataclass
+class RevokedRefreshToken:
+    user: object
+    session: object
+
+
+def _text(value) -> str:
+    return value.decode() if isinstance(value, bytes) else str(value)
+
+
+def _iso(epoch: float | str) -> str:
+    return datetime.fromtimestamp(float(epoch), UTC).isoformat()
+
+
+def _snapshot(
+    token_hash, user_id, session_pk, family, created, expires, ip, ua,
+    *, revoked_at=None, replaced_by=None,
+) -> dict:
+    """One token as ``mirror_refresh_tokens`` writes it (JSON-serializable)."""
+    return {
+        "token": token_hash,
+        "user_id": int(user_id),
+        "session_id": int(session_pk),
+        "family_id": family,
+        "created_at": _iso(created),
+        "expires_at": _iso(expires),
+        "revoked_at": None if revoked_at is None else _iso(revoked_at),
+        "replaced_by": replaced_by,
+        "ip_address": ip or None,
+        "user_agent": ua or None,
+    }
+
+
+class RedisRefreshTokenStore(RefreshTokenStore):
+    def __init__(self):
+        self._client = None
+        self._rotate = None
+        self._revoke = None
+
+    # --- plumbing ------------------------------------------------------------
+
+    @property
+    def prefix(self) -> str:
+        return getattr(settings, "REFRESH_TOKEN_REDIS_PREFIX", "authsvc:rt")
+
+    def _redis(self):
+        if self._client is None:
+            import redis
+
+            url = getattr(settings, "REFRESH_TOKEN_REDIS_URL", "") or settings.CACHES[
+                "default"
+            ]["LOCATION"]
+            self._client = redis.Redis.from_url(url, socket_timeout=2, socket_connect_timeout=2)
+            self._rotate = self._client.register_script(ROTATE_SCRIPT)
+            self._revoke = self._client.register_script(REVOKE_SCRIPT)
+        return self._client
+
+    def _token_key(self, token_hash: str) -> str:
+        return f"{self.prefix}:tok:{token_hash}"
+
+    @staticmethod
+    def _key_ttl() -> int:
+        return refresh_ttl() + int(settings.TOKEN_PURGE_RETENTION_DAYS * 86400)
+
+    def _is_live(self, token_hash: str) -> bool:
+        return self._redis().hget(self._token_key(token_hash), "revoked") == b""
+
+    def _revoke_families(self, families: list[str] = (), *, user_id=None) -> list[str]:
+        self._redis()
+        keys = [f"{self.prefix}:user:{user_id}"] if user_id is not None else []
+        now = time.time()
+        revoked = [
+            [_text(v) for v in fields]
+            for fields in self._revoke(keys=keys, args=[self.prefix, now, *families])
+        ]
+        self._mirror(revoked=[_snapshot(*fields, revoked_at=now) for fields in revoked])
+        return [fields[0] for fields in revoked]
+
+    def _mirror(self, *, issued=(), revoked=()) -> None:
+        if not getattr(settings, "REFRESH_TOKEN_WRITE_BEHIND", False) or not (issued or revoked):
+            return
+        from authsvc.apps.tokens.tasks import mirror_refresh_tokens
+
+        try:
+            mirror_refresh_tokens.delay(list(issued), list(revoked))
+        except Exception:
+            # Reporting copy only; Redis already holds the authoritative state.
+            logger.warning("Could not enqueue refresh-token write-behind", exc_info=True)
+
+    # --- store API -----------------------------------------------------------
+
+    def issue(self, user, session, *, ip_address=None, user_agent=None) -> str:
+        raw = secure_random_token()
+        token_hash = sha256_hex(raw)
+        family = str(uuid.uuid4())
+        now = time.time()
+        ttl = self._key_ttl()
+        token_key = self._token_key(token_hash)
+        family_key = f"{self.prefix}:fam:{family}"
+        user_key = f"{self.prefix}:user:{user.pk}"
+
+        pipe = self._redis().pipeline(transaction=True)
+        pipe.hset(
+            token_key,
+            mapping={
+                "user": user.pk,
+                "session": session.pk,
+                "sid": str(session.session_id),
+                "family": family,
+                "created": now,
+                "expires": now + refresh_ttl(),
+                "revoked": "",
+                "successor": "",
+                "ip": ip_address or "",
+                "ua": user_agent or "",
+            },
+        )
+        pipe.expire(token_key, ttl)
+        pipe.sadd(family_key, token_hash)
+        pipe.expire(family_key, ttl)
+        pipe.sadd(user_key, family)
+        pipe.expire(user_key, ttl)
+        pipe.execute()
+
+        self._mirror(
+            issued=[
+                _snapshot(
+                    token_hash, user.pk, session.pk, family, now, now + refresh_ttl(),
+                    ip_address, user_agent,
+                )
+            ]
+        )
+        return raw
+
+    def rotate(self, token_str: str, request) -> tuple[object, str, str]:
+        """Rotate with one Lua call; the database is only read (user + session)."""
+        token_hash = sha256_hex(token_str)
+        new_raw = secure_random_token()
+        new_hash = sha256_hex(new_raw)
+        ip_address, user_agent = client_meta(request)
+        now = time.time()
+
+        self._redis()
+        result = [
+            _text(v)
+            for v in self._rotate(
+                keys=[self._token_key(token_hash), self._token_key(new_hash)],
+                args=[
+                    self.prefix,
+                    now,
+                    new_hash,
+                    now + refresh_ttl(),
+                    self._key_ttl(),
+                    ip_address or "",
+                    user_agent or "",
+                ],
+            )
+        ]
+        status = result[0]
+        if status == "missing":
+            raise ValueError("Token not found")
+        user_id, session_pk, session_uuid, family = result[1:5]
+        if status == "expired":
+            raise ValueError("Token expired")
+
+        session = (
+            UserSession.objects.select_related("user").filter(pk=session_pk).first()
+        )
+        user = session.user if session else User.objects.get(pk=user_id)
+
+        if status == "revoked":
+            pair = grace_successor(
+                token_str,
+                token_hash,
+                successor_id=result[6] or None,
+                revoked_at=datetime.fromtimestamp(float(result[5]), UTC),
+                is_live=self._is_live,
+                # The winner caches the pair only after this script returned
+                # to it, so give it a moment rather than calling this reuse.
+                wait=timedelta(seconds=getattr(settings, "REFRESH_REUSE_GRACE_WAIT_SECONDS", 0.5)),
+            )
+            if pair is not None:
+                return user, *pair
+            self._end_session(family, session)
+            record_reuse(user, session or user, request)
+            raise ValueError("Token revoked (reuse detected)")
+
+        if session is None or not session.is_active:
+            self._end_session(family, session)
+            raise ValueError("Session inactive")
+
+        access = mint_access_token(user, session_uuid)
+        remember_successor(token_str, token_hash, new_hash, access, new_raw)
+        expires, created, old_ip, old_ua = result[5:9]
+        self._mirror(
+            issued=[
+                _snapshot(
+                    new_hash, user_id, session_pk, family, now, now + refresh_ttl(),
+                    ip_address, user_agent,
+                )
+            ],
+            revoked=[
+                _snapshot(
+                    token_hash, user_id, session_pk, family, created, expires, old_ip, old_ua,
+                    revoked_at=now, replaced_by=new_hash,
+                )
+            ],
+        )
+        return user, access, new_raw
+
+    def revoke(self, token_str: str):
+        fields = self._redis().hmget(self._token_key(sha256_hex(token_str)), "user", "session", "family")
+        if fields[0] is None:
+            return None
+        user_id, session_pk, family = (_text(v) for v in fields)
+        self._revoke_families([family])
+        session = UserSession.objects.select_related("user").filter(pk=session_pk).first()
+        user = session.user if session else User.objects.get(pk=user_id)
+        return RevokedRefreshToken(user=user, session=session)
+
+    def revoke_all(self, user) -> None:
+        self._revoke_families(user_id=user.pk)
+
+    def _end_session(self, family: str, session) -> None:
+        """Reuse detection / dead session: revoke the family and its session."""
+        self._revoke_families([family])
+        if session is not None and session.is_active:
+            session.is_active = False
+            session.save(update_fields=["is_active"])
+            announce_revoked_sessions([session.session_id])
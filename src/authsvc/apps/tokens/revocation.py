@@ -0,0 +1,158 @@
+"""Revoked-session list for instant access-token invalidation.
+
+Access tokens are verified statelessly, so revoking a session (logout,
+logout-all, password change/reset, refresh-token reuse) would otherwise leave
+its access tokens usable until ``exp``. Revoked session ids are kept in a
+Redis sorted set (score = expiry) and announced on a pub/sub channel; every
+process mirrors them into an in-memory dict so ``AuthBearer`` can reject a
+revoked ``sid`` with an O(1) lookup and no network hop.
+
+An entry is only needed until the last access token carrying that ``sid``
+expires, so entries expire ``JWT_ACCESS_TTL_SECONDS`` after revocation and the
+set stays small. ``SESSION_REVOCATION_BACKEND = "local"`` keeps the list in
+process memory only (tests, single-process dev).
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections.abc import Iterable
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+REDIS_KEY = "authsvc:revoked_sessions"
+CHANNEL = "authsvc:revoked_sessions"
+
+
+class RevokedSessions:
+    def __init__(self):
+        self._expiry: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._listener_pid: int | None = None
+        self._client = None
+
+    # --- hot path ------------------------------------------------------------
+
+    def is_revoked(self, session_id: str | None) -> bool:
+        if not session_id:
+            return False
+        self._ensure_listener()
+        expiry = self._expiry.get(session_id)
+        if expiry is None:
+            return False
+        if expiry <= time.time():
+            self._expiry.pop(session_id, None)
+            return False
+        return True
+
+    # --- writes --------------------------------------------------------------
+
+    def revoke(self, session_ids: Iterable) -> None:
+        """Mark sessions revoked here and announce them to every process."""
+        expiry = time.time() + settings.JWT_ACCESS_TTL_SECONDS
+        entries = {str(sid): expiry for sid in session_ids}
+        if not entries:
+            return
+        self._apply(entries)
+        if self._backend() != "redis":
+            return
+        try:
+            client = self._redis()
+            pipe = client.pipeline()
+            pipe.zadd(REDIS_KEY, entries)
+            pipe.zremrangebyscore(REDIS_KEY, "-inf", time.time())
+            pipe.publish(CHANNEL, json.dumps(entries))
+            pipe.execute()
+        except Exception:
+            # Refresh tokens and sessions are already revoked in the DB; only
+            # the early access-token cut-off on other processes is lost.
+            logger.exception("Could not publish %d session revocation(s)", len(entries))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._expiry.clear()
+
+    # --- internals -----------------------------------------------------------
+
+    def _apply(self, entries: dict[str, float]) -> None:
+        now = time.time()
+        with self._lock:
+            for sid, expiry in entries.items():
+                if expiry > now:
+                    self._expiry[sid] = max(expiry, self._expiry.get(sid, 0))
+
+    def _prune(self) -> None:
+        now = time.time()
+        with self._lock:
+            for sid in [sid for sid, expiry in self._expiry.items() if expiry <= now]:
+                del self._expiry[sid]
+
+    @staticmethod
+    def _backend() -> str:
+        return getattr(settings, "SESSION_REVOCATION_BACKEND", "redis")
+
+    @staticmethod
+    def _redis_url() -> str:
+        return getattr(settings, "SESSION_REVOCATION_REDIS_URL", "") or settings.CACHES[
+            "default"
+        ]["LOCATION"]
+
+    def _redis(self):
+        if self._client is None:
+            import redis
+
+            self._client = redis.Redis.from_url(
+                self._redis_url(), socket_timeout=1, socket_connect_timeout=1
+            )
+        return self._client
+
+    def _ensure_listener(self) -> None:
+        # One listener thread per process, (re)started lazily after a fork.
+        if self._listener_pid == os.getpid() or self._backend() != "redis":
+            return
+        with self._lock:
+            if self._listener_pid == os.getpid():
+                return
+            self._listener_pid = os.getpid()
+            self._client = None
+        threading.Thread(target=self._listen, name="session-revocations", daemon=True).start()
+
+    def _listen(self) -> None:
+        backoff = 1.0
+        while True:
+            pubsub = None
+            try:
+                import redis
+
+                client = redis.Redis.from_url(self._redis_url(), socket_connect_timeout=1)
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                # Subscribe before the snapshot so nothing published in
+                # between is missed.
+                pubsub.subscribe(CHANNEL)
+                snapshot = client.zrangebyscore(REDIS_KEY, time.time(), "+inf", withscores=True)
+                self._apply({sid.decode(): score for sid, score in snapshot})
+                backoff = 1.0
+                last_prune = time.monotonic()
+                while True:
+                    message = pubsub.get_message(timeout=5.0)
+                    if message and message["type"] == "message":
+                        self._apply(json.loads(message["data"]))
+                    if time.monotonic() - last_prune > 60:
+                        self._prune()
+                        last_prune = time.monotonic()
+            except Exception:
+                logger.warning("Session revocation listener disconnected; retrying", exc_info=True)
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+
+
+revoked_sessions = RevokedSessions()
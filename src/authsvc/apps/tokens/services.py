@@ -1,31 +1,29 @@
 from datetime import timedelta
 
 from django.conf import settings
-from django.db import transaction
 from django.utils import timezone
 from ninja.errors import HttpError
 
 from authsvc.apps.accounts.models import UserSession
-from authsvc.apps.audit.models import AuditEvent
-from authsvc.apps.audit.services import record_event
-from authsvc.apps.common.security import make_access_jwt, sha256_hex
-from authsvc.apps.tokens.models import OneTimeToken, RefreshToken
+from authsvc.apps.common.offload import run_cpu
+from authsvc.apps.common.security import jwt_verify
+from authsvc.apps.tokens.models import OneTimeToken
+from authsvc.apps.tokens.stores import (
+    announce_revoked_sessions,
+    client_meta,
+    get_refresh_token_store,
+    mint_access_token,
+)
 
 
-def _client_meta(request):
-    """Extract (ip_address, user_agent) from a request, tolerating None."""
-    if not request:
-        return None, None
-    return request.META.get("REMOTE_ADDR"), request.META.get("HTTP_USER_AGENT")
-
 def issue_token_pair(user, request) -> tuple[str, str]:
     """Create a brand-new session with an access token + refresh token.
 
     Used at login / email-verification (a fresh authentication). Returns the
-    *raw* refresh token, which is the only time it is ever available — the DB
-    only stores its SHA-256 hash.
+    *raw* refresh token, which is the only time it is ever available — the
+    store only keeps its SHA-256 hash.
     """
-    ip_address, user_agent = _client_meta(request)
+    ip_address, user_agent = client_meta(request)
 
     # Create Session
     session = UserSession.objects.create(
@@ -34,146 +32,108 @@ def issue_token_pair(user, request) -> tuple[str, str]:
         user_agent=user_agent
     )
 
-    # 1. Create access token
-    access = make_access_jwt(
-        user_uuid=str(user.uuid),
-        email=user.email,
-        roles=["user"] if user.is_active else [],
-        session_id=str(session.session_id)
+    access = mint_access_token(user, session.session_id)
+    raw_refresh = get_refresh_token_store().issue(
+        user, session, ip_address=ip_address, user_agent=user_agent
     )
+    return access, raw_refresh
 
-    # 2. Create refresh token
-    refresh_ttl = getattr(settings, "JWT_REFRESH_TTL_SECONDS", 2592000)
-    expires_at = timezone.now() + timedelta(seconds=refresh_ttl)
-
-    refresh_obj = RefreshToken.objects.create(
-        user=user,
-        session=session,
-        expires_at=expires_at,
-        ip_address=ip_address,
-        user_agent=user_agent
+async def aissue_token_pair(user, request) -> tuple[str, str]:
+    """``issue_token_pair`` for async views; the access token is signed on the CPU pool."""
+    ip_address, user_agent = client_meta(request)
+    session = await UserSession.objects.acreate(
+        user=user, ip_address=ip_address, user_agent=user_agent
     )
+    access = await run_cpu(mint_access_token, user, session.session_id)
+    raw_refresh = await get_refresh_token_store().aissue(
+        user, session, ip_address=ip_address, user_agent=user_agent
+    )
+    return access, raw_refresh
 
-    return access, refresh_obj.raw_token
-
-def _revoke_family(refresh_obj) -> None:
-    """Reuse detection: kill the whole session/family the token belongs to."""
-    session = refresh_obj.session
-    if session:
-        session.is_active = False
-        session.save(update_fields=["is_active"])
-        session.refresh_tokens.filter(revoked_at__isnull=True).update(revoked_at=timezone.now())
-    elif refresh_obj.family_id:
-        RefreshToken.objects.filter(
-            family_id=refresh_obj.family_id, revoked_at__isnull=True
-        ).update(revoked_at=timezone.now())
-    else:
-        revoke_all_refresh_tokens(refresh_obj.user)
+def rotate_refresh_token(token_str: str, request) -> tuple[object, str, str]:
+    """Rotate a refresh token within its existing session.
 
+    Returns ``(user, access_token, new_raw_refresh_token)``; raises ValueError
+    for invalid tokens. Reuse of an already-rotated token revokes the session
+    (see ``RefreshTokenStore.rotate``).
+    """
+    return get_refresh_token_store().rotate(token_str, request)
 
-def rotate_refresh_token(token_str: str, request) -> tuple[object, str, str]:
-    """Atomically rotate a refresh token within its existing session.
+async def arotate_refresh_token(token_str: str, request) -> tuple[object, str, str]:
+    return await get_refresh_token_store().arotate(token_str, request)
 
-    Concurrency-safe: the matching row is locked with ``select_for_update`` so
-    two simultaneous rotations of the same token cannot both succeed — the
-    loser sees the (now-revoked) token and triggers reuse detection.
+def revoke_refresh_token(token_str: str):
+    """Log out: revoke the token and end its session.
 
-    Returns ``(user, access_token, new_raw_refresh_token)``.
+    Returns the revoked token (with ``user`` and ``session``) or None.
     """
-    token_hash = sha256_hex(token_str)
-    refresh_ttl = getattr(settings, "JWT_REFRESH_TTL_SECONDS", 2592000)
+    refresh_obj = get_refresh_token_store().revoke(token_str)
+    if refresh_obj is not None and refresh_obj.session:
+        refresh_obj.session.is_active = False
+        refresh_obj.session.save()
+        announce_revoked_sessions([refresh_obj.session.session_id])
+    return refresh_obj
 
-    with transaction.atomic():
+def revoke_all_refresh_tokens(user):
+    get_refresh_token_store().revoke_all(user)
+    active_sessions = user.sessions.filter(is_active=True)
+    session_ids = list(active_sessions.values_list("session_id", flat=True))
+    active_sessions.update(is_active=False)
+    announce_revoked_sessions(session_ids)
+
+def _verified_payloads(tokens: list[str]) -> list[dict | None]:
+    payloads = []
+    for token in tokens:
         try:
-            refresh_obj = RefreshToken.objects.select_for_update().get(token=token_hash)
-        except RefreshToken.DoesNotExist:
-            raise ValueError("Token not found")
-
-        if refresh_obj.is_revoked:
-            # A revoked token is being presented again -> reuse detected. Revoke
-            # the family here (committed on block exit); the ValueError is raised
-            # *after* the transaction so the revocation is not rolled back.
-            _revoke_family(refresh_obj)
-            reused = True
+            payload = jwt_verify(token)
+        except Exception:
+            payload = None
+        # MFA challenge tokens are signed by the same key but are not bearer
+        # credentials.
+        if payload is not None and payload.get("purpose"):
+            payload = None
+        payloads.append(payload)
+    return payloads
+
+def _live_session_query(payloads):
+    session_ids = {p["sid"] for p in payloads if p is not None and p.get("sid")}
+    if not session_ids:
+        return None
+    return UserSession.objects.filter(
+        session_id__in=session_ids, is_active=True
+    ).values_list("session_id", flat=True)
+
+def _introspection_results(payloads, live_sessions) -> list[dict]:
+    results = []
+    for payload in payloads:
+        if payload is None or (payload.get("sid") and payload["sid"] not in live_sessions):
+            results.append({"active": False})
         else:
-            reused = False
-            if refresh_obj.is_expired:
-                raise ValueError("Token expired")
-
-            session = refresh_obj.session
-            if session and not session.is_active:
-                raise ValueError("Session inactive")
-
-            # Revoke the presented token.
-            refresh_obj.revoked_at = timezone.now()
-            refresh_obj.save(update_fields=["revoked_at"])
-
-            user = refresh_obj.user
-            ip_address, user_agent = _client_meta(request)
-
-            if not session:
-                session = UserSession.objects.create(
-                    user=user, ip_address=ip_address, user_agent=user_agent
-                )
-
-            # One replacement refresh token, same family + session.
-            new_refresh = RefreshToken.objects.create(
-                user=user,
-                session=session,
-                family_id=refresh_obj.family_id,
-                expires_at=timezone.now() + timedelta(seconds=refresh_ttl),
-                ip_address=ip_address,
-                user_agent=user_agent,
-            )
-            refresh_obj.replaced_by = new_refresh
-            refresh_obj.save(update_fields=["replaced_by"])
-
-            # One access token, bound to the continuing session.
-            access = make_access_jwt(
-                user_uuid=str(user.uuid),
-                email=user.email,
-                roles=["user"] if user.is_active else [],
-                session_id=str(session.session_id),
-            )
-
-    if reused:
-        record_event(
-            AuditEvent.EventType.REFRESH_TOKEN_REUSE,
-            result=AuditEvent.Result.FAILURE,
-            actor=refresh_obj.user,
-            target=refresh_obj.session or refresh_obj.user,
-            request=request,
-            metadata={"action": "session_revoked"},
-        )
-        record_event(
-            AuditEvent.EventType.SESSION_REVOCATION,
-            actor=refresh_obj.user,
-            target=refresh_obj.session or refresh_obj.user,
-            request=request,
-            metadata={"reason": "refresh_token_reuse"},
-        )
-        raise ValueError("Token revoked (reuse detected)")
-
-    return user, access, new_refresh.raw_token
+            results.append({"active": True, "token_type": "access_token", **payload})
+    return results
 
-def revoke_refresh_token(token_str: str):
-    from authsvc.apps.common.security import sha256_hex
-    try:
-        refresh_obj = RefreshToken.objects.get(token=sha256_hex(token_str))
-        refresh_obj.revoked_at = timezone.now()
-        refresh_obj.save()
-        
-        if refresh_obj.session:
-            refresh_obj.session.is_active = False
-            refresh_obj.session.save()
-        return refresh_obj
-    except RefreshToken.DoesNotExist:
-        return None
+def introspect_tokens(tokens: list[str]) -> list[dict]:
+    """RFC 7662-style introspection of first-party access tokens, in order.
 
-def revoke_all_refresh_tokens(user):
-    revoked_at = timezone.now()
-    user.refresh_tokens.filter(revoked_at__isnull=True).update(revoked_at=revoked_at)
-    user.sessions.filter(is_active=True).update(is_active=False)
+    Each token is signature/claim-verified locally; the liveness of every
+    referenced session is then checked with ONE query, however many tokens
+    are in the batch. Inactive tokens are reported as ``{"active": False}``
+    only, without saying why.
+    """
+    payloads = _verified_payloads(tokens)
+    query = _live_session_query(payloads)
+    live_sessions = {str(sid) for sid in query} if query is not None else set()
+    return _introspection_results(payloads, live_sessions)
+
+async def aintrospect_tokens(tokens: list[str]) -> list[dict]:
+    """``introspect_tokens`` for async views; batches are verified on the CPU pool."""
+    if len(tokens) > 1:
+        payloads = await run_cpu(_verified_payloads, tokens)
+    else:
+        payloads = _verified_payloads(tokens)
+    query = _live_session_query(payloads)
+    live_sessions = {str(sid) async for sid in query} if query is not None else set()
+    return _introspection_results(payloads, live_sessions)
 
 def create_one_time_token(user, purpose: str, ttl_minutes: int = 30) -> str:
     expires_at = timezone.now() + timedelta(minutes=ttl_minutes)
@@ -0,0 +1,443 @@
+"""Refresh-token storage backends.
+
+``issue_token_pair``, ``rotate_refresh_token``, ``revoke_refresh_token`` and
+``revoke_all_refresh_tokens`` (``tokens.services``) delegate token state to
+the store named by ``REFRESH_TOKEN_STORE``:
+
+* ``DatabaseRefreshTokenStore`` (default) — the ``RefreshToken`` table.
+* ``authsvc.apps.tokens.redis_store.RedisRefreshTokenStore`` — Redis, with
+  rotation and reuse detection in one Lua script.
+
+Sessions (``UserSession``) stay in the database for every store: they are
+written once per login, carry the ``sid`` of access tokens and drive the
+revoked-session list.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import time
+import uuid
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from authsvc.apps.accounts.models import User, UserSession
+from authsvc.apps.audit.models import AuditEvent
+from authsvc.apps.audit.services import record_event
+from authsvc.apps.common.security import make_access_jwt, sha256_hex
+from authsvc.apps.tokens.models import RefreshToken
+from authsvc.apps.tokens.revocation import revoked_sessions
+
+logger = logging.getLogger(__name__)
+
+
+def client_meta(request):
+    """Extract (ip_address, user_agent) from a request, tolerating None."""
+    if not request:
+        return None, None
+    return request.META.get("REMOTE_ADDR"), request.META.get("HTTP_USER_AGENT")
+
+
+def refresh_ttl() -> int:
+    return getattr(settings, "JWT_REFRESH_TTL_SECONDS", 2592000)
+
+
+def mint_access_token(user, session_uuid) -> str:
+    """One access token, bound to the (continuing) session."""
+    return make_access_jwt(
+        user_uuid=str(user.uuid),
+        email=user.email,
+        roles=["user"] if user.is_active else [],
+        session_id=str(session_uuid),
+    )
+
+
+def announce_revoked_sessions(session_ids) -> None:
+    """Cut off the sessions' access tokens once the revocation is committed."""
+    session_ids = list(session_ids)
+    if session_ids:
+        transaction.on_commit(lambda: revoked_sessions.revoke(session_ids))
+
+
+def record_reuse(user, target, request) -> None:
+    record_event(
+        AuditEvent.EventType.REFRESH_TOKEN_REUSE,
+        result=AuditEvent.Result.FAILURE,
+        actor=user,
+        target=target,
+        request=request,
+        metadata={"action": "session_revoked"},
+    )
+    record_event(
+        AuditEvent.EventType.SESSION_REVOCATION,
+        actor=user,
+        target=target,
+        request=request,
+        metadata={"reason": "refresh_token_reuse"},
+    )
+
+
+# --- Reuse grace window ------------------------------------------------------
+
+def _grace_key(token_hash: str) -> str:
+    return f"refresh_grace:{token_hash}"
+
+
+def _grace_cipher(token_str: str):
+    from cryptography.fernet import Fernet
+
+    # Keyed by the *raw* presented token, which is never stored anywhere: the
+    # cache holds only ciphertext under the token's hash, so a cache dump does
+    # not yield usable tokens.
+    secret = hmac.new(token_str.encode(), b"refresh-grace", hashlib.sha256).digest()
+    return Fernet(base64.urlsafe_b64encode(secret))
+
+
+def remember_successor(token_str, token_hash, successor_id, access, raw_refresh) -> None:
+    """Cache the pair issued for ``token_str`` for ``REFRESH_REUSE_GRACE_SECONDS``."""
+    grace = getattr(settings, "REFRESH_REUSE_GRACE_SECONDS", 0)
+    if grace <= 0:
+        return
+    blob = json.dumps({"id": successor_id, "access": access, "refresh": raw_refresh})
+    try:
+        cache.set(
+            _grace_key(token_hash),
+            _grace_cipher(token_str).encrypt(blob.encode()).decode(),
+            timeout=grace,
+        )
+    except Exception:
+        # Without the entry a retry is treated as reuse, as before.
+        logger.warning("Could not cache refresh successor", exc_info=True)
+
+
+def grace_successor(
+    token_str, token_hash, *, successor_id, revoked_at, is_live, wait=None
+) -> tuple[str, str] | None:
+    """``(access, raw_refresh)`` already issued for a just-rotated token, if any.
+
+    Only honoured when the token was revoked *by rotation* (it has a
+    successor) less than ``REFRESH_REUSE_GRACE_SECONDS`` ago and
+    ``is_live(successor_id)`` holds, so a retry racing its own refresh gets the
+    same answer while a replay after logout, after the successor was used, or
+    after the window is still reuse.
+
+    ``wait`` polls the cache for that long when the winning rotation may not
+    have cached its pair yet (stores that claim outside a row lock).
+    """
+    from cryptography.fernet import InvalidToken
+
+    grace = getattr(settings, "REFRESH_REUSE_GRACE_SECONDS", 0)
+    if (
+        grace <= 0
+        or successor_id is None
+        or revoked_at is None
+        or timezone.now() - revoked_at > timedelta(seconds=grace)
+    ):
+        return None
+    deadline = time.monotonic() + (wait.total_seconds() if wait else 0)
+    while True:
+        try:
+            blob = cache.get(_grace_key(token_hash))
+        except Exception:
+            logger.warning("Could not read refresh successor", exc_info=True)
+            return None
+        if blob is not None:
+            break
+        if time.monotonic() >= deadline:
+            return None
+        time.sleep(0.02)
+    try:
+        entry = json.loads(_grace_cipher(token_str).decrypt(blob.encode()))
+    except (InvalidToken, ValueError):
+        return None
+    if entry["id"] != successor_id or not is_live(successor_id):
+        return None
+    return entry["access"], entry["refresh"]
+
+
+# --- Store interface ---------------------------------------------------------
+
+class RefreshTokenStore:
+    """Where refresh tokens live. Raw tokens are never stored, only SHA-256 hashes."""
+
+    def issue(self, user, session, *, ip_address=None, user_agent=None) -> str:
+        """Store a new token family for a fresh ``session``; return the raw token."""
+        raise NotImplementedError
+
+    def rotate(self, token_str: str, request) -> tuple[object, str, str]:
+        """Exchange a live token for ``(user, access_token, new_raw_refresh_token)``.
+
+        Raises ValueError for unknown, expired or revoked tokens and inactive
+        sessions; presenting an already-rotated token (outside the grace
+        window) revokes its whole session first.
+        """
+        raise NotImplementedError
+
+    def revoke(self, token_str: str):
+        """Revoke one token; return an object with ``user`` and ``session``, or None."""
+        raise NotImplementedError
+
+    def revoke_all(self, user) -> None:
+        """Revoke every live token of ``user``."""
+        raise NotImplementedError
+
+    # Async views call these. Rotation needs a transaction, which the async
+    # ORM does not offer, so by default both run the sync method in the
+    # request's thread-sensitive executor.
+
+    async def aissue(self, user, session, *, ip_address=None, user_agent=None) -> str:
+        return await sync_to_async(self.issue)(
+            user, session, ip_address=ip_address, user_agent=user_agent
+        )
+
+    async def arotate(self, token_str: str, request) -> tuple[object, str, str]:
+        return await sync_to_async(self.rotate)(token_str, request)
+
+
+class DatabaseRefreshTokenStore(RefreshTokenStore):
+    """Refresh tokens as ``RefreshToken`` rows (the default)."""
+
+    def issue(self, user, session, *, ip_address=None, user_agent=None) -> str:
+        refresh_obj = RefreshToken.objects.create(
+            user=user,
+            session=session,
+            expires_at=timezone.now() + timedelta(seconds=refresh_ttl()),
+            ip_address=ip_address,
+            user_agent=user_agent,
+        )
+        return refresh_obj.raw_token
+
+    async def aissue(self, user, session, *, ip_address=None, user_agent=None) -> str:
+        refresh_obj = await RefreshToken.objects.acreate(
+            user=user,
+            session=session,
+            expires_at=timezone.now() + timedelta(seconds=refresh_ttl()),
+            ip_address=ip_address,
+            user_agent=user_agent,
+        )
+        return refresh_obj.raw_token
+
+    def rotate(self, token_str: str, request) -> tuple[object, str, str]:
+        """Atomically rotate a refresh token within its existing session.
+
+        The common case is three statements: a conditional claim
+        (``_claim_refresh_token``), the successor INSERT and the
+        ``replaced_by`` link. Anything the claim does not match takes the
+        original path below.
+
+        Concurrency-safe: the matching row is locked (by the claim's UPDATE,
+        or ``select_for_update``) so two simultaneous rotations of the same
+        token cannot both succeed — the loser sees the (now-revoked) token and
+        triggers reuse detection, unless it arrives within
+        ``REFRESH_REUSE_GRACE_SECONDS`` of the rotation, in which case it gets
+        the same successor pair (see ``grace_successor``).
+        """
+        token_hash = sha256_hex(token_str)
+
+        with transaction.atomic():
+            now = timezone.now()
+            claimed = _claim_refresh_token(token_hash, now)
+            if claimed is not None:
+                token_id, family_id, user, session = claimed
+                ip_address, user_agent = client_meta(request)
+                new_refresh = RefreshToken(
+                    user_id=user.pk,
+                    session_id=session.pk,
+                    family_id=family_id,
+                    expires_at=now + timedelta(seconds=refresh_ttl()),
+                    ip_address=ip_address,
+                    user_agent=user_agent,
+                )
+                new_refresh.save()
+                RefreshToken.objects.filter(pk=token_id).update(replaced_by_id=new_refresh.pk)
+                access = mint_access_token(user, session.session_id)
+                # Cached before commit so a concurrent retry blocked on the row
+                # lock finds it; a rolled-back successor fails the liveness check.
+                remember_successor(
+                    token_str, token_hash, new_refresh.pk, access, new_refresh.raw_token
+                )
+
+        if claimed is not None:
+            return user, access, new_refresh.raw_token
+
+        with transaction.atomic():
+            try:
+                refresh_obj = RefreshToken.objects.select_for_update().get(token=token_hash)
+            except RefreshToken.DoesNotExist:
+                raise ValueError("Token not found")
+
+            if refresh_obj.is_revoked:
+                successor = grace_successor(
+                    token_str,
+                    token_hash,
+                    successor_id=refresh_obj.replaced_by_id,
+                    revoked_at=refresh_obj.revoked_at,
+                    is_live=lambda pk: RefreshToken.objects.filter(
+                        pk=pk, revoked_at__isnull=True, session__is_active=True
+                    ).exists(),
+                )
+                if successor is not None:
+                    return refresh_obj.user, *successor
+                # A revoked token is being presented again -> reuse detected.
+                # Revoke the family here (committed on block exit); the
+                # ValueError is raised *after* the transaction so the
+                # revocation is not rolled back.
+                self._revoke_family(refresh_obj)
+                reused = True
+            else:
+                reused = False
+                if refresh_obj.is_expired:
+                    raise ValueError("Token expired")
+
+                session = refresh_obj.session
+                if session and not session.is_active:
+                    raise ValueError("Session inactive")
+
+                # Revoke the presented token.
+                refresh_obj.revoked_at = timezone.now()
+                refresh_obj.save(update_fields=["revoked_at"])
+
+                user = refresh_obj.user
+                ip_address, user_agent = client_meta(request)
+
+                if not session:
+                    session = UserSession.objects.create(
+                        user=user, ip_address=ip_address, user_agent=user_agent
+                    )
+
+                # One replacement refresh token, same family + session.
+                new_refresh = RefreshToken.objects.create(
+                    user=user,
+                    session=session,
+                    family_id=refresh_obj.family_id,
+                    expires_at=timezone.now() + timedelta(seconds=refresh_ttl()),
+                    ip_address=ip_address,
+                    user_agent=user_agent,
+                )
+                refresh_obj.replaced_by = new_refresh
+                refresh_obj.save(update_fields=["replaced_by"])
+
+                access = mint_access_token(user, session.session_id)
+                remember_successor(
+                    token_str, token_hash, new_refresh.pk, access, new_refresh.raw_token
+                )
+
+        if reused:
+            record_reuse(refresh_obj.user, refresh_obj.session or refresh_obj.user, request)
+            raise ValueError("Token revoked (reuse detected)")
+
+        return user, access, new_refresh.raw_token
+
+    def revoke(self, token_str: str):
+        try:
+            refresh_obj = RefreshToken.objects.get(token=sha256_hex(token_str))
+        except RefreshToken.DoesNotExist:
+            return None
+        refresh_obj.revoked_at = timezone.now()
+        refresh_obj.save()
+        return refresh_obj
+
+    def revoke_all(self, user) -> None:
+        user.refresh_tokens.filter(revoked_at__isnull=True).update(revoked_at=timezone.now())
+
+    def _revoke_family(self, refresh_obj) -> None:
+        """Reuse detection: kill the whole session/family the token belongs to."""
+        session = refresh_obj.session
+        if session:
+            session.is_active = False
+            session.save(update_fields=["is_active"])
+            session.refresh_tokens.filter(revoked_at__isnull=True).update(
+                revoked_at=timezone.now()
+            )
+            announce_revoked_sessions([session.session_id])
+        elif refresh_obj.family_id:
+            RefreshToken.objects.filter(
+                family_id=refresh_obj.family_id, revoked_at__isnull=True
+            ).update(revoked_at=timezone.now())
+        else:
+            from authsvc.apps.tokens.services import revoke_all_refresh_tokens
+
+            revoke_all_refresh_tokens(refresh_obj.user)
+
+
+# Backends whose UPDATE supports RETURNING. features.can_return_columns_from_insert
+# alone is not enough: MariaDB has INSERT ... RETURNING but no UPDATE ...
+# RETURNING. SQLite gained both in 3.35, which that flag still tracks there.
+UPDATE_RETURNING_VENDORS = frozenset({"postgresql", "sqlite"})
+
+
+def _claim_refresh_token(token_hash: str, now):
+    """Revoke a live refresh token in ONE statement and return what rotation needs.
+
+    ``UPDATE ... WHERE revoked_at IS NULL AND expires_at > now AND <session
+    active> RETURNING ...`` both claims the token (the row lock makes a
+    concurrent claimer re-check the WHERE and match nothing) and fetches the
+    user/session columns, replacing the SELECT FOR UPDATE, the revoke save and
+    the lazy ``.user`` / ``.session`` loads.
+
+    Returns ``(token_id, family_id, user, session)`` — user and session are
+    partially loaded instances — or None when the token is unknown, expired,
+    already revoked, session-less or its session inactive. The caller then
+    falls back to the locking path, which classifies the failure (including
+    reuse detection). Other backends always take that path.
+    """
+    if (
+        connection.vendor not in UPDATE_RETURNING_VENDORS
+        or not connection.features.can_return_columns_from_insert
+    ):
+        return None
+    qn = connection.ops.quote_name
+    rt = qn(RefreshToken._meta.db_table)
+    us = qn(UserSession._meta.db_table)
+    u = qn(User._meta.db_table)
+    sql = f"""
+        UPDATE {rt} SET revoked_at = %s
+        WHERE token = %s AND revoked_at IS NULL AND expires_at > %s
+          AND session_id IN (SELECT id FROM {us} WHERE is_active = %s)
+        RETURNING id, family_id, user_id, session_id,
+          (SELECT {us}.session_id FROM {us} WHERE {us}.id = {rt}.session_id),
+          (SELECT {u}.uuid FROM {u} WHERE {u}.id = {rt}.user_id),
+          (SELECT {u}.email FROM {u} WHERE {u}.id = {rt}.user_id),
+          (SELECT {u}.is_active FROM {u} WHERE {u}.id = {rt}.user_id)
+    """
+    db_now = connection.ops.adapt_datetimefield_value(now)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [db_now, token_hash, db_now, True])
+        row = cursor.fetchone()
+    if row is None:
+        return None
+
+    token_id, family_id, user_id, session_pk, session_uuid, user_uuid, email, is_active = row
+    user = User.from_db(
+        connection.alias,
+        ["id", "uuid", "email", "is_active"],
+        [user_id, uuid.UUID(str(user_uuid)), email, bool(is_active)],
+    )
+    session = UserSession.from_db(
+        connection.alias,
+        ["id", "user_id", "session_id", "is_active"],
+        [session_pk, user_id, uuid.UUID(str(session_uuid)), True],
+    )
+    family_id = uuid.UUID(str(family_id)) if family_id is not None else None
+    return token_id, family_id, user, session
+
+
+_stores: dict[str, RefreshTokenStore] = {}
+
+
+def get_refresh_token_store() -> RefreshTokenStore:
+    """The configured store (``REFRESH_TOKEN_STORE``), one instance per process."""
+    path = getattr(
+        settings, "REFRESH_TOKEN_STORE", "authsvc.apps.tokens.stores.DatabaseRefreshTokenStore"
+    )
+    store = _stores.get(path)
+    if store is None:
+        store = _stores[path] = import_string(path)()
+    return store
@@ -0,0 +1,104 @@
+"""Periodic token-table maintenance (Celery beat) and the Redis-store write-behind."""
+import logging
+
+from celery import shared_task
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from authsvc.infrastructure import partitioning
+
+from .models import RefreshToken
+from .purge import partition_retention, purge_tokens
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def purge_expired_tokens():
+    # Bounded below the task soft time limit; leftovers go in the next run.
+    results = purge_tokens(max_seconds=settings.TOKEN_PURGE_MAX_SECONDS)
+    for result in results:
+        logger.info(
+            "Purged %d %s in %.2fs (%.0f rows/s)",
+            result.deleted,
+            result.label,
+            result.seconds,
+            result.rows_per_second,
+        )
+    return {result.label: result.deleted for result in results}
+
+
+@shared_task
+def maintain_refresh_token_partitions():
+    """Roll refresh-token partitions forward; a no-op unless partitioning is enabled."""
+    table = RefreshToken._meta.db_table
+    if not partitioning.is_partitioned(table):
+        return None
+    created, dropped = partitioning.maintain_partitions(
+        table,
+        months_ahead=settings.REFRESH_TOKEN_PARTITION_MONTHS_AHEAD,
+        keep=partition_retention(),
+        now=timezone.now(),
+    )
+    if created or dropped:
+        logger.info("Refresh-token partitions created=%s dropped=%s", created, dropped)
+    return {"created": created, "dropped": dropped}
+
+
+def _from_snapshot(snap: dict) -> RefreshToken:
+    return RefreshToken(
+        token=snap["token"],
+        user_id=snap["user_id"],
+        session_id=snap["session_id"],
+        family_id=snap["family_id"],
+        created_at=parse_datetime(snap["created_at"]),
+        expires_at=parse_datetime(snap["expires_at"]),
+        revoked_at=parse_datetime(snap["revoked_at"]) if snap.get("revoked_at") else None,
+        ip_address=snap["ip_address"],
+        user_agent=snap["user_agent"],
+    )
+
+
+@shared_task
+def mirror_refresh_tokens(issued, revoked):
+    """Copy Redis-store refresh-token changes into ``RefreshToken`` (write-behind).
+
+    Both lists hold full token snapshots; ``revoked`` ones also carry
+    ``revoked_at`` and, after a rotation, the successor's hash in
+    ``replaced_by``. Batches may be redelivered or run out of order (a
+    token's revocation before its issue), so a snapshot is inserted, with its
+    own ``created_at`` and revocation, when its row is missing, and otherwise
+    only fills an empty ``revoked_at`` / ``replaced_by``. Redis revokes a
+    token at most once, so the stored row converges on its state whatever
+    the order.
+    """
+    snapshots = {snap["token"]: snap for snap in issued}
+    snapshots.update((snap["token"], snap) for snap in revoked)
+    existing = set(
+        RefreshToken.objects.filter(token__in=list(snapshots)).values_list("token", flat=True)
+    )
+    missing = [_from_snapshot(snap) for token, snap in snapshots.items() if token not in existing]
+    if missing:
+        created_at = {obj.token: obj.created_at for obj in missing}
+        RefreshToken.objects.bulk_create(missing, ignore_conflicts=True)
+        # bulk_create stamps auto_now_add fields; restore the issue times.
+        rows = list(RefreshToken.objects.filter(token__in=list(created_at)).only("pk", "token"))
+        for row in rows:
+            row.created_at = created_at[row.token]
+        RefreshToken.objects.bulk_update(rows, ["created_at"])
+
+    by_time: dict[str, list[str]] = {}
+    for snap in revoked:
+        if snap["token"] in existing:
+            by_time.setdefault(snap["revoked_at"], []).append(snap["token"])
+    for revoked_at, hashes in by_time.items():
+        RefreshToken.objects.filter(token__in=hashes, revoked_at__isnull=True).update(
+            revoked_at=parse_datetime(revoked_at)
+        )
+    for snap in revoked:
+        if snap.get("replaced_by"):
+            RefreshToken.objects.filter(token=snap["token"], replaced_by__isnull=True).update(
+                replaced_by=RefreshToken.objects.filter(token=snap["replaced_by"]).values("pk")[:1]
+            )
+    return len(issued), len(revoked)
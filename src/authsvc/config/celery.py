@@ -1,6 +1,7 @@
 import os
 
 from celery import Celery
+from celery.signals import worker_process_shutdown
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "authsvc.config.settings.dev")
 
@@ -8,3 +9,11 @@ app = Celery("authsvc")
 # All Celery settings live in Django settings under the CELERY_ namespace.
 app.config_from_object("django.conf:settings", namespace="CELERY")
 app.autodiscover_tasks()
+
+
+@worker_process_shutdown.connect
+def flush_audit_events(**kwargs):
+    # Tasks record audit events too; write any still buffered in this child.
+    from authsvc.apps.audit import writer
+
+    writer.flush()
@@ -0,0 +1,90 @@
+"""PostgreSQL ``DATABASES`` entries: a per-process psycopg pool, or persistent connections.
+
+Opening a connection (TCP + TLS + auth) costs more than most queries the
+service runs, so requests should never pay for it. ``database_settings``
+builds ``DATABASES["default"]`` for one of two modes:
+
+* ``pool=True`` (default; Django 5.1+): Django's psycopg 3 pool (``psycopg_pool``). Each
+  process keeps ``min_size``..``max_size`` open connections shared by all its
+  threads, and a request borrows one and returns it at the end. This is the
+  only mode that suits ASGI, where the threads serving requests come and go.
+  A request that finds all ``max_size`` connections busy waits up to
+  ``timeout`` seconds and then fails.
+* ``pool=False``: persistent per-thread connections kept for ``conn_max_age``
+  seconds (WSGI only).
+
+The pool defaults (2..10 connections, 10 s wait) are starting points, not
+measured values: ``scripts/bench_db_pool.py`` has only been compared with and
+without a pool, never across pool sizes or under production load. Size
+``max_size`` from the process count and Postgres ``max_connections``, and
+watch ``authsvc_db_pool{stat="requests_waiting"}`` to tune it.
+
+``health_checks`` sets ``CONN_HEALTH_CHECKS``. With the pool this checks each
+connection as it is borrowed, so one killed by a failover or an idle timeout
+is replaced rather than handed to a request.
+
+``replica_databases`` adds the read replicas that
+``authsvc.infrastructure.database.ReplicaRouter`` routes to.
+
+The settings import this module, so it must not import application code.
+"""
+import django
+from django.core.exceptions import ImproperlyConfigured
+
+
+def database_settings(
+    *,
+    pool: bool = True,
+    min_size: int = 2,
+    max_size: int = 10,
+    timeout: float = 10.0,
+    max_idle: float = 300.0,
+    max_lifetime: float = 3600.0,
+    conn_max_age: int = 60,
+    health_checks: bool = True,
+    options: dict | None = None,
+    **connection,
+) -> dict:
+    """A PostgreSQL ``DATABASES`` entry; ``connection`` is NAME, USER, HOST, ..."""
+    options = dict(options or {})
+    if pool:
+        if django.VERSION < (5, 1):
+            raise ImproperlyConfigured("DB_POOL=1 needs Django 5.1 or later; set DB_POOL=0.")
+        if not 0 <= min_size <= max_size or max_size < 1:
+            raise ImproperlyConfigured(
+                f"DB_POOL_MIN_SIZE ({min_size}) must be between 0 and DB_POOL_MAX_SIZE ({max_size})."
+            )
+        options["pool"] = {
+            "min_size": min_size,
+            "max_size": max_size,
+            "timeout": timeout,
+            "max_idle": max_idle,
+            "max_lifetime": max_lifetime,
+            "name": "authsvc",
+        }
+    return {
+        "ENGINE": "django.db.backends.postgresql",
+        **connection,
+        # Pooled connections go back to the pool at the end of every request.
+        "CONN_MAX_AGE": 0 if pool else conn_max_age,
+        "CONN_HEALTH_CHECKS": health_checks,
+        "OPTIONS": options,
+    }
+
+
+def replica_databases(primary: dict, hosts: str) -> dict[str, dict]:
+    """``replica_1``, ``replica_2``, ... copies of ``primary`` for ``"host[:port],..."``.
+
+    Each replica gets its own pool. In tests each one mirrors the primary
+    instead of getting a test database of its own.
+    """
+    replicas = {}
+    for i, host in enumerate((h.strip() for h in hosts.split(",") if h.strip()), start=1):
+        name, _, port = host.partition(":")
+        replicas[f"replica_{i}"] = {
+            **primary,
+            "HOST": name,
+            "PORT": port or primary.get("PORT", ""),
+            "TEST": {"MIRROR": "default"},
+        }
+    return replicas
@@ -0,0 +1,26 @@
+"""Gunicorn settings for the ASGI deployment (Uvicorn workers).
+
+    gunicorn authsvc.config.asgi:application -c python:authsvc.config.gunicorn
+
+Each worker is one event loop: the async auth routes (login, refresh,
+introspect, me, MFA verify) hold no thread while waiting on PostgreSQL or
+Redis, and sync routes run in Django's per-request thread. Scale with
+``WEB_CONCURRENCY`` (about one worker per core), not threads.
+"""
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", "3"))
+worker_class = "uvicorn_worker.UvicornWorker"
+timeout = 60
+graceful_timeout = 30
+keepalive = 5
+accesslog = "-"
+errorlog = "-"
+
+
+def worker_exit(server, worker):
+    # Write buffered audit events before the worker process goes away.
+    from authsvc.apps.audit import writer
+
+    writer.flush()
@@ -3,6 +3,8 @@ from pathlib import Path
 
 from dotenv import load_dotenv
 
+from authsvc.config.db import database_settings, replica_databases
+
 BASE_DIR = Path(__file__).resolve().parents[4]  # project root
 # SKIP_DOTENV lets tests reload settings without .env repopulating env vars.
 if os.getenv("SKIP_DOTENV") != "1":
@@ -30,6 +32,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "authsvc.apps.common.throttle.LoginThrottleMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -59,16 +62,31 @@ TEMPLATES = [
 WSGI_APPLICATION = "authsvc.config.wsgi.application"
 ASGI_APPLICATION = "authsvc.config.asgi.application"
 
+# Connections come from a per-process psycopg pool (DB_POOL=1, required under
+# ASGI) or are kept per thread for DB_CONN_MAX_AGE seconds (DB_POOL=0, WSGI);
+# either way requests do not open their own. See config/db.py.
 DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.postgresql",
-        "NAME": os.getenv("DB_NAME", "authdb"),
-        "USER": os.getenv("DB_USER", "authuser"),
-        "PASSWORD": os.getenv("DB_PASSWORD", "authpass"),
-        "HOST": os.getenv("DB_HOST", "db"),
-        "PORT": os.getenv("DB_PORT", "5432"),
-    }
+    "default": database_settings(
+        NAME=os.getenv("DB_NAME", "authdb"),
+        USER=os.getenv("DB_USER", "authuser"),
+        PASSWORD=os.getenv("DB_PASSWORD", "authpass"),
+        HOST=os.getenv("DB_HOST", "db"),
+        PORT=os.getenv("DB_PORT", "5432"),
+        pool=os.getenv("DB_POOL", "1") == "1",
+        min_size=int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+        max_size=int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+        timeout=float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "10")),
+        max_idle=float(os.getenv("DB_POOL_MAX_IDLE_SECONDS", "300")),
+        max_lifetime=float(os.getenv("DB_POOL_MAX_LIFETIME_SECONDS", "3600")),
+        conn_max_age=int(os.getenv("DB_CONN_MAX_AGE", "60")),
+        health_checks=os.getenv("DB_CONN_HEALTH_CHECKS", "1") == "1",
+    )
 }
+# Streaming replicas ("host[:port],..."; same database and credentials). Only
+# views marked @replica_reads read from them; see config/db.py and infrastructure/database.py.
+DATABASES.update(replica_databases(DATABASES["default"], os.getenv("DB_REPLICA_HOSTS", "")))
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != "default"]
+DATABASE_ROUTERS = ["authsvc.infrastructure.database.ReplicaRouter"]
 
 CACHES = {
     "default": {
@@ -88,6 +106,75 @@ AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.NumericPasswordValidator"},
 ]
 
+# Argon2id first; PBKDF2 hashes of existing users still verify and are
+# upgraded at their next login. Cost per hash is set by the ARGON2_* values
+# (calibrate with `manage.py calibrate_password_hasher`); parallelism 1 keeps
+# one hash on one core, the hashing pool below provides the concurrency.
+PASSWORD_HASHERS = [
+    "authsvc.apps.accounts.hashers.Argon2idPasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+]
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", "2"))
+ARGON2_MEMORY_COST_KIB = int(os.getenv("ARGON2_MEMORY_COST_KIB", "19456"))
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", "1"))
+
+# django-ratelimit per-IP limits (and the async routes' equivalent).
+RATELIMIT_ENABLE = os.getenv("RATELIMIT_ENABLE", "1") == "1"
+
+# Login throttling: sliding windows per IP, per account (normalized email)
+# and per (IP, account), checked in middleware before any DB/hash work.
+LOGIN_THROTTLE_ENABLED = os.getenv("LOGIN_THROTTLE_ENABLED", "1") == "1"
+LOGIN_THROTTLE_BACKEND = os.getenv("LOGIN_THROTTLE_BACKEND", "redis")  # or "local"
+LOGIN_THROTTLE_REDIS_URL = os.getenv("LOGIN_THROTTLE_REDIS_URL", "")  # default: cache Redis
+LOGIN_THROTTLE_PATHS = ("/api/v1/auth/login",)
+LOGIN_THROTTLE_IP_RATE = os.getenv("LOGIN_THROTTLE_IP_RATE", "20/15m")
+LOGIN_THROTTLE_ACCOUNT_RATE = os.getenv("LOGIN_THROTTLE_ACCOUNT_RATE", "10/15m")
+LOGIN_THROTTLE_IP_ACCOUNT_RATE = os.getenv("LOGIN_THROTTLE_IP_ACCOUNT_RATE", "5/15m")
+
+# Password hashing runs on a per-process pool (0 = inline in the request
+# thread). At most MAX_PENDING hashes run or wait per process, and each
+# endpoint at most its quota ("endpoint=n,..."); beyond that requests get 503.
+PASSWORD_HASHING_WORKERS = int(os.getenv("PASSWORD_HASHING_WORKERS", "2"))
+PASSWORD_HASHING_MAX_PENDING = int(os.getenv("PASSWORD_HASHING_MAX_PENDING", "8"))
+PASSWORD_HASHING_QUOTAS = {
+    name.strip(): int(size)
+    for name, _, size in (
+        item.partition("=")
+        for item in os.getenv(
+            "PASSWORD_HASHING_QUOTAS",
+            "login=6,register=2,password_change=2,password_reset=2,mfa=2",
+        ).split(",")
+        if item.strip()
+    )
+}
+PASSWORD_HASHING_TIMEOUT_SECONDS = float(os.getenv("PASSWORD_HASHING_TIMEOUT_SECONDS", "5"))
+PASSWORD_HASHING_RETRY_AFTER_SECONDS = int(os.getenv("PASSWORD_HASHING_RETRY_AFTER_SECONDS", "1"))
+
+# Async (ASGI) routes run password hashing and token signing on this many
+# threads per process; keep it above PASSWORD_HASHING_MAX_PENDING so queued
+# hashes never hold up signing.
+ASYNC_CPU_THREADS = int(os.getenv("ASYNC_CPU_THREADS", "10"))
+
+# Audit events are buffered per process and written by a background thread
+# every AUDIT_FLUSH_INTERVAL_SECONDS or AUDIT_FLUSH_BATCH_SIZE events, up to
+# AUDIT_FLUSH_MAX_ROWS per COPY; the listed types are still written before
+# the response. See audit/writer.py.
+AUDIT_BUFFERED = os.getenv("AUDIT_BUFFERED", "1") == "1"
+AUDIT_FLUSH_BATCH_SIZE = int(os.getenv("AUDIT_FLUSH_BATCH_SIZE", "100"))
+AUDIT_FLUSH_MAX_ROWS = int(os.getenv("AUDIT_FLUSH_MAX_ROWS", "5000"))
+AUDIT_FLUSH_INTERVAL_SECONDS = float(os.getenv("AUDIT_FLUSH_INTERVAL_SECONDS", "1"))
+AUDIT_BUFFER_MAX_EVENTS = int(os.getenv("AUDIT_BUFFER_MAX_EVENTS", "10000"))
+AUDIT_DURABLE_EVENT_TYPES = {
+    t.strip()
+    for t in os.getenv(
+        "AUDIT_DURABLE_EVENT_TYPES",
+        "refresh_token_reuse,password_change,password_reset,mfa_removal,account_lock,"
+        "account_suspension,role_change,permission_change,signing_key_change",
+    ).split(",")
+    if t.strip()
+}
+
 LANGUAGE_CODE = "en-us"
 TIME_ZONE = "UTC"
 USE_I18N = True
@@ -134,14 +221,87 @@ CELERY_TASK_TIME_LIMIT = 120
 CELERY_TASK_SOFT_TIME_LIMIT = 90
 CELERY_BROKER_CONNECTION_RETRY_ON_STARTUP = True
 
+# --- Token purge -------------------------------------------------------------
+# Expired/revoked/consumed token rows are deleted this long after they died
+# (recently revoked refresh tokens must survive for reuse detection).
+TOKEN_PURGE_RETENTION_DAYS = float(os.getenv("TOKEN_PURGE_RETENTION_DAYS", "7"))
+TOKEN_PURGE_BATCH_SIZE = int(os.getenv("TOKEN_PURGE_BATCH_SIZE", "1000"))
+TOKEN_PURGE_BATCH_PAUSE_SECONDS = float(os.getenv("TOKEN_PURGE_BATCH_PAUSE_SECONDS", "0.05"))
+# Per beat run; keep below CELERY_TASK_SOFT_TIME_LIMIT.
+TOKEN_PURGE_MAX_SECONDS = float(os.getenv("TOKEN_PURGE_MAX_SECONDS", "60"))
+TOKEN_PURGE_INTERVAL_SECONDS = int(os.getenv("TOKEN_PURGE_INTERVAL_SECONDS", "900"))
+# Optional Postgres partitioning of tokens_refreshtoken by month
+# (`manage.py refresh_token_partitions enable`); upcoming partitions kept ready.
+REFRESH_TOKEN_PARTITION_MONTHS_AHEAD = int(os.getenv("REFRESH_TOKEN_PARTITION_MONTHS_AHEAD", "3"))
+# Optional Postgres partitioning of audit_auditevent by month
+# (`manage.py audit_partitions enable`). Partitions whose events are all older
+# than AUDIT_ARCHIVE_AFTER_DAYS are exported to AUDIT_ARCHIVE_DIR and detached
+# by `audit_partitions archive`; beat only creates upcoming ones.
+AUDIT_PARTITION_MONTHS_AHEAD = int(os.getenv("AUDIT_PARTITION_MONTHS_AHEAD", "3"))
+AUDIT_ARCHIVE_AFTER_DAYS = float(os.getenv("AUDIT_ARCHIVE_AFTER_DAYS", "365"))
+AUDIT_ARCHIVE_DIR = os.getenv("AUDIT_ARCHIVE_DIR", str(BASE_DIR / "archive" / "audit"))
+CELERY_BEAT_SCHEDULE = {
+    "purge-expired-tokens": {
+        "task": "authsvc.apps.tokens.tasks.purge_expired_tokens",
+        "schedule": TOKEN_PURGE_INTERVAL_SECONDS,
+    },
+    # No-op until the table is partitioned.
+    "maintain-refresh-token-partitions": {
+        "task": "authsvc.apps.tokens.tasks.maintain_refresh_token_partitions",
+        "schedule": 24 * 3600,
+    },
+    "maintain-audit-partitions": {
+        "task": "authsvc.apps.audit.tasks.maintain_audit_partitions",
+        "schedule": 24 * 3600,
+    },
+}
+
 JWT_ISSUER = os.getenv("JWT_ISSUER", "auth-service")
 JWT_AUDIENCE = os.getenv("JWT_AUDIENCE", "your-apps")
 JWT_ACCESS_TTL_SECONDS = int(os.getenv("JWT_ACCESS_TTL_SECONDS", "600"))
 JWT_REFRESH_TTL_SECONDS = int(os.getenv("JWT_REFRESH_TTL_SECONDS", "2592000"))
+# Re-presenting a just-rotated refresh token within this many seconds returns
+# the successor already issued for it (concurrent client retries) instead of
+# tripping reuse detection. 0 disables the window.
+REFRESH_REUSE_GRACE_SECONDS = int(os.getenv("REFRESH_REUSE_GRACE_SECONDS", "10"))
+# Where refresh tokens live: the RefreshToken table (default) or
+# "authsvc.apps.tokens.redis_store.RedisRefreshTokenStore" (needs a single,
+# non-clustered Redis; sessions stay in the database either way).
+REFRESH_TOKEN_STORE = os.getenv(
+    "REFRESH_TOKEN_STORE", "authsvc.apps.tokens.stores.DatabaseRefreshTokenStore"
+)
+REFRESH_TOKEN_REDIS_URL = os.getenv("REFRESH_TOKEN_REDIS_URL", "")  # default: cache Redis
+REFRESH_TOKEN_REDIS_PREFIX = os.getenv("REFRESH_TOKEN_REDIS_PREFIX", "authsvc:rt")
+# Mirror Redis-store changes into the RefreshToken table via Celery (reporting only).
+REFRESH_TOKEN_WRITE_BEHIND = os.getenv("REFRESH_TOKEN_WRITE_BEHIND", "0") == "1"
+# Upper bound on tokens per batch call to POST /api/v1/auth/introspect.
+INTROSPECTION_MAX_TOKENS = int(os.getenv("INTROSPECTION_MAX_TOKENS", "100"))
+# How long a verified introspection client secret is trusted before it is
+# hashed again (0 = check the secret on every call).
+INTROSPECTION_CLIENT_CACHE_SECONDS = int(os.getenv("INTROSPECTION_CLIENT_CACHE_SECONDS", "60"))
+# Largest page of GET /api/v1/audit/events (staff only).
+AUDIT_QUERY_MAX_LIMIT = int(os.getenv("AUDIT_QUERY_MAX_LIMIT", "200"))
 OTP_TTL_MINUTES = int(os.getenv("OTP_TTL_MINUTES", "5"))
 ONETIMETOKEN_TTL_MINUTES = int(os.getenv("ONETIMETOKEN_TTL_MINUTES", "15"))
 JWT_PRIVATE_KEY_PATH = os.getenv("JWT_PRIVATE_KEY_PATH", str(BASE_DIR / "keys/jwt_private.pem"))
 JWT_PUBLIC_KEY_PATH = os.getenv("JWT_PUBLIC_KEY_PATH", str(BASE_DIR / "keys/jwt_public.pem"))
+# Parsed signing keys are cached per process; the key files are re-stat'ed at
+# most this often and reloaded only when they change (SIGHUP forces a reload).
+JWT_KEY_RELOAD_CHECK_SECONDS = float(os.getenv("JWT_KEY_RELOAD_CHECK_SECONDS", "5"))
+# Optional multi-key keyring (keyring.json + <kid>.pem) enabling zero-downtime
+# rotation via `manage.py signing_keys`. Empty = single key from the paths above.
+JWT_KEYRING_DIR = os.getenv("JWT_KEYRING_DIR", "")
+# Per-process LRU of verified bearer tokens (entries live until the token's
+# exp). 0 disables the cache.
+AUTH_TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "10000"))
+# Revoked session ids are shared via Redis pub/sub so every process rejects
+# their access tokens immediately ("local" = this process only).
+SESSION_REVOCATION_BACKEND = os.getenv("SESSION_REVOCATION_BACKEND", "redis")
+SESSION_REVOCATION_REDIS_URL = os.getenv("SESSION_REVOCATION_REDIS_URL", "")  # default: cache Redis
+# Cache-Control for /.well-known/jwks.json. Pre-publish a "next" key at least
+# max-age + stale-while-revalidate before activating it.
+JWKS_CACHE_MAX_AGE_SECONDS = int(os.getenv("JWKS_CACHE_MAX_AGE_SECONDS", "300"))
+JWKS_STALE_WHILE_REVALIDATE_SECONDS = int(os.getenv("JWKS_STALE_WHILE_REVALIDATE_SECONDS", "600"))
 
 FRONTEND_RESET_PASSWORD_URL = os.getenv("FRONTEND_RESET_PASSWORD_URL", "http://localhost/reset-password?token={token}")
 FRONTEND_VERIFY_EMAIL_URL = os.getenv("FRONTEND_VERIFY_EMAIL_URL", "http://localhost/verify-email?token={token}")
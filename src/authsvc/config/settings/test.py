@@ -20,6 +20,11 @@ if os.getenv("TEST_DATABASE") != "postgres":
         }
     }
 
+# A mirror of "default" for routing tests; replica reads are enabled per test
+# by overriding DATABASE_REPLICAS.
+DATABASES["replica"] = {**DATABASES["default"], "TEST": {"MIRROR": "default"}}
+DATABASE_REPLICAS = []
+
 # Capture mail via the in-memory provider; run Celery tasks inline.
 EMAIL_PROVIDER = "inmemory"
 EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
@@ -29,6 +34,8 @@ CELERY_TASK_EAGER_PROPAGATES = True
 # Rate limiting depends on a shared cache and would interfere with rapid test
 # calls; disable it so tests exercise business logic, not throttling.
 RATELIMIT_ENABLE = False
+LOGIN_THROTTLE_ENABLED = False
+LOGIN_THROTTLE_BACKEND = "local"
 CACHES = {
     "default": {
         "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
@@ -36,5 +43,13 @@ CACHES = {
     }
 }
 
-# Fast password hashing for tests.
+# Write audit events immediately so tests can assert on them; the buffered
+# writer is tested with AUDIT_BUFFERED overridden.
+AUDIT_BUFFERED = False
+
+# Keep the revoked-session list in process memory (no Redis pub/sub listener).
+SESSION_REVOCATION_BACKEND = "local"
+
+# Fast password hashing for tests, inline (no process pool).
 PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+PASSWORD_HASHING_WORKERS = 0
@@ -4,3 +4,8 @@ from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "authsvc.config.settings.dev")
 application = get_wsgi_application()
+
+from authsvc.apps.common.keyring import install_key_reload_signal  # noqa: E402
+
+# `kill -HUP <worker>` reloads JWT signing keys without a restart.
+install_key_reload_signal()
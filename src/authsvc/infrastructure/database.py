@@ -1,2 +1,166 @@
-# Database connection helpers
-pass
+"""Database runtime helpers: pool stats in /metrics, COPY ingestion, replica routing.
+
+``DATABASES`` itself is built by ``authsvc.config.db`` (pooled or persistent
+connections, read replicas), which the settings import without loading any
+application code.
+
+``pool_stats`` reports each process's pool counters, and ``/metrics`` serves
+them as ``authsvc_db_pool{alias,stat}``.
+
+``copy_insert`` writes many rows with one ``COPY ... FROM STDIN`` for
+append-only, high-volume tables such as the audit log.
+
+Read replicas (``ReplicaRouter``) are opt-in per view.
+Only reads inside ``replica_reads`` go to a replica. Everything else stays on
+the primary, including credential checks and token flows, where a lagging
+copy could accept a password or token that was just changed or revoked.
+"""
+import functools
+import itertools
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+
+from authsvc.apps.common.metrics import Gauge, collector
+
+DB_POOL = Gauge(
+    "authsvc_db_pool",
+    "psycopg connection pool statistics for this process, by database alias and stat.",
+)
+
+
+def pool_stats() -> dict[str, dict[str, int]]:
+    """``psycopg_pool`` ``get_stats()`` for every pool this process has opened, by alias.
+
+    Never creates a pool: aliases not yet used (or not pooled) are absent.
+    """
+    from django.db import connections
+
+    stats = {}
+    for alias in connections:
+        pools = getattr(type(connections[alias]), "_connection_pools", None) or {}
+        pool = pools.get(alias)
+        if pool is not None:
+            stats[alias] = pool.get_stats()
+    return stats
+
+
+@collector
+def _collect_pool_stats() -> None:
+    for alias, stats in pool_stats().items():
+        for stat, value in stats.items():
+            DB_POOL.set(value, alias=alias, stat=stat)
+
+
+# --- Bulk ingestion -------------------------------------------------------------
+
+def copy_insert(model, objs, *, using: str = "default") -> int:
+    """INSERT ``objs`` with one ``COPY ... FROM STDIN``; ``bulk_create`` off PostgreSQL.
+
+    COPY streams rows without a statement per row or a bind parameter per
+    value. Whether that beats ``bulk_create`` for audit batches has not been
+    measured yet (``scripts/bench_audit_ingest.py`` compares the two on
+    PostgreSQL). Like ``bulk_create`` it skips ``save()`` and signals, so every
+    field must already hold its final value (model defaults are applied when
+    the instance is built). An auto-increment primary key is left to the
+    database. Returns the number of rows written.
+    """
+    from django.db import connections, transaction
+
+    objs = list(objs)
+    if not objs:
+        return 0
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        model._default_manager.using(using).bulk_create(objs)
+        return len(objs)
+    fields = [f for f in model._meta.concrete_fields if f is not model._meta.auto_field]
+    quote = connection.ops.quote_name
+    sql = "COPY {} ({}) FROM STDIN".format(
+        quote(model._meta.db_table), ", ".join(quote(f.column) for f in fields)
+    )
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        with cursor.copy(sql) as copy:
+            for obj in objs:
+                copy.write_row(
+                    [f.get_db_prep_save(getattr(obj, f.attname), connection) for f in fields]
+                )
+    return len(objs)
+
+
+# --- Read replicas -------------------------------------------------------------
+
+_replica_reads: ContextVar[bool] = ContextVar("replica_reads", default=False)
+_pinned: ContextVar[bool] = ContextVar("primary_pinned", default=False)
+_round_robin = itertools.count()
+
+
+@contextmanager
+def read_from_replicas():
+    """Let ORM reads in this block go to ``DATABASE_REPLICAS`` until the first write."""
+    reads, pinned = _replica_reads.set(True), _pinned.set(False)
+    try:
+        yield
+    finally:
+        _pinned.reset(pinned)
+        _replica_reads.reset(reads)
+
+
+def replica_reads(view):
+    """View decorator: run ``view`` (sync or async) inside ``read_from_replicas``."""
+    if iscoroutinefunction(view):
+
+        @functools.wraps(view)
+        async def wrapped(*args, **kwargs):
+            with read_from_replicas():
+                return await view(*args, **kwargs)
+
+    else:
+
+        @functools.wraps(view)
+        def wrapped(*args, **kwargs):
+            with read_from_replicas():
+                return view(*args, **kwargs)
+
+    return wrapped
+
+
+class ReplicaRouter:
+    """Round-robin reads over ``DATABASE_REPLICAS`` inside ``read_from_replicas``.
+
+    A read stays on the primary when:
+
+    * it is outside ``read_from_replicas`` (the default);
+    * this scope has already written (read-your-writes: the first write pins
+      the rest of the request to the primary);
+    * the primary is in a transaction, which covers ``select_for_update``
+      and refresh-token rotation;
+    * it follows an object loaded from the primary (``instance`` hint).
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = getattr(settings, "DATABASE_REPLICAS", ())
+        if not replicas or not _replica_reads.get() or _pinned.get():
+            return "default"
+        from django.db import connections
+
+        if connections["default"].in_atomic_block:
+            return "default"
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        return replicas[next(_round_robin) % len(replicas)]
+
+    def db_for_write(self, model, **hints):
+        if _replica_reads.get():
+            _pinned.set(True)
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in getattr(settings, "DATABASE_REPLICAS", ())
@@ -0,0 +1,101 @@
+"""Migration operations that stay safe on large, busy tables."""
+from django.db import NotSupportedError
+from django.db.backends.ddl_references import Table
+from django.db.backends.utils import truncate_name
+from django.db.migrations.operations import AddIndex
+
+from authsvc.infrastructure import partitioning
+
+
+class AddIndexConcurrently(AddIndex):
+    """``AddIndex`` built with ``CREATE INDEX CONCURRENTLY`` on PostgreSQL.
+
+    Writers are not blocked while the index builds, so the migration that uses
+    it must set ``atomic = False``. PostgreSQL cannot build an index on a
+    partitioned table concurrently, so there the index is created invalid
+    ``ON ONLY`` the parent, built concurrently on each partition and then
+    attached partition by partition; the parent index turns valid with the
+    last one. A rerun after a failed build skips finished partitions and
+    rebuilds an invalid leftover. Other backends (SQLite in tests) get a plain
+    ``CREATE INDEX``.
+
+    Reversing drops the index. On a partitioned table that is a plain
+    ``DROP INDEX``, which also drops every partition's index.
+    """
+
+    def _postgres(self, schema_editor) -> bool:
+        connection = schema_editor.connection
+        if connection.vendor != "postgresql":
+            return False
+        if connection.in_atomic_block:
+            raise NotSupportedError(
+                "AddIndexConcurrently cannot run inside a transaction; set atomic = False."
+            )
+        return True
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if not self.allow_migrate_model(schema_editor.connection.alias, model):
+            return
+        if not self._postgres(schema_editor):
+            schema_editor.add_index(model, self.index)
+        elif partitioning.is_partitioned(model._meta.db_table, schema_editor.connection.alias):
+            self._add_to_partitioned(schema_editor, model)
+        else:
+            schema_editor.add_index(model, self.index, concurrently=True)
+
+    def _add_to_partitioned(self, schema_editor, model):
+        table = model._meta.db_table
+        alias = schema_editor.connection.alias
+        qn = schema_editor.quote_name
+        children = partitioning.child_tables(table, alias)
+        nested = [name for name, partitioned in children if partitioned]
+        if nested:
+            raise NotSupportedError(
+                f"AddIndexConcurrently does not handle sub-partitioned tables ({', '.join(nested)})."
+            )
+
+        parent = self.index.create_sql(model, schema_editor)
+        template = parent.template.replace(
+            "CREATE INDEX %(name)s ON %(table)s", "CREATE INDEX IF NOT EXISTS %(name)s ON ONLY %(table)s"
+        )
+        if template == parent.template:
+            raise NotSupportedError(f"Unexpected CREATE INDEX template: {parent.template!r}")
+        parent.template = template
+        schema_editor.execute(parent)
+        for child, _ in children:
+            name = truncate_name(f"{child}_{self.index.name}", 63)
+            valid = self._index_validity(schema_editor, name)
+            if valid is False:
+                schema_editor.execute(f"DROP INDEX CONCURRENTLY {qn(name)}")
+            if not valid:
+                statement = self.index.create_sql(model, schema_editor, concurrently=True)
+                statement.parts["table"] = Table(child, qn)
+                statement.parts["name"] = qn(name)
+                schema_editor.execute(statement)
+            schema_editor.execute(f"ALTER INDEX {qn(self.index.name)} ATTACH PARTITION {qn(name)}")
+
+    @staticmethod
+    def _index_validity(schema_editor, name: str) -> bool | None:
+        """None if index ``name`` does not exist, else whether it is valid."""
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(%s)",
+                [schema_editor.quote_name(name)],
+            )
+            row = cursor.fetchone()
+        return None if row is None else row[0]
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if not self.allow_migrate_model(schema_editor.connection.alias, model):
+            return
+        if self._postgres(schema_editor) and not partitioning.is_partitioned(
+            model._meta.db_table, schema_editor.connection.alias
+        ):
+            schema_editor.remove_index(model, self.index, concurrently=True)
+        else:
+            schema_editor.remove_index(model, self.index)
+
+    def describe(self):
+        return "Concurrently " + super().describe().lower()
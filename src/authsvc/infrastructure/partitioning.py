@@ -0,0 +1,401 @@
+"""PostgreSQL monthly range partitioning for append-mostly tables.
+
+A partitioned table keeps one child table per calendar month of its partition
+key, so retention becomes ``DETACH PARTITION`` + ``DROP TABLE`` (no row-by-row
+DELETE, no vacuum debt) instead of a purge. Append-only tables can stop at
+``detach_partition`` and keep the detached table (or its archive).
+
+``partition_existing_table`` converts a live table without rewriting it: the
+current table is adopted as a single ``<table>_legacy`` partition covering
+everything before ``cutoff``, and new monthly partitions take over from there.
+All slow work (index builds, the range CHECK validation that lets ATTACH skip
+its scan) happens up front under non-blocking locks; the switchover itself is
+one short transaction of catalog-only statements.
+
+PostgreSQL requires a partitioned table's primary key to include the partition
+key, so the primary key becomes ``(id, <key>)`` (a serial id keeps counting
+from one shared sequence; a UUID id needs nothing), unique constraints on other
+columns become plain indexes (composite, partial and expression indexes are
+kept as they are), and self-referencing foreign keys are dropped
+(Django still maintains them, e.g. ``on_delete=SET_NULL``). Tables referenced
+by other tables' foreign keys cannot be converted.
+"""
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.backends.utils import truncate_name
+
+_BOUND_RE = re.compile(r"FROM \((.+?)\) TO \((.+?)\)")
+
+
+@dataclass(frozen=True)
+class Partition:
+    name: str
+    lower: datetime | None  # None = MINVALUE (an adopted legacy table)
+    upper: datetime
+
+
+def month_floor(dt: datetime) -> datetime:
+    return dt.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(dt: datetime, months: int) -> datetime:
+    years, month = divmod(dt.month - 1 + months, 12)
+    return dt.replace(year=dt.year + years, month=month + 1)
+
+
+def partition_name(table: str, start: datetime) -> str:
+    return f"{table}_p{start:%Y%m}"
+
+
+def expired_partitions(
+    partitions: list[Partition], *, keep: timedelta, now: datetime
+) -> list[Partition]:
+    """Partitions whose every row is older than ``keep`` (by partition key)."""
+    return [p for p in partitions if p.upper + keep <= now]
+
+
+def _identifier(*parts: str) -> str:
+    return truncate_name("_".join(parts), 63)
+
+
+def _literal(dt: datetime) -> str:
+    # Bounds are our own computed datetimes, never user input.
+    return f"'{dt.isoformat()}'"
+
+
+def _parse_bound(value: str) -> datetime | None:
+    if value == "MINVALUE":
+        return None
+    return datetime.fromisoformat(value.strip("'"))
+
+
+def is_partitioned(table: str, using: str = DEFAULT_DB_ALIAS) -> bool:
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s))",
+            [table],
+        )
+        return cursor.fetchone()[0]
+
+
+def child_tables(table: str, using: str = DEFAULT_DB_ALIAS) -> list[tuple[str, bool]]:
+    """Every direct partition of ``table`` (DEFAULT included) and whether it is partitioned."""
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT c.relname, c.relkind = 'p'
+            FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = to_regclass(%s)
+            ORDER BY c.relname
+            """,
+            [table],
+        )
+        return cursor.fetchall()
+
+
+def list_partitions(table: str, using: str = DEFAULT_DB_ALIAS) -> list[Partition]:
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+            FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = to_regclass(%s)
+            """,
+            [table],
+        )
+        rows = cursor.fetchall()
+    partitions = []
+    for name, bound in rows:
+        match = _BOUND_RE.search(bound or "")
+        if match is None:  # DEFAULT partition
+            continue
+        partitions.append(
+            Partition(name, _parse_bound(match.group(1)), _parse_bound(match.group(2)))
+        )
+    return sorted(partitions, key=lambda p: p.upper)
+
+
+def create_monthly_partitions(
+    table: str, *, start: datetime, months: int, using: str = DEFAULT_DB_ALIAS
+) -> list[str]:
+    """Create the partitions for ``months`` months from ``start``; skip existing ranges."""
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    existing = list_partitions(table, using)
+    created = []
+    month = month_floor(start)
+    for _ in range(months):
+        upper = add_months(month, 1)
+        overlaps = any(
+            (p.lower is None or p.lower < upper) and month < p.upper for p in existing
+        )
+        if not overlaps:
+            name = partition_name(table, month)
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"CREATE TABLE IF NOT EXISTS {qn(name)} PARTITION OF {qn(table)} "
+                    f"FOR VALUES FROM ({_literal(month)}) TO ({_literal(upper)})"
+                )
+            created.append(name)
+        month = upper
+    return created
+
+
+def detach_partition(
+    table: str, name: str, *, concurrently: bool = True, using: str = DEFAULT_DB_ALIAS
+) -> None:
+    """Detach one partition; it stays behind as a standalone table.
+
+    ``concurrently`` (PostgreSQL 14+) avoids blocking queries on the parent but
+    cannot run inside a transaction block.
+    """
+    qn = connections[using].ops.quote_name
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f"ALTER TABLE {qn(table)} DETACH PARTITION {qn(name)}"
+            + (" CONCURRENTLY" if concurrently else "")
+        )
+
+
+def drop_partition(
+    table: str, name: str, *, concurrently: bool = True, using: str = DEFAULT_DB_ALIAS
+) -> None:
+    """Detach and drop one partition (see ``detach_partition``)."""
+    detach_partition(table, name, concurrently=concurrently, using=using)
+    with connections[using].cursor() as cursor:
+        cursor.execute(f"DROP TABLE {connections[using].ops.quote_name(name)}")
+
+
+def maintain_partitions(
+    table: str,
+    *,
+    months_ahead: int,
+    keep: timedelta,
+    now: datetime,
+    concurrently: bool = True,
+    dry_run: bool = False,
+    using: str = DEFAULT_DB_ALIAS,
+) -> tuple[list[str], list[str]]:
+    """Create upcoming partitions and drop expired ones.
+
+    Returns ``(created, dropped)`` partition names; ``dry_run`` reports the
+    expired partitions without touching anything.
+    """
+    expired = [p.name for p in expired_partitions(list_partitions(table, using), keep=keep, now=now)]
+    if dry_run:
+        return [], expired
+    created = create_monthly_partitions(
+        table, start=now, months=months_ahead + 1, using=using
+    )
+    for name in expired:
+        drop_partition(table, name, concurrently=concurrently, using=using)
+    return created, expired
+
+
+def _has_plain_index(cursor, table: str, column: str) -> bool:
+    """True if ``table`` has a non-unique, default-opclass btree index on ``column`` alone."""
+    cursor.execute(
+        """
+        SELECT EXISTS (
+            SELECT 1
+            FROM pg_index x
+            JOIN pg_class i ON i.oid = x.indexrelid
+            JOIN pg_am am ON am.oid = i.relam
+            JOIN pg_opclass oc ON oc.oid = x.indclass[0]
+            JOIN pg_attribute a ON a.attrelid = x.indrelid AND a.attnum = x.indkey[0]
+            WHERE x.indrelid = to_regclass(%s) AND a.attname = %s
+              AND x.indnatts = 1 AND NOT x.indisunique AND x.indisvalid
+              AND x.indpred IS NULL AND x.indexprs IS NULL
+              AND am.amname = 'btree' AND oc.opcdefault
+        )
+        """,
+        [table, column],
+    )
+    return cursor.fetchone()[0]
+
+
+def _secondary_indexes(cursor, table: str) -> list[tuple[str, str]]:
+    """``(name, "USING ...")`` of non-unique composite, partial or expression indexes."""
+    cursor.execute(
+        """
+        SELECT i.relname, pg_get_indexdef(x.indexrelid)
+        FROM pg_index x
+        JOIN pg_class i ON i.oid = x.indexrelid
+        WHERE x.indrelid = to_regclass(%s) AND NOT x.indisunique AND x.indisvalid
+          AND (x.indnatts > 1 OR x.indpred IS NOT NULL OR x.indexprs IS NOT NULL)
+        """,
+        [table],
+    )
+    return [(name, "USING " + definition.split(" USING ", 1)[1]) for name, definition in cursor.fetchall()]
+
+
+def _constraints(cursor, table: str, contype: str) -> list[tuple[str, str, bool]]:
+    """``(name, definition, self_referencing)`` for the table's constraints of a type."""
+    cursor.execute(
+        """
+        SELECT conname, pg_get_constraintdef(oid), confrelid = conrelid
+        FROM pg_constraint WHERE conrelid = to_regclass(%s) AND contype = %s
+        """,
+        [table, contype],
+    )
+    return cursor.fetchall()
+
+
+def partition_existing_table(
+    model,
+    *,
+    key: str,
+    cutoff: datetime,
+    months_ahead: int = 3,
+    concurrently: bool = True,
+    using: str = DEFAULT_DB_ALIAS,
+) -> None:
+    """Convert ``model``'s table into one range-partitioned by month on ``key``.
+
+    Existing rows (which must all have ``key < cutoff``; use the start of next
+    month, and finish before then — the interim CHECK rejects later rows)
+    become the ``<table>_legacy`` partition. With ``concurrently`` the
+    index builds use ``CREATE INDEX CONCURRENTLY``, so this must then run
+    outside a transaction; pass False to run everything in the caller's
+    transaction (tests, empty tables).
+    """
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        raise ValueError("Partitioning requires PostgreSQL.")
+    qn = connection.ops.quote_name
+    opts = model._meta
+    table = opts.db_table
+    pk = opts.pk.column
+    key_column = opts.get_field(key).column
+    legacy = _identifier(table, "legacy")
+    parent = _identifier(table, "partitioned")
+    sequence = _identifier(table, pk, "pseq")
+    pk_index = _identifier(table, pk, key_column, "uniq")
+    range_check = _identifier(table, "legacy", "range")
+    concurrent = " CONCURRENTLY" if concurrently else ""
+    # Only an auto-increment id needs a sequence shared by all partitions.
+    serial = opts.pk is opts.auto_field
+
+    # Single-column indexes the parent needs: FKs, db_index and unique fields
+    # (uniqueness cannot span partitions without the partition key). The key
+    # keeps its own index only if the model declares one.
+    index_columns = [
+        f.column
+        for f in opts.concrete_fields
+        if not f.primary_key
+        and (f.unique or f.db_index)
+        and (f.column != key_column or f.db_index)
+    ]
+
+    if is_partitioned(table, using):
+        raise ValueError(f"{table} is already partitioned.")
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT conname FROM pg_constraint WHERE confrelid = to_regclass(%s) "
+            "AND conrelid <> confrelid AND contype = 'f'",
+            [table],
+        )
+        referencing = [row[0] for row in cursor.fetchall()]
+        if referencing:
+            raise ValueError(f"{table} is referenced by foreign keys: {', '.join(referencing)}")
+
+        # --- Phase 1: slow preparation under non-blocking locks -------------
+        cursor.execute(
+            f"CREATE UNIQUE INDEX{concurrent} IF NOT EXISTS {qn(pk_index)} "
+            f"ON {qn(table)} ({qn(pk)}, {qn(key_column)})"
+        )
+        for column in index_columns:
+            if not _has_plain_index(cursor, table, column):
+                cursor.execute(
+                    f"CREATE INDEX{concurrent} IF NOT EXISTS "
+                    f"{qn(_identifier(table, column, 'lidx'))} ON {qn(table)} ({qn(column)})"
+                )
+        # A validated CHECK matching the partition bound lets ATTACH skip its
+        # full-table scan; VALIDATE only takes SHARE UPDATE EXCLUSIVE. Leftovers
+        # of an interrupted earlier run are dropped first so it can be retried.
+        cursor.execute(f"ALTER TABLE {qn(table)} DROP CONSTRAINT IF EXISTS {qn(range_check)}")
+        cursor.execute(
+            f"ALTER TABLE {qn(table)} ADD CONSTRAINT {qn(range_check)} CHECK "
+            f"({qn(key_column)} IS NOT NULL AND {qn(key_column)} < {_literal(cutoff)}) NOT VALID"
+        )
+        cursor.execute(f"ALTER TABLE {qn(table)} VALIDATE CONSTRAINT {qn(range_check)}")
+
+        cursor.execute(f"DROP TABLE IF EXISTS {qn(parent)}")
+        cursor.execute(
+            f"CREATE TABLE {qn(parent)} (LIKE {qn(table)} INCLUDING DEFAULTS INCLUDING STORAGE) "
+            f"PARTITION BY RANGE ({qn(key_column)})"
+        )
+        if serial:
+            cursor.execute(f"CREATE SEQUENCE IF NOT EXISTS {qn(sequence)}")
+            cursor.execute(
+                f"ALTER TABLE {qn(parent)} ALTER COLUMN {qn(pk)} "
+                f"SET DEFAULT nextval('{sequence}'::regclass)"
+            )
+        cursor.execute(
+            f"ALTER TABLE {qn(parent)} ADD CONSTRAINT {qn(_identifier(parent, 'pkey'))} "
+            f"PRIMARY KEY ({qn(pk)}, {qn(key_column)})"
+        )
+        for column in index_columns:
+            cursor.execute(
+                f"CREATE INDEX {qn(_identifier(table, column, 'pidx'))} "
+                f"ON {qn(parent)} ({qn(column)})"
+            )
+        # Model Meta.indexes (composite/partial) go onto the parent under a
+        # temporary name; ATTACH adopts the legacy table's identical index.
+        secondary = _secondary_indexes(cursor, table)
+        for name, using_clause in secondary:
+            cursor.execute(
+                f"CREATE INDEX {qn(_identifier(name, 'p'))} ON {qn(parent)} {using_clause}"
+            )
+        # Copy outgoing FKs verbatim so ATTACH recognises the legacy table's
+        # existing (already validated) constraints instead of re-checking.
+        for name, definition, self_ref in _constraints(cursor, table, "f"):
+            if not self_ref:
+                cursor.execute(
+                    f"ALTER TABLE {qn(parent)} ADD CONSTRAINT "
+                    f"{qn(_identifier(name, 'p'))} {definition}"
+                )
+
+    # --- Phase 2: the switchover, one short transaction ---------------------
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        cursor.execute(f"LOCK TABLE {qn(table)} IN ACCESS EXCLUSIVE MODE")
+        if serial:
+            cursor.execute(
+                f"SELECT setval('{sequence}'::regclass, "
+                f"COALESCE((SELECT max({qn(pk)}) FROM {qn(table)}), 0) + 1, false)"
+            )
+            cursor.execute(
+                f"ALTER TABLE {qn(table)} ALTER COLUMN {qn(pk)} DROP IDENTITY IF EXISTS"
+            )
+            cursor.execute(f"ALTER TABLE {qn(table)} ALTER COLUMN {qn(pk)} DROP DEFAULT")
+        for name, _, self_ref in _constraints(cursor, table, "f"):
+            if self_ref:
+                cursor.execute(f"ALTER TABLE {qn(table)} DROP CONSTRAINT {qn(name)}")
+        for name, _, _ in _constraints(cursor, table, "p"):
+            cursor.execute(f"ALTER TABLE {qn(table)} DROP CONSTRAINT {qn(name)}")
+        cursor.execute(
+            f"ALTER TABLE {qn(table)} ADD CONSTRAINT {qn(_identifier(legacy, 'pkey'))} "
+            f"PRIMARY KEY USING INDEX {qn(pk_index)}"
+        )
+        cursor.execute(f"ALTER TABLE {qn(table)} RENAME TO {qn(legacy)}")
+        cursor.execute(f"ALTER TABLE {qn(parent)} RENAME TO {qn(table)}")
+        cursor.execute(
+            f"ALTER INDEX {qn(_identifier(parent, 'pkey'))} RENAME TO {qn(_identifier(table, 'pkey'))}"
+        )
+        for name, _ in secondary:
+            cursor.execute(f"ALTER INDEX {qn(name)} RENAME TO {qn(_identifier(name, 'legacy'))}")
+            cursor.execute(f"ALTER INDEX {qn(_identifier(name, 'p'))} RENAME TO {qn(name)}")
+        if serial:
+            cursor.execute(f"ALTER SEQUENCE {qn(sequence)} OWNED BY {qn(table)}.{qn(pk)}")
+        cursor.execute(
+            f"ALTER TABLE {qn(table)} ATTACH PARTITION {qn(legacy)} "
+            f"FOR VALUES FROM (MINVALUE) TO ({_literal(cutoff)})"
+        )
+        cursor.execute(f"ALTER TABLE {qn(legacy)} DROP CONSTRAINT {qn(range_check)}")
+        create_monthly_partitions(table, start=cutoff, months=months_ahead, using=using)
@@ -1,4 +1,5 @@
 """Shared pytest fixtures for the auth service test suite."""
+import base64
 import os
 
 import pytest
@@ -65,3 +66,24 @@ def user(db):
         is_active=True,
         is_email_verified=True,
     )
+
+
+@pytest.fixture
+def resource_server(user):
+    """Authorization headers of a confidential OAuth client allowed to introspect."""
+    from oauth2_provider.models import get_application_model
+
+    from authsvc.api.v1.auth import resource_server_auth
+
+    Application = get_application_model()
+    application = Application.objects.create(
+        name="resource-server",
+        user=user,
+        client_type=Application.CLIENT_CONFIDENTIAL,
+        authorization_grant_type=Application.GRANT_CLIENT_CREDENTIALS,
+        client_secret="rs-raw-secret",
+    )
+    resource_server_auth._verified.clear()
+    basic = base64.b64encode(f"{application.client_id}:rs-raw-secret".encode()).decode()
+    yield {"Authorization": f"Basic {basic}"}
+    resource_server_auth._verified.clear()
@@ -0,0 +1,107 @@
+"""The async (ASGI) hot routes: login, refresh, introspect, me and MFA verify."""
+import threading
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+
+from authsvc.apps.common import hashing
+from authsvc.apps.common.security import jwt_verify
+
+pytestmark = pytest.mark.django_db
+
+PASSWORD = "correct horse battery staple"
+
+
+@pytest.fixture
+def aclient():
+    return AsyncClient()
+
+
+def _post(aclient, path, body, **extra):
+    return async_to_sync(aclient.post)(path, data=body, content_type="application/json", **extra)
+
+
+def _login(aclient, user):
+    response = _post(aclient, "/api/v1/auth/login", {"email": user.email, "password": PASSWORD})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_login_refresh_me_and_introspect_over_asgi(aclient, user, settings, resource_server):
+    settings.REFRESH_REUSE_GRACE_SECONDS = 0
+    tokens = _login(aclient, user)
+
+    me = async_to_sync(aclient.get)(
+        "/api/v1/auth/me", headers={"Authorization": f"Bearer {tokens['access_token']}"}
+    )
+    assert me.status_code == 200
+    assert me.json()["email"] == user.email
+
+    rotated = _post(aclient, "/api/v1/auth/refresh", {"refresh_token": tokens["refresh_token"]})
+    assert rotated.status_code == 200
+    new_access = rotated.json()["access_token"]
+    assert jwt_verify(new_access)["sid"] == jwt_verify(tokens["access_token"])["sid"]
+
+    batch = _post(
+        aclient,
+        "/api/v1/auth/introspect",
+        {"tokens": [new_access, "not-a-jwt", new_access]},
+        headers=resource_server,
+    )
+    assert [r["active"] for r in batch.json()["results"]] == [True, False, True]
+
+    # The rotated-away refresh token is reuse: the session is revoked.
+    reused = _post(aclient, "/api/v1/auth/refresh", {"refresh_token": tokens["refresh_token"]})
+    assert reused.status_code == 401
+    single = _post(aclient, "/api/v1/auth/introspect", {"token": new_access}, headers=resource_server)
+    assert single.json() == {"active": False}
+
+
+def test_login_hashes_and_signs_on_the_cpu_pool(aclient, user, monkeypatch):
+    threads = []
+    verify, mint = hashing._verify, "authsvc.apps.tokens.services.mint_access_token"
+    from authsvc.apps.tokens import services
+
+    def recording(fn):
+        def wrapper(*args):
+            threads.append(threading.current_thread().name)
+            return fn(*args)
+
+        return wrapper
+
+    monkeypatch.setattr(hashing, "_verify", recording(verify))
+    monkeypatch.setattr(mint, recording(services.mint_access_token))
+    _login(aclient, user)
+
+    assert len(threads) == 2
+    assert all(name.startswith("authsvc-cpu") for name in threads)
+
+
+def test_unknown_account_over_asgi_still_costs_one_hash(aclient, db):
+    before = hashing.HASH_SECONDS.count(endpoint="login")
+    response = _post(
+        aclient, "/api/v1/auth/login", {"email": "nobody@example.com", "password": PASSWORD}
+    )
+    assert response.status_code == 401
+    assert hashing.HASH_SECONDS.count(endpoint="login") - before == 1
+
+
+def test_async_rate_limit_is_shared_by_asgi_and_wsgi(aclient, client, user, settings):
+    from authsvc.apps.common import throttle
+
+    settings.RATELIMIT_ENABLE = True
+    settings.LOGIN_THROTTLE_BACKEND = "local"
+    throttle._backend = None
+    body = {"refresh_token": "unknown"}
+    codes = [_post(aclient, "/api/v1/auth/refresh", body).status_code for _ in range(21)]
+    assert codes == [401] * 20 + [403]
+
+    def wsgi_refresh(ip):
+        return client.post(
+            "/api/v1/auth/refresh", data=body, content_type="application/json", REMOTE_ADDR=ip
+        ).status_code
+
+    # AsyncClient requests come from 127.0.0.1; the WSGI path counts in the same windows.
+    assert wsgi_refresh("127.0.0.1") == 403
+    assert wsgi_refresh("192.0.2.45") == 401
@@ -211,3 +211,312 @@ def test_session_and_password_lifecycle_is_audited(client, user, monkeypatch):
         AuditEvent.EventType.SESSION_REVOCATION,
     ):
         assert AuditEvent.objects.filter(event_type=event_type).exists()
+
+
+@pytest.fixture
+def audit_buffer(transactional_db, settings, monkeypatch):
+    # Transactional: buffered events are enqueued on commit, as in a request.
+    from authsvc.apps.audit import writer
+
+    settings.AUDIT_BUFFERED = True
+    settings.AUDIT_FLUSH_INTERVAL_SECONDS = 60
+    buffer = writer.AuditBuffer()
+    monkeypatch.setattr(writer, "buffer", buffer)
+    yield buffer
+    buffer._events.clear()
+
+
+def test_buffered_events_are_written_in_one_batch_on_flush(audit_buffer, user):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    from authsvc.apps.audit import writer
+    from authsvc.apps.audit.models import AuditEvent
+    from authsvc.apps.audit.services import record_event
+
+    first = record_event(AuditEvent.EventType.LOGOUT, actor=user, metadata={"token": "secret"})
+    record_event(AuditEvent.EventType.SESSION_REVOCATION, actor=user)
+    assert not AuditEvent.objects.exists()
+    assert audit_buffer.pending() == 2
+
+    with CaptureQueriesContext(connection) as queries:
+        assert writer.flush() == 2
+    assert [q["sql"].split()[0] for q in queries].count("INSERT") == 1
+    stored = AuditEvent.objects.get(event_type=AuditEvent.EventType.LOGOUT)
+    # Sanitized and timestamped when recorded, not when flushed.
+    assert stored.metadata == {"token": "[REDACTED]"}
+    assert stored.occurred_at == first.occurred_at
+    assert audit_buffer.pending() == 0
+
+
+def test_durable_events_are_written_before_returning(audit_buffer, settings, user):
+    from authsvc.apps.audit.models import AuditEvent
+    from authsvc.apps.audit.services import record_event
+
+    record_event(AuditEvent.EventType.PASSWORD_CHANGE, actor=user)  # in AUDIT_DURABLE_EVENT_TYPES
+    record_event(AuditEvent.EventType.LOGOUT, actor=user, durable=True)
+    assert AuditEvent.objects.count() == 2
+    assert audit_buffer.pending() == 0
+
+
+def test_buffered_events_wait_for_commit_and_vanish_on_rollback(audit_buffer, user):
+    from django.db import transaction
+
+    from authsvc.apps.audit.models import AuditEvent
+    from authsvc.apps.audit.services import record_event
+
+    with pytest.raises(RuntimeError), transaction.atomic():
+        record_event(AuditEvent.EventType.LOGOUT, actor=user)
+        raise RuntimeError
+    assert audit_buffer.pending() == 0
+
+
+def test_full_buffer_falls_back_to_synchronous_writes(audit_buffer, settings, user):
+    from authsvc.apps.audit.models import AuditEvent
+    from authsvc.apps.audit.services import record_event
+
+    settings.AUDIT_BUFFER_MAX_EVENTS = 1
+    record_event(AuditEvent.EventType.LOGOUT, actor=user)
+    record_event(AuditEvent.EventType.LOGOUT, actor=user)
+    assert audit_buffer.pending() == 1
+    assert AuditEvent.objects.count() == 1
+
+
+def test_failed_flush_keeps_events_for_retry(audit_buffer, monkeypatch, user):
+    from authsvc.apps.audit import writer
+    from authsvc.apps.audit.models import AuditEvent
+    from authsvc.apps.audit.services import record_event
+
+    record_event(AuditEvent.EventType.LOGOUT, actor=user)
+    copy_insert = writer.copy_insert
+
+    def failing(model, objs, **kwargs):
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(writer, "copy_insert", failing)
+    assert writer.flush() == 0
+    assert audit_buffer.pending() == 1
+    monkeypatch.setattr(writer, "copy_insert", copy_insert)
+    assert writer.flush() == 1
+    assert AuditEvent.objects.count() == 1
+
+
+def test_flush_drains_large_backlogs_in_max_row_chunks(audit_buffer, settings, monkeypatch, user):
+    from authsvc.apps.audit import writer
+    from authsvc.apps.audit.models import AuditEvent
+    from authsvc.apps.audit.services import record_event
+
+    settings.AUDIT_FLUSH_BATCH_SIZE = 1000  # no early wake-up
+    settings.AUDIT_FLUSH_MAX_ROWS = 4
+    writes = []
+    copy_insert = writer.copy_insert
+    monkeypatch.setattr(
+        writer, "copy_insert", lambda model, objs: writes.append(len(objs)) or copy_insert(model, objs)
+    )
+    for _ in range(10):
+        record_event(AuditEvent.EventType.LOGIN_FAILURE, result=AuditEvent.Result.FAILURE)
+
+    assert writer.flush() == 10
+    assert writes == [4, 4, 2]
+    assert AuditEvent.objects.filter(event_type=AuditEvent.EventType.LOGIN_FAILURE).count() == 10
+
+
+def test_writer_thread_flushes_once_the_batch_is_full(audit_buffer, settings, user):
+    import time
+
+    from authsvc.apps.audit.models import AuditEvent
+    from authsvc.apps.audit.services import record_event
+
+    settings.AUDIT_FLUSH_BATCH_SIZE = 2
+    record_event(AuditEvent.EventType.LOGOUT, actor=user)
+    record_event(AuditEvent.EventType.LOGOUT, actor=user)
+    deadline = time.monotonic() + 5
+    while AuditEvent.objects.count() < 2 and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert AuditEvent.objects.count() == 2
+
+
+def _old_events(count):
+    from datetime import UTC, datetime
+
+    from authsvc.apps.audit.models import AuditEvent
+
+    return [
+        AuditEvent(
+            event_type=AuditEvent.EventType.LOGIN_FAILURE,
+            result=AuditEvent.Result.FAILURE,
+            ip_address="192.0.2.9",
+            metadata={"reason": "bad_credentials"},
+            occurred_at=datetime(2025, 1, 1 + i, 12, 0, 0, 123456, tzinfo=UTC),
+        )
+        for i in range(count)
+    ]
+
+
+def test_export_writes_checksummed_jsonl_and_verify_detects_tampering(tmp_path):
+    import gzip
+    import json
+    from datetime import UTC, datetime
+
+    from django.core.management import call_command
+    from django.core.management.base import CommandError
+
+    from authsvc.apps.audit import archive
+    from authsvc.apps.audit.models import AuditEvent
+    from authsvc.infrastructure.partitioning import Partition
+
+    events = _old_events(3)
+    AuditEvent.objects.bulk_create(events)
+    february = _old_events(1)[0]
+    february.occurred_at = datetime(2025, 2, 1, tzinfo=UTC)
+    february.save()
+    january = Partition(
+        "audit_auditevent_p202501", datetime(2025, 1, 1, tzinfo=UTC), datetime(2025, 2, 1, tzinfo=UTC)
+    )
+
+    result = archive.export_partition(january, tmp_path)
+
+    assert result.rows == 3
+    lines = gzip.open(tmp_path / result.file).read().decode().splitlines()
+    first = json.loads(lines[0])
+    assert first["id"] == str(events[0].id)
+    assert first["occurred_at"] == "2025-01-01T12:00:00.123456+00:00"
+    assert first["metadata"] == {"reason": "bad_credentials"}
+    manifest = archive.manifest_path(tmp_path, january.name)
+    assert archive.verify_archive(manifest) == result
+    # Same rows, same bytes: re-running an interrupted archive is idempotent.
+    assert archive.export_partition(january, tmp_path).sha256 == result.sha256
+
+    data = tmp_path / result.file
+    data.write_bytes(data.read_bytes()[:-8] + b"\0" * 8)
+    with pytest.raises(CommandError, match="checksum"):
+        call_command("audit_partitions", "verify", str(manifest))
+
+
+def test_partition_commands_require_postgres():
+    from django.core.management import call_command
+    from django.core.management.base import CommandError
+    from django.db import connection
+
+    if connection.vendor == "postgresql":
+        pytest.skip("checks the non-PostgreSQL guard")
+    with pytest.raises(CommandError, match="PostgreSQL"):
+        call_command("audit_partitions", "archive", "--dry-run")
+
+
+def test_archive_exports_and_detaches_a_partition_without_deleting_rows(tmp_path):
+    from datetime import timedelta
+
+    from django.db import connection
+    from django.utils import timezone
+
+    from authsvc.apps.audit import archive
+    from authsvc.apps.audit.models import AuditEvent
+    from authsvc.infrastructure import partitioning
+    from authsvc.infrastructure.database import copy_insert
+
+    if connection.vendor != "postgresql":
+        pytest.skip("partitioning requires PostgreSQL")
+    table = AuditEvent._meta.db_table
+    old = _old_events(2)
+    AuditEvent.objects.bulk_create(old)
+    now = timezone.now()
+    cutoff = partitioning.add_months(partitioning.month_floor(now), 1)
+
+    partitioning.partition_existing_table(
+        AuditEvent, key="occurred_at", cutoff=cutoff, months_ahead=1, concurrently=False
+    )
+    # New events land in the monthly partitions, through COPY as well.
+    current = AuditEvent(event_type=AuditEvent.EventType.LOGOUT, result=AuditEvent.Result.SUCCESS)
+    assert copy_insert(AuditEvent, [current]) == 1
+
+    legacy, *_ = partitioning.list_partitions(table)
+    due = partitioning.expired_partitions([legacy], keep=timedelta(days=1), now=cutoff + timedelta(days=2))
+    assert due == [legacy]
+    result = archive.archive_partition(legacy, tmp_path, concurrently=False)
+
+    assert result.rows == 2
+    assert legacy.name not in {p.name for p in partitioning.list_partitions(table)}
+    assert list(AuditEvent.objects.values_list("id", flat=True)) == [current.id]
+    with connection.cursor() as cursor:  # detached, not deleted
+        cursor.execute(f'SELECT count(*) FROM "{legacy.name}"')
+        assert cursor.fetchone()[0] == 2
+
+
+def _audit_get(client, user, **params):
+    from authsvc.apps.tokens.services import issue_token_pair
+
+    access, _ = issue_token_pair(user, request=None)
+    return client.get(
+        "/api/v1/audit/events", params, headers={"Authorization": f"Bearer {access}"}
+    )
+
+
+def test_audit_api_is_staff_only(client, user):
+    assert client.get("/api/v1/audit/events").status_code == 401
+    assert _audit_get(client, user).status_code == 403
+    user.is_staff = True
+    user.save(update_fields=["is_staff"])
+    assert _audit_get(client, user).status_code == 200
+
+
+def test_audit_api_filters_and_walks_pages_with_a_keyset_cursor(client, user):
+    from datetime import UTC, datetime, timedelta
+
+    from authsvc.apps.audit.models import AuditEvent
+
+    user.is_staff = True
+    user.save(update_fields=["is_staff"])
+    base = datetime(2026, 3, 1, tzinfo=UTC)
+    events = [
+        AuditEvent(
+            event_type=AuditEvent.EventType.LOGIN_FAILURE,
+            result=AuditEvent.Result.FAILURE,
+            target_type="account_identifier",
+            target_id="victim" if i % 2 else "other",
+            request_id=f"req-{i}",
+            # Pairs share a timestamp: the id breaks the tie.
+            occurred_at=base + timedelta(seconds=i // 2),
+        )
+        for i in range(7)
+    ]
+    AuditEvent.objects.bulk_create(events)
+    AuditEvent.objects.create(event_type=AuditEvent.EventType.LOGOUT, result=AuditEvent.Result.SUCCESS)
+
+    seen, cursor = [], None
+    while True:
+        params = {"event_type": "login_failure", "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        body = _audit_get(client, user, **params).json()
+        seen += [event["id"] for event in body["events"]]
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+    expected = sorted(events, key=lambda e: (e.occurred_at, e.id), reverse=True)
+    assert seen == [str(e.id) for e in expected]
+
+    body = _audit_get(
+        client, user, target_type="account_identifier", target_id="victim",
+        since=(base + timedelta(seconds=1)).isoformat(), until=(base + timedelta(seconds=3)).isoformat(),
+    ).json()
+    assert [e["request_id"] for e in body["events"]] == ["req-5", "req-3"]
+    assert set(body["events"][0]) == {
+        "id", "occurred_at", "event_type", "result", "actor_type", "actor_id",
+        "target_type", "target_id", "request_id", "ip_address", "metadata",
+    }
+    assert _audit_get(client, user, request_id="req-6").json()["events"][0]["target_id"] == "other"
+
+
+def test_audit_api_rejects_bad_cursors_and_unindexed_filters(client, user):
+    from authsvc.apps.common.security import b64url_encode
+
+    user.is_staff = True
+    user.save(update_fields=["is_staff"])
+    for cursor in (
+        "not-a-cursor",
+        b64url_encode(b"[1]"),
+        b64url_encode(b'["2026-03-01T00:00:00", "0b3f9a4e-54c4-4c0e-9d55-0d6f3f8a0f11"]'),  # naive
+    ):
+        assert _audit_get(client, user, cursor=cursor).status_code == 400
+    assert _audit_get(client, user, target_id="x").status_code == 400
@@ -0,0 +1,207 @@
+"""Connection settings: pooled vs persistent, and pool stats in /metrics."""
+import os
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+
+from authsvc.config.db import database_settings
+from authsvc.infrastructure.database import copy_insert, pool_stats
+
+requires_postgres = pytest.mark.skipif(
+    os.getenv("TEST_DATABASE") != "postgres", reason="requires PostgreSQL"
+)
+
+
+def test_pooled_settings_disable_persistent_connections():
+    config = database_settings(NAME="authdb", HOST="db", min_size=1, max_size=4, timeout=2)
+
+    assert config["CONN_MAX_AGE"] == 0  # Django refuses a pool with CONN_MAX_AGE
+    assert config["CONN_HEALTH_CHECKS"] is True
+    assert config["OPTIONS"]["pool"]["min_size"] == 1
+    assert config["OPTIONS"]["pool"]["max_size"] == 4
+    assert config["OPTIONS"]["pool"]["timeout"] == 2
+    assert config["NAME"] == "authdb"
+
+
+def test_unpooled_settings_keep_connections_per_thread():
+    config = database_settings(pool=False, conn_max_age=120, health_checks=False)
+
+    assert "pool" not in config["OPTIONS"]
+    assert config["CONN_MAX_AGE"] == 120
+    assert config["CONN_HEALTH_CHECKS"] is False
+
+
+def test_pool_bounds_are_validated():
+    with pytest.raises(ImproperlyConfigured):
+        database_settings(min_size=5, max_size=2)
+
+
+def test_pool_requires_django_5_1(monkeypatch):
+    import django
+
+    monkeypatch.setattr(django, "VERSION", (5, 0, 14, "final", 0))
+    with pytest.raises(ImproperlyConfigured):
+        database_settings(NAME="authsvc")
+    assert "pool" not in database_settings(pool=False, NAME="authsvc")["OPTIONS"]
+
+
+def test_settings_do_not_import_application_code():
+    import subprocess
+    import sys
+
+    probe = (
+        "import sys; import authsvc.config.settings.base; "
+        "print(sorted(m for m in sys.modules if m.startswith(('authsvc.apps', 'authsvc.infrastructure'))))"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", probe], capture_output=True, text=True, check=True,
+        env={**os.environ, "SKIP_DOTENV": "1", "PYTHONPATH": os.pathsep.join(sys.path)},
+    ).stdout
+    assert out.strip() == "[]"
+
+
+@pytest.mark.django_db
+def test_metrics_expose_the_pool_gauge(client):
+    if connection.vendor != "postgresql":
+        assert pool_stats() == {}
+    body = client.get("/api/v1/health/metrics").content.decode()
+    assert "# TYPE authsvc_db_pool gauge" in body
+
+
+@requires_postgres
+@pytest.mark.django_db
+def test_requests_borrow_from_the_pool(client, user):
+    if not connection.settings_dict["OPTIONS"].get("pool"):
+        pytest.skip("DB_POOL=0")
+    client.get("/api/v1/health/ready")
+
+    stats = pool_stats()["default"]
+    assert stats["pool_size"] >= 1
+    body = client.get("/api/v1/health/metrics").content.decode()
+    assert 'authsvc_db_pool{alias="default",stat="pool_size"}' in body
+
+
+@pytest.mark.django_db
+def test_copy_insert_writes_every_field():
+    from authsvc.apps.audit.models import AuditEvent
+
+    events = [
+        AuditEvent(
+            event_type=AuditEvent.EventType.LOGIN_FAILURE,
+            result=AuditEvent.Result.FAILURE,
+            ip_address="192.0.2.7",
+            user_agent="tab\there, newline\nthere",
+            metadata={"reason": "bad_credentials", "nested": [1, None, "\\N"]},
+        )
+        for _ in range(3)
+    ]
+    assert copy_insert(AuditEvent, events) == 3
+    assert copy_insert(AuditEvent, []) == 0
+
+    stored = AuditEvent.objects.get(pk=events[0].pk)
+    assert stored.occurred_at == events[0].occurred_at
+    assert stored.ip_address == "192.0.2.7"
+    assert stored.user_agent == "tab\there, newline\nthere"
+    assert stored.metadata == {"reason": "bad_credentials", "nested": [1, None, "\\N"]}
+
+
+@requires_postgres
+@pytest.mark.django_db
+def test_copy_insert_uses_copy_on_postgres(monkeypatch):
+    from authsvc.apps.audit.models import AuditEvent
+
+    def no_bulk_create(*args, **kwargs):
+        raise AssertionError("COPY expected")
+
+    monkeypatch.setattr(type(AuditEvent.objects.all()), "bulk_create", no_bulk_create)
+    event = AuditEvent(event_type=AuditEvent.EventType.LOGOUT, result=AuditEvent.Result.SUCCESS)
+    assert copy_insert(AuditEvent, [event]) == 1
+    assert AuditEvent.objects.filter(pk=event.pk).exists()
+
+
+# --- Replica routing ----------------------------------------------------------
+
+# Replica routing is skipped inside transactions, so these tests cannot run in
+# the usual per-test transaction.
+replica_db = pytest.mark.django_db(transaction=True, databases=["default", "replica"])
+
+
+def test_reads_round_robin_over_replicas_only_when_marked(settings):
+    from authsvc.apps.accounts.models import User
+    from authsvc.infrastructure.database import read_from_replicas
+
+    settings.DATABASE_REPLICAS = ["replica_a", "replica_b"]
+    assert User.objects.all().db == "default"
+    with read_from_replicas():
+        used = {User.objects.all().db for _ in range(4)}
+    assert used == {"replica_a", "replica_b"}
+    assert User.objects.all().db == "default"
+
+
+@replica_db
+def test_first_write_pins_the_rest_of_the_scope_to_the_primary(settings, user):
+    from authsvc.apps.accounts.models import User
+    from authsvc.infrastructure.database import read_from_replicas
+
+    settings.DATABASE_REPLICAS = ["replica"]
+    with read_from_replicas():
+        assert User.objects.all().db == "replica"
+        user.save(update_fields=["first_name"])
+        assert User.objects.all().db == "default"
+    with read_from_replicas():
+        assert User.objects.all().db == "replica"
+
+
+@pytest.mark.django_db
+def test_transactions_and_row_locks_stay_on_the_primary(settings):
+    from django.db import transaction
+
+    from authsvc.apps.tokens.models import RefreshToken
+    from authsvc.infrastructure.database import read_from_replicas
+
+    settings.DATABASE_REPLICAS = ["replica"]
+    with read_from_replicas():
+        with transaction.atomic():
+            assert RefreshToken.objects.select_for_update().all().db == "default"
+            assert RefreshToken.objects.all().db == "default"
+
+
+@replica_db
+def test_token_rotation_never_touches_a_replica(settings, user):
+    from django.db import connections
+    from django.test.utils import CaptureQueriesContext
+
+    from authsvc.apps.tokens.services import issue_token_pair, rotate_refresh_token
+    from authsvc.infrastructure.database import read_from_replicas
+
+    settings.DATABASE_REPLICAS = ["replica"]
+    _, raw = issue_token_pair(user, request=None)
+    with read_from_replicas(), CaptureQueriesContext(connections["replica"]) as replica:
+        rotate_refresh_token(raw, request=None)
+    assert len(replica) == 0
+
+
+@replica_db
+def test_marked_views_read_from_the_replica(settings, client, user):
+    from django.db import connections
+    from django.test.utils import CaptureQueriesContext
+
+    from authsvc.apps.tokens.services import issue_token_pair
+
+    settings.DATABASE_REPLICAS = ["replica"]
+    access, _ = issue_token_pair(user, request=None)
+    headers = {"Authorization": f"Bearer {access}"}
+    with CaptureQueriesContext(connections["replica"]) as replica:
+        assert client.get("/api/v1/auth/me", headers=headers).status_code == 200
+        assert client.get("/api/v1/auth/mfa/status", headers=headers).status_code == 200
+        assert client.get("/api/v1/auth/registration-fields").status_code == 200
+    assert len(replica) >= 3
+    # Unmarked routes stay on the primary.
+    with CaptureQueriesContext(connections["replica"]) as replica:
+        client.post(
+            "/api/v1/auth/login",
+            data={"email": user.email, "password": "wrong password"},
+            content_type="application/json",
+        )
+    assert len(replica) == 0
@@ -0,0 +1,192 @@
+"""Password hashing: bounded pool, 503 backpressure, Argon2id profile and upgrades."""
+import time
+
+import pytest
+from django.contrib.auth.hashers import make_password
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from authsvc.apps.common import hashing
+
+pytestmark = pytest.mark.django_db
+
+PASSWORD = "correct horse battery staple"
+
+
+def _login(client, user, password=PASSWORD):
+    return client.post(
+        "/api/v1/auth/login",
+        data={"email": user.email, "password": password},
+        content_type="application/json",
+    )
+
+
+def test_saturated_endpoint_quota_sheds_with_503(client, settings, user):
+    settings.PASSWORD_HASHING_QUOTAS = {"login": 1}
+    settings.PASSWORD_HASHING_RETRY_AFTER_SECONDS = 2
+    quota = hashing._quota("login")
+    quota.acquire()  # one login hash already in flight
+    try:
+        busy = _login(client, user)
+    finally:
+        quota.release()
+
+    assert busy.status_code == 503
+    assert busy["Retry-After"] == "2"
+    assert hashing.HASH_REJECTED.value(endpoint="login", reason="quota") >= 1
+    # Once the slot frees up, logins go through again.
+    assert _login(client, user).status_code == 200
+
+
+def test_process_wide_queue_limit_covers_every_endpoint(settings, user):
+    settings.PASSWORD_HASHING_MAX_PENDING = 1
+    pending = hashing._pending_slot()
+    pending.acquire()
+    try:
+        with pytest.raises(hashing.HashingUnavailable) as exc:
+            hashing.hash_password(PASSWORD, endpoint="register")
+    finally:
+        pending.release()
+    assert exc.value.reason == "queue"
+
+
+def test_stale_hash_is_upgraded_once(settings, user):
+    settings.PASSWORD_HASHERS = [
+        "django.contrib.auth.hashers.MD5PasswordHasher",
+        "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    ]
+    user.password = make_password(PASSWORD, hasher="pbkdf2_sha1")
+    user.save(update_fields=["password"])
+
+    assert hashing.verify_password(user, PASSWORD, endpoint="login")
+    user.refresh_from_db()
+    assert user.password.startswith("md5$")
+
+    # Already current: verifying writes nothing.
+    with CaptureQueriesContext(connection) as queries:
+        assert hashing.verify_password(user, PASSWORD, endpoint="login")
+        assert not hashing.verify_password(user, "wrong password", endpoint="login")
+    assert len(queries) == 0
+
+
+def test_hashes_run_on_the_process_pool(settings, user):
+    settings.PASSWORD_HASHING_WORKERS = 1
+    try:
+        encoded = hashing.hash_password(PASSWORD, endpoint="register")
+        user.password = encoded
+        assert hashing.verify_password(user, PASSWORD, endpoint="login")
+        assert hashing._executor is not None
+    finally:
+        settings.PASSWORD_HASHING_WORKERS = 0
+        if hashing._executor is not None:
+            hashing._executor.shutdown()
+            hashing._executor = None
+
+
+def test_timed_out_hashes_hold_their_slot_until_they_finish(settings):
+    settings.PASSWORD_HASHING_WORKERS = 1
+    settings.PASSWORD_HASHING_MAX_PENDING = 1
+    try:
+        hashing._run("login", time.sleep, 0)  # start the worker
+        settings.PASSWORD_HASHING_TIMEOUT_SECONDS = 0.2
+        with pytest.raises(hashing.HashingUnavailable) as exc:
+            hashing._run("login", time.sleep, 1.5)
+        assert exc.value.reason == "timeout"
+
+        # The slow hash still runs, so new ones are shed instead of queued.
+        for _ in range(5):
+            with pytest.raises(hashing.HashingUnavailable) as exc:
+                hashing._run("login", time.sleep, 0)
+            assert exc.value.reason == "queue"
+        assert hashing.HASH_PENDING.value() == 1
+
+        deadline = time.monotonic() + 10
+        while hashing.HASH_PENDING.value() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert hashing.HASH_PENDING.value() == 0
+        settings.PASSWORD_HASHING_TIMEOUT_SECONDS = 5
+        hashing._run("login", time.sleep, 0)
+    finally:
+        settings.PASSWORD_HASHING_WORKERS = 0
+        if hashing._executor is not None:
+            hashing._executor.shutdown()
+            hashing._executor = None
+
+
+def test_metrics_endpoint_exposes_hashing_gauges(client, user):
+    hashing.hash_password(PASSWORD, endpoint="register")
+    body = client.get("/api/v1/health/metrics").content.decode()
+    assert "authsvc_password_hash_pending 0" in body
+    assert 'authsvc_password_hash_seconds_count{endpoint="register"}' in body
+
+
+ARGON2_HASHERS = [
+    "authsvc.apps.accounts.hashers.Argon2idPasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+]
+
+
+def test_login_upgrades_legacy_hash_to_configured_argon2id(client, settings, user):
+    settings.PASSWORD_HASHERS = ARGON2_HASHERS
+    settings.ARGON2_TIME_COST, settings.ARGON2_MEMORY_COST_KIB = 1, 1024
+    user.password = make_password(PASSWORD, hasher="pbkdf2_sha1")
+    user.save(update_fields=["password"])
+
+    assert _login(client, user).status_code == 200
+    user.refresh_from_db()
+    assert user.password.startswith("argon2$argon2id$v=19$m=1024,t=1,p=1$")
+
+    # A costlier profile is picked up at the next login, then left alone.
+    settings.ARGON2_TIME_COST = 2
+    assert hashing.verify_password(user, PASSWORD, endpoint="login")
+    assert "m=1024,t=2,p=1" in user.password
+    with CaptureQueriesContext(connection) as queries:
+        assert hashing.verify_password(user, PASSWORD, endpoint="login")
+    assert len(queries) == 0
+
+
+def test_calibrate_password_hasher_prints_settings():
+    from io import StringIO
+
+    from django.core.management import call_command
+
+    out = StringIO()
+    call_command(
+        "calibrate_password_hasher", "--target-ms", "5", "--max-memory-mib", "1", "--samples", "1",
+        stdout=out,
+    )
+    assert "ARGON2_TIME_COST=" in out.getvalue()
+    assert "ARGON2_MEMORY_COST_KIB=" in out.getvalue()
+
+
+@pytest.mark.parametrize(
+    "email, password",
+    [
+        ("alice@example.com", PASSWORD),  # success
+        ("alice@example.com", "wrong password"),  # known account, bad password
+        ("nobody@example.com", PASSWORD),  # unknown account
+    ],
+)
+def test_every_login_outcome_costs_exactly_one_hash(client, settings, user, email, password):
+    settings.PASSWORD_HASHERS = ARGON2_HASHERS
+    settings.ARGON2_TIME_COST, settings.ARGON2_MEMORY_COST_KIB = 1, 1024
+    user.password = make_password(PASSWORD)  # current profile: no upgrade
+    user.save(update_fields=["password"])
+    hashing._dummy_hash()  # computed once per process, not per attempt
+
+    before = hashing.HASH_SECONDS.count(endpoint="login")
+    client.post(
+        "/api/v1/auth/login",
+        data={"email": email, "password": password},
+        content_type="application/json",
+    )
+    assert hashing.HASH_SECONDS.count(endpoint="login") - before == 1
+
+
+def test_dummy_hash_follows_the_current_work_factor(settings):
+    settings.PASSWORD_HASHERS = ARGON2_HASHERS
+    settings.ARGON2_TIME_COST, settings.ARGON2_MEMORY_COST_KIB = 1, 1024
+    first = hashing._dummy_hash()
+    assert hashing._dummy_hash() is first
+    settings.ARGON2_TIME_COST = 2
+    assert "t=2" in hashing._dummy_hash()
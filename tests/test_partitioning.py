@@ -0,0 +1,154 @@
+"""Optional monthly partitioning of tokens_refreshtoken.
+
+The conversion itself needs PostgreSQL; it runs inside the test transaction
+(non-concurrent index builds), so the rollback restores the plain table.
+"""
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+
+from authsvc.apps.tokens.models import RefreshToken
+from authsvc.infrastructure import partitioning
+
+TABLE = RefreshToken._meta.db_table
+
+
+def test_month_arithmetic_rolls_over_years():
+    dt = datetime(2026, 11, 17, 13, 5, tzinfo=UTC)
+    assert partitioning.month_floor(dt) == datetime(2026, 11, 1, tzinfo=UTC)
+    assert partitioning.add_months(partitioning.month_floor(dt), 2) == datetime(
+        2027, 1, 1, tzinfo=UTC
+    )
+    assert partitioning.partition_name(TABLE, dt) == f"{TABLE}_p202611"
+
+
+def test_partition_expires_only_when_its_newest_row_is_past_retention():
+    jan = partitioning.Partition("p202601", datetime(2026, 1, 1, tzinfo=UTC), datetime(2026, 2, 1, tzinfo=UTC))
+    legacy = partitioning.Partition("legacy", None, datetime(2026, 1, 1, tzinfo=UTC))
+    keep = timedelta(days=37)
+
+    now = datetime(2026, 3, 9, 23, tzinfo=UTC)  # Feb 1 + 37d = Mar 10
+    assert partitioning.expired_partitions([legacy, jan], keep=keep, now=now) == [legacy]
+    now = datetime(2026, 3, 10, tzinfo=UTC)
+    assert partitioning.expired_partitions([legacy, jan], keep=keep, now=now) == [legacy, jan]
+
+
+@pytest.mark.django_db
+def test_command_requires_postgres():
+    if connection.vendor == "postgresql":
+        pytest.skip("checks the non-PostgreSQL guard")
+    with pytest.raises(CommandError, match="PostgreSQL"):
+        call_command("refresh_token_partitions", "status")
+
+
+@pytest.mark.django_db
+def test_live_conversion_keeps_rotation_and_index_lookups(user):
+    if connection.vendor != "postgresql":
+        pytest.skip("partitioning requires PostgreSQL")
+    from django.utils import timezone
+
+    from authsvc.apps.common.security import sha256_hex
+    from authsvc.apps.tokens.purge import partition_retention, purge_tokens
+    from authsvc.apps.tokens.services import issue_token_pair, rotate_refresh_token
+
+    _, before = issue_token_pair(user, request=None)
+    now = timezone.now()
+    cutoff = partitioning.add_months(partitioning.month_floor(now), 1)
+
+    partitioning.partition_existing_table(
+        RefreshToken, key="created_at", cutoff=cutoff, months_ahead=2, concurrently=False
+    )
+
+    assert partitioning.is_partitioned(TABLE)
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT indexname FROM pg_indexes WHERE tablename = %s", [TABLE])
+        assert "refreshtoken_family_live_idx" in {row[0] for row in cursor.fetchall()}
+    names = [p.name for p in partitioning.list_partitions(TABLE)]
+    assert names == [
+        f"{TABLE}_legacy",
+        partitioning.partition_name(TABLE, cutoff),
+        partitioning.partition_name(TABLE, partitioning.add_months(cutoff, 1)),
+    ]
+
+    # Rows written before the switchover still rotate; new ids keep counting up.
+    old_id = RefreshToken.objects.get(token=sha256_hex(before)).pk
+    _, _, after = rotate_refresh_token(before, request=None)
+    assert RefreshToken.objects.get(token=sha256_hex(after)).pk > old_id
+
+    with connection.cursor() as cursor:
+        cursor.execute("SET LOCAL enable_seqscan = off")
+        cursor.execute(
+            f"EXPLAIN SELECT id FROM {TABLE} WHERE token = %s", [sha256_hex(after)]
+        )
+        plan = "\n".join(row[0] for row in cursor.fetchall())
+    assert "Index" in plan and "Seq Scan" not in plan
+
+    # Refresh tokens are now retired by dropping partitions, not by DELETE.
+    assert "refresh_tokens" not in {r.label for r in purge_tokens(pause=0)}
+    later = cutoff + partition_retention() + timedelta(days=1)
+    created, dropped = partitioning.maintain_partitions(
+        TABLE, months_ahead=1, keep=partition_retention(), now=later, concurrently=False
+    )
+    assert f"{TABLE}_legacy" in dropped
+    beyond = partitioning.add_months(partitioning.month_floor(later), 1)
+    assert partitioning.partition_name(TABLE, beyond) in created
+    assert not RefreshToken.objects.filter(pk=old_id).exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_index_on_a_partitioned_table_covers_every_partition():
+    if connection.vendor != "postgresql":
+        pytest.skip("partitioning requires PostgreSQL")
+    from django.db import models
+    from django.db.migrations.state import ModelState, ProjectState
+
+    from authsvc.infrastructure.operations import AddIndexConcurrently
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "CREATE TABLE opstest (id bigint, at timestamptz NOT NULL, kind text) "
+            "PARTITION BY RANGE (at)"
+        )
+        cursor.execute(
+            "CREATE TABLE opstest_p202601 PARTITION OF opstest "
+            "FOR VALUES FROM ('2026-01-01') TO ('2026-02-01')"
+        )
+        cursor.execute("CREATE TABLE opstest_default PARTITION OF opstest DEFAULT")
+    try:
+        state = ProjectState()
+        state.add_model(
+            ModelState(
+                "opstest",
+                "Event",
+                [
+                    ("id", models.BigAutoField(primary_key=True)),
+                    ("at", models.DateTimeField()),
+                    ("kind", models.TextField()),
+                ],
+                options={"db_table": "opstest"},
+            )
+        )
+        operation = AddIndexConcurrently(
+            "event", models.Index(fields=["kind", "at"], name="opstest_kind_idx")
+        )
+        new_state = state.clone()
+        operation.state_forwards("opstest", new_state)
+        for _ in range(2):  # a rerun finds every partition done
+            with connection.schema_editor(atomic=False) as editor:
+                operation.database_forwards("opstest", editor, state, new_state)
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT indisvalid FROM pg_index WHERE indexrelid = 'opstest_kind_idx'::regclass"
+            )
+            assert cursor.fetchone()[0] is True
+            cursor.execute(
+                "SELECT count(*) FROM pg_inherits WHERE inhparent = 'opstest_kind_idx'::regclass"
+            )
+            assert cursor.fetchone()[0] == 2
+    finally:
+        with connection.cursor() as cursor:
+            cursor.execute("DROP TABLE opstest")
@@ -0,0 +1,91 @@
+"""Hot token/session/user queries and audit filters are index-backed (PostgreSQL EXPLAIN).
+
+The test tables are tiny, so sequential scans are disabled for the
+transaction: the planner must then find a usable index or fall back to a
+(penalised) Seq Scan, which the assertions reject.
+"""
+import itertools
+import uuid
+from datetime import UTC, datetime
+
+import pytest
+from django.db import connection
+
+from authsvc.apps.accounts.models import EmailOTP, User, UserSession
+from authsvc.apps.audit.services import encode_cursor, event_queryset
+from authsvc.apps.tokens.models import RefreshToken
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def no_seqscan():
+    if connection.vendor != "postgresql":
+        pytest.skip("query plans are checked on PostgreSQL")
+    with connection.cursor() as cursor:
+        cursor.execute("SET LOCAL enable_seqscan = off")
+
+
+def _assert_index_plan(queryset, index=None):
+    plan = queryset.explain()
+    assert "Seq Scan" not in plan, plan
+    assert "Index" in plan, plan
+    if index:
+        assert index in plan, plan
+
+
+def test_live_refresh_token_lookups_use_partial_indexes(no_seqscan, user):
+    session = UserSession.objects.create(user=user)
+    _assert_index_plan(RefreshToken.objects.filter(user=user, revoked_at__isnull=True))
+    _assert_index_plan(RefreshToken.objects.filter(session=session, revoked_at__isnull=True))
+    _assert_index_plan(
+        RefreshToken.objects.filter(family_id=uuid.uuid4(), revoked_at__isnull=True),
+        "refreshtoken_family_live_idx",
+    )
+
+
+def test_active_sessions_use_partial_index(no_seqscan, user):
+    _assert_index_plan(user.sessions.filter(is_active=True))
+
+
+def test_latest_otp_is_read_without_a_sort(no_seqscan, user):
+    queryset = EmailOTP.objects.filter(user=user).order_by("-created_at")[:1]
+    _assert_index_plan(queryset, "emailotp_user_created_idx")
+    assert "Sort" not in queryset.explain()
+
+
+def test_case_insensitive_email_lookup_uses_functional_index(no_seqscan, user):
+    _assert_index_plan(
+        User.objects.filter(email__iexact=user.email.upper()), "user_email_upper_idx"
+    )
+
+
+AUDIT_FILTERS = {
+    "event_type": {"event_type": "login_failure"},
+    "result": {"result": "failure"},
+    "actor_id": {"actor_id": "9f1c"},
+    "target": {"target_type": "account_identifier", "target_id": "5e88"},
+    "request_id": {"request_id": "req-1"},
+    "range": {"since": datetime(2026, 1, 1, tzinfo=UTC), "until": datetime(2026, 2, 1, tzinfo=UTC)},
+}
+
+
+@pytest.mark.parametrize(
+    "names",
+    [
+        names
+        for size in range(len(AUDIT_FILTERS) + 1)
+        for names in itertools.combinations(AUDIT_FILTERS, size)
+    ],
+    ids="+".join,
+)
+@pytest.mark.parametrize("paged", [False, True], ids=["first", "next"])
+def test_every_audit_filter_combination_uses_a_keyset_index(no_seqscan, names, paged):
+    filters = {key: value for name in names for key, value in AUDIT_FILTERS[name].items()}
+    if paged:
+        filters["cursor"] = encode_cursor(datetime(2026, 1, 15, tzinfo=UTC), uuid.uuid4())
+    queryset = event_queryset(**filters)[:51]
+    _assert_index_plan(queryset, "keyset_idx")
+    if len(names) <= 1:
+        # Rows come out of the index already in (occurred_at, id) order.
+        assert "Sort" not in queryset.explain()
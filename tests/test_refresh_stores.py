@@ -0,0 +1,183 @@
+"""Pluggable refresh-token stores (REFRESH_TOKEN_STORE).
+
+The Redis store tests need a real Redis (``TEST_REDIS=1``, as in CI); each
+test uses its own key prefix and deletes it afterwards.
+"""
+import os
+import uuid
+
+import pytest
+
+from authsvc.apps.accounts.models import UserSession
+from authsvc.apps.common.security import jwt_verify_rs256, sha256_hex
+from authsvc.apps.tokens import stores
+from authsvc.apps.tokens.models import RefreshToken
+from authsvc.apps.tokens.services import (
+    issue_token_pair,
+    revoke_all_refresh_tokens,
+    revoke_refresh_token,
+    rotate_refresh_token,
+)
+
+pytestmark = pytest.mark.django_db
+
+requires_redis = pytest.mark.skipif(
+    os.getenv("TEST_REDIS") != "1", reason="requires Redis integration service"
+)
+
+
+class CountingStore(stores.DatabaseRefreshTokenStore):
+    calls: list[str] = []
+
+    def issue(self, *args, **kwargs):
+        self.calls.append("issue")
+        return super().issue(*args, **kwargs)
+
+    def rotate(self, *args, **kwargs):
+        self.calls.append("rotate")
+        return super().rotate(*args, **kwargs)
+
+
+def test_services_use_the_configured_store(settings, user):
+    settings.REFRESH_TOKEN_STORE = f"{__name__}.CountingStore"
+    CountingStore.calls.clear()
+
+    _, raw = issue_token_pair(user, request=None)
+    rotate_refresh_token(raw, request=None)
+
+    assert CountingStore.calls == ["issue", "rotate"]
+    assert isinstance(stores.get_refresh_token_store(), CountingStore)
+
+
+@pytest.fixture
+def redis_store(settings):
+    from authsvc.apps.tokens.redis_store import RedisRefreshTokenStore
+
+    settings.REFRESH_TOKEN_STORE = "authsvc.apps.tokens.redis_store.RedisRefreshTokenStore"
+    settings.REFRESH_TOKEN_REDIS_URL = os.getenv("REDIS_CACHE_URL", "redis://localhost:6379/1")
+    settings.REFRESH_TOKEN_REDIS_PREFIX = f"test:rt:{uuid.uuid4().hex}"
+    settings.REFRESH_TOKEN_WRITE_BEHIND = False
+    store = stores.get_refresh_token_store()
+    assert isinstance(store, RedisRefreshTokenStore)
+    yield store
+    client = store._redis()
+    for key in client.scan_iter(f"{settings.REFRESH_TOKEN_REDIS_PREFIX}:*"):
+        client.delete(key)
+
+
+@requires_redis
+def test_redis_store_rotates_without_refresh_rows(redis_store, user):
+    access, raw = issue_token_pair(user, request=None)
+    sid = jwt_verify_rs256(access)["sid"]
+
+    got_user, new_access, new_raw = rotate_refresh_token(raw, request=None)
+
+    assert got_user == user
+    assert new_raw != raw
+    assert jwt_verify_rs256(new_access)["sid"] == sid
+    assert not RefreshToken.objects.exists()
+    assert UserSession.objects.get().is_active
+
+    with pytest.raises(ValueError, match="Token not found"):
+        rotate_refresh_token("not-a-token", request=None)
+
+
+@requires_redis
+def test_redis_store_reuse_kills_family_and_session(settings, redis_store, user):
+    settings.REFRESH_REUSE_GRACE_SECONDS = 0
+    _, raw = issue_token_pair(user, request=None)
+    _, _, successor = rotate_refresh_token(raw, request=None)
+
+    with pytest.raises(ValueError, match="reuse detected"):
+        rotate_refresh_token(raw, request=None)
+
+    # The thief's replay also burned the legitimate successor.
+    with pytest.raises(ValueError, match="revoked"):
+        rotate_refresh_token(successor, request=None)
+    assert not UserSession.objects.get().is_active
+
+
+@requires_redis
+def test_redis_store_grace_window_returns_same_successor(settings, redis_store, user):
+    settings.REFRESH_REUSE_GRACE_SECONDS = 10
+    _, raw = issue_token_pair(user, request=None)
+
+    first = rotate_refresh_token(raw, request=None)
+    retry = rotate_refresh_token(raw, request=None)
+
+    assert retry == first
+    assert UserSession.objects.get().is_active
+
+
+@requires_redis
+def test_redis_store_logout_and_logout_all(redis_store, user):
+    _, one = issue_token_pair(user, request=None)
+    _, two = issue_token_pair(user, request=None)
+
+    revoked = revoke_refresh_token(one)
+    assert revoked.user == user
+    assert not revoked.session.is_active
+    assert revoke_refresh_token("not-a-token") is None
+
+    revoke_all_refresh_tokens(user)
+    with pytest.raises(ValueError, match="revoked"):
+        rotate_refresh_token(two, request=None)
+    assert not UserSession.objects.filter(is_active=True).exists()
+
+
+@requires_redis
+def test_redis_store_write_behind_mirrors_rotation(settings, redis_store, user):
+    settings.REFRESH_TOKEN_WRITE_BEHIND = True  # tasks run eagerly in tests
+    _, raw = issue_token_pair(user, request=None)
+    _, _, new_raw = rotate_refresh_token(raw, request=None)
+
+    old = RefreshToken.objects.get(token=sha256_hex(raw))
+    new = RefreshToken.objects.get(token=sha256_hex(new_raw))
+    assert old.revoked_at is not None
+    assert old.replaced_by_id == new.pk
+    assert new.family_id == old.family_id
+    assert new.revoked_at is None
+
+
+def test_write_behind_converges_when_batches_arrive_out_of_order(user):
+    from datetime import UTC, datetime, timedelta
+
+    from authsvc.apps.tokens.tasks import mirror_refresh_tokens
+
+    session = UserSession.objects.create(user=user)
+    family = str(uuid.uuid4())
+    issued_at = datetime(2026, 1, 1, tzinfo=UTC)
+    rotated_at = issued_at + timedelta(minutes=5)
+
+    def snap(token, created, **extra):
+        return {
+            "token": token,
+            "user_id": user.pk,
+            "session_id": session.pk,
+            "family_id": family,
+            "created_at": created.isoformat(),
+            "expires_at": (created + timedelta(days=30)).isoformat(),
+            "revoked_at": None,
+            "replaced_by": None,
+            "ip_address": "192.0.2.1",
+            "user_agent": "ua",
+            **extra,
+        }
+
+    first = snap("a" * 64, issued_at)
+    second = snap("b" * 64, rotated_at)
+    rotated = {**first, "revoked_at": rotated_at.isoformat(), "replaced_by": second["token"]}
+
+    # The rotation batch runs before the batch that issued the first token,
+    # and both are then redelivered.
+    for _ in range(2):
+        mirror_refresh_tokens([second], [rotated])
+        mirror_refresh_tokens([first], [])
+
+    old = RefreshToken.objects.get(token=first["token"])
+    new = RefreshToken.objects.get(token=second["token"])
+    assert old.revoked_at == rotated_at
+    assert old.replaced_by_id == new.pk
+    assert (old.created_at, new.created_at) == (issued_at, rotated_at)
+    assert new.revoked_at is None
+    assert RefreshToken.objects.count() == 2
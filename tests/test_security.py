@@ -0,0 +1,380 @@
+"""JWT signing/verification key handling in ``apps.common.security``."""
+import os
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+
+def _write_rsa_keypair(priv_path, pub_path):
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    priv_path.write_bytes(
+        key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.NoEncryption(),
+        )
+    )
+    pub_path.write_bytes(
+        key.public_key().public_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PublicFormat.SubjectPublicKeyInfo,
+        )
+    )
+
+
+def test_keys_are_parsed_once_per_process(monkeypatch):
+    from authsvc.apps.common import keyring, security
+
+    keyring._key_cache.clear()
+    reads = []
+    real_read = keyring._read_file
+    monkeypatch.setattr(keyring, "_read_file", lambda path: reads.append(path) or real_read(path))
+
+    for _ in range(5):
+        token = security.make_access_jwt("user-uuid", "a@example.com")
+        assert security.jwt_verify_rs256(token)["sub"] == "user-uuid"
+    security.get_jwks()
+
+    # One read for the private key, one for the public key — not one per call.
+    assert len(reads) == 2
+
+
+def test_key_file_change_triggers_reload(settings, tmp_path):
+    from authsvc.apps.common import security
+
+    priv, pub = tmp_path / "priv.pem", tmp_path / "pub.pem"
+    _write_rsa_keypair(priv, pub)
+    settings.JWT_PRIVATE_KEY_PATH = str(priv)
+    settings.JWT_PUBLIC_KEY_PATH = str(pub)
+    settings.JWT_KEY_RELOAD_CHECK_SECONDS = 0
+
+    before = security.get_jwks()["keys"][0]["n"]
+    # Replace the files (new inode), as a key rotation or deploy would.
+    _write_rsa_keypair(tmp_path / "priv.new", tmp_path / "pub.new")
+    os.replace(tmp_path / "priv.new", priv)
+    os.replace(tmp_path / "pub.new", pub)
+    after = security.get_jwks()["keys"][0]["n"]
+
+    assert before != after
+    token = security.make_access_jwt("user-uuid", "a@example.com")
+    assert security.jwt_verify_rs256(token)["sub"] == "user-uuid"
+
+
+def test_clear_forces_reload(monkeypatch):
+    from authsvc.apps.common import keyring, security
+
+    security.get_jwks()
+    reads = []
+    real_read = keyring._read_file
+    monkeypatch.setattr(keyring, "_read_file", lambda path: reads.append(path) or real_read(path))
+
+    keyring._key_cache.clear()
+    security.get_jwks()
+
+    assert len(reads) == 1
+
+
+# --- Keyring rotation --------------------------------------------------------
+
+@pytest.fixture
+def keyring_dir(settings, tmp_path):
+    settings.JWT_KEYRING_DIR = str(tmp_path / "keyring")
+    settings.JWT_KEY_RELOAD_CHECK_SECONDS = 0
+    return tmp_path / "keyring"
+
+
+def _signing_keys(*args):
+    from django.core.management import call_command
+
+    call_command("signing_keys", *args)
+
+
+def _states():
+    from authsvc.apps.common.keyring import get_keyring
+
+    return {key.kid: key.state for key in get_keyring()}
+
+
+def _header_kid(token):
+    import json
+
+    from authsvc.apps.common.security import b64url_decode
+
+    return json.loads(b64url_decode(token.split(".")[0]))["kid"]
+
+
+@pytest.mark.django_db
+def test_keyring_rotation_keeps_outstanding_tokens_valid(keyring_dir, settings):
+    from authsvc.apps.audit.models import AuditEvent
+    from authsvc.apps.common.keyring import legacy_kid
+    from authsvc.apps.common.security import get_jwks, jwt_verify_rs256, make_access_jwt
+
+    # Adopt the current single key so tokens issued before the switch survive.
+    settings.JWT_KEYRING_DIR = ""
+    legacy_token = make_access_jwt("u1", "a@example.com")
+    settings.JWT_KEYRING_DIR = str(keyring_dir)
+    _signing_keys("import", settings.JWT_PRIVATE_KEY_PATH)
+    assert _states() == {legacy_kid(): "active"}
+    assert jwt_verify_rs256(legacy_token)["sub"] == "u1"
+
+    _signing_keys("generate")
+    new_kid = next(kid for kid, state in _states().items() if state == "next")
+    # Pre-published: in JWKS, but not yet signing.
+    assert {k["kid"] for k in get_jwks()["keys"]} == {legacy_kid(), new_kid}
+    assert _header_kid(make_access_jwt("u1", "a@example.com")) == legacy_kid()
+
+    _signing_keys("activate", new_kid)
+    assert _states() == {legacy_kid(): "previous", new_kid: "active"}
+    rotated_token = make_access_jwt("u2", "b@example.com")
+    assert _header_kid(rotated_token) == new_kid
+    assert jwt_verify_rs256(rotated_token)["sub"] == "u2"
+    assert jwt_verify_rs256(legacy_token)["sub"] == "u1"
+
+    _signing_keys("retire", legacy_kid())
+    assert [k["kid"] for k in get_jwks()["keys"]] == [new_kid]
+    with pytest.raises(ValueError):
+        jwt_verify_rs256(legacy_token)
+
+    transitions = [
+        (e.target_id, e.metadata["from"], e.metadata["to"])
+        for e in AuditEvent.objects.filter(
+            event_type=AuditEvent.EventType.SIGNING_KEY_CHANGE
+        ).order_by("occurred_at")
+    ]
+    assert transitions == [
+        (legacy_kid(), None, "active"),
+        (new_kid, None, "next"),
+        (legacy_kid(), "active", "previous"),
+        (new_kid, "next", "active"),
+        (legacy_kid(), "previous", "retired"),
+    ]
+
+
+@pytest.mark.django_db
+def test_keyring_reloads_when_a_key_file_changes(keyring_dir):
+    from authsvc.apps.common.security import get_jwks, jwt_verify_rs256, make_access_jwt
+
+    _signing_keys("generate")
+    (kid,) = _states()
+    before = get_jwks()["keys"][0]["n"]
+    # Swap the PEM behind an unchanged manifest (new inode).
+    _write_rsa_keypair(keyring_dir / "new.pem", keyring_dir / "new.pub")
+    os.replace(keyring_dir / "new.pem", keyring_dir / f"{kid}.pem")
+
+    assert get_jwks()["keys"][0]["n"] != before
+    token = make_access_jwt("u1", "a@example.com")
+    assert jwt_verify_rs256(token)["sub"] == "u1"
+
+
+@pytest.mark.django_db
+def test_active_key_cannot_be_retired(keyring_dir):
+    from django.core.management.base import CommandError
+
+    _signing_keys("generate")
+    (kid,) = _states()
+    with pytest.raises(CommandError):
+        _signing_keys("retire", kid)
+
+
+@pytest.mark.django_db
+def test_kids_never_start_with_a_dash(keyring_dir, settings):
+    from django.core.management.base import CommandError
+
+    # Generated kids are hex thumbprints, so "activate KID" needs no "--".
+    for _ in range(20):
+        _signing_keys("generate", "--alg", "EdDSA")
+    assert all(set(kid) <= set("0123456789abcdef") for kid in _states())
+    with pytest.raises(CommandError):
+        _signing_keys("import", settings.JWT_PRIVATE_KEY_PATH, "--kid=-legacy")
+
+
+@pytest.mark.django_db
+def test_generated_keys_are_owner_only(keyring_dir):
+    _signing_keys("generate")
+    (kid,) = _states()
+    assert (keyring_dir / f"{kid}.pem").stat().st_mode & 0o777 == 0o600
+
+
+@pytest.mark.django_db
+def test_import_rejects_kids_outside_the_keyring(keyring_dir, settings):
+    from django.core.management.base import CommandError
+
+    for kid in ("../escaped", "a/b", "a.b"):
+        with pytest.raises(CommandError):
+            _signing_keys("import", settings.JWT_PRIVATE_KEY_PATH, f"--kid={kid}")
+    assert not (keyring_dir.parent / "escaped.pem").exists()
+    assert list(keyring_dir.iterdir()) == []
+
+
+@pytest.mark.django_db
+def test_import_does_not_overwrite_an_existing_key_file(keyring_dir, settings):
+    from django.core.management.base import CommandError
+
+    keyring_dir.mkdir()
+    (keyring_dir / "stray.pem").write_bytes(b"keep me")
+    with pytest.raises(CommandError):
+        _signing_keys("import", settings.JWT_PRIVATE_KEY_PATH, "--kid=stray")
+    assert (keyring_dir / "stray.pem").read_bytes() == b"keep me"
+
+
+def test_token_with_unknown_kid_is_rejected():
+    import json
+
+    from authsvc.apps.common.security import (
+        b64url_encode,
+        jwt_verify_rs256,
+        make_access_jwt,
+    )
+
+    header, payload, sig = make_access_jwt("u1", "a@example.com").split(".")
+    forged = b64url_encode(json.dumps({"alg": "RS256", "kid": "nope"}).encode())
+    with pytest.raises(ValueError):
+        jwt_verify_rs256(f"{forged}.{payload}.{sig}")
+
+
+# --- JWKS endpoint -----------------------------------------------------------
+
+def test_jwks_endpoint_is_cacheable_and_revalidates(client, settings):
+    settings.JWKS_CACHE_MAX_AGE_SECONDS = 120
+    settings.JWKS_STALE_WHILE_REVALIDATE_SECONDS = 60
+
+    first = client.get("/api/v1/.well-known/jwks.json")
+    assert first.status_code == 200
+    assert first["Content-Type"] == "application/json"
+    assert first["Cache-Control"] == "public, max-age=120, stale-while-revalidate=60"
+    etag = first["ETag"]
+    assert etag.startswith('"') and etag.endswith('"')
+    assert first.json()["keys"][0]["kty"] == "RSA"
+
+    again = client.get("/api/v1/.well-known/jwks.json", HTTP_IF_NONE_MATCH=etag)
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again["ETag"] == etag
+
+    stale = client.get("/api/v1/.well-known/jwks.json", HTTP_IF_NONE_MATCH='"other"')
+    assert stale.status_code == 200
+
+
+def test_jwks_document_is_built_once_per_key_change(monkeypatch):
+    from authsvc.apps.common import security
+
+    body, etag = security.get_jwks_document()
+    monkeypatch.setattr(security, "get_jwks", lambda: pytest.fail("JWKS rebuilt"))
+    assert security.get_jwks_document() == (body, etag)
+
+
+# --- Signing algorithms ------------------------------------------------------
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "alg,jwk_members",
+    [
+        ("RS256", {"kty": "RSA"}),
+        ("ES256", {"kty": "EC", "crv": "P-256"}),
+        ("EdDSA", {"kty": "OKP", "crv": "Ed25519"}),
+    ],
+)
+def test_each_algorithm_signs_verifies_and_publishes(keyring_dir, alg, jwk_members):
+    import json
+
+    from authsvc.apps.common.security import b64url_decode, get_jwks, jwt_verify, make_access_jwt
+
+    _signing_keys("generate", "--alg", alg)
+
+    token = make_access_jwt("u1", "a@example.com")
+    header = json.loads(b64url_decode(token.split(".")[0]))
+    assert header["alg"] == alg
+    assert jwt_verify(token)["sub"] == "u1"
+
+    (jwk,) = get_jwks()["keys"]
+    assert jwk["alg"] == alg
+    assert jwk["kid"] == header["kid"]
+    assert jwk_members.items() <= jwk.items()
+
+
+@pytest.mark.django_db
+def test_header_alg_must_match_the_key(keyring_dir):
+    import json
+
+    from authsvc.apps.common.security import (
+        b64url_decode,
+        b64url_encode,
+        jwt_verify,
+        make_access_jwt,
+    )
+
+    _signing_keys("generate", "--alg", "EdDSA")
+    header_b64, payload, sig = make_access_jwt("u1", "a@example.com").split(".")
+    header = json.loads(b64url_decode(header_b64))
+    header["alg"] = "RS256"
+    swapped = b64url_encode(json.dumps(header).encode())
+
+    with pytest.raises(ValueError):
+        jwt_verify(f"{swapped}.{payload}.{sig}")
+
+
+# --- Verified-token cache (AuthBearer) ---------------------------------------
+
+@pytest.fixture
+def token_cache():
+    from authsvc.api.v1.auth import verified_tokens
+
+    verified_tokens.clear()
+    yield verified_tokens
+    verified_tokens.clear()
+
+
+@pytest.mark.django_db
+def test_repeated_bearer_token_is_verified_once(client, user, token_cache, monkeypatch):
+    from authsvc.api.v1 import auth as auth_module
+    from authsvc.apps.common.security import make_access_jwt
+
+    calls = []
+    real_verify = auth_module.jwt_verify
+    monkeypatch.setattr(auth_module, "jwt_verify", lambda t: calls.append(t) or real_verify(t))
+    token = make_access_jwt(str(user.uuid), user.email)
+
+    for _ in range(3):
+        resp = client.get("/api/v1/auth/me", HTTP_AUTHORIZATION=f"Bearer {token}")
+        assert resp.status_code == 200
+
+    assert len(calls) == 1
+    assert token_cache.stats() == {"size": 1, "hits": 2, "misses": 1}
+
+
+def test_cache_honours_exp_and_size(settings, token_cache):
+    import time
+
+    settings.AUTH_TOKEN_CACHE_SIZE = 2
+    token_cache.put("expired", {"sub": "x", "exp": int(time.time()) - 1}, None)
+    assert token_cache.get("expired") is None
+
+    live = int(time.time()) + 60
+    for name in ("a", "b", "c"):
+        token_cache.put(name, {"sub": name, "exp": live}, None)
+    assert token_cache.get("a") is None  # evicted (least recently used)
+    assert token_cache.get("c")["sub"] == "c"
+
+
+@pytest.mark.django_db
+def test_cache_drops_tokens_of_retired_keys(keyring_dir, token_cache):
+    from authsvc.api.v1.auth import AuthBearer
+    from authsvc.apps.common.security import make_access_jwt
+
+    class _Request:
+        pass
+
+    _signing_keys("generate")
+    (old_kid,) = _states()
+    token = make_access_jwt("u1", "a@example.com")
+    assert AuthBearer().authenticate(_Request(), token)["sub"] == "u1"
+    assert token_cache.get(token) is not None
+
+    _signing_keys("generate")
+    new_kid = next(kid for kid in _states() if kid != old_kid)
+    _signing_keys("activate", new_kid)
+    _signing_keys("retire", old_kid)
+
+    assert token_cache.get(token) is None
+    assert AuthBearer().authenticate(_Request(), token) is None
@@ -0,0 +1,119 @@
+"""Sliding-window login throttling (per IP, per account, per IP+account)."""
+import os
+import uuid
+
+import pytest
+
+from authsvc.apps.audit.models import AuditEvent
+from authsvc.apps.common import hashing, throttle
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def throttled(settings):
+    settings.LOGIN_THROTTLE_ENABLED = True
+    settings.LOGIN_THROTTLE_BACKEND = "local"
+    settings.LOGIN_THROTTLE_KEY_PREFIX = f"test:{uuid.uuid4().hex}"
+    settings.LOGIN_THROTTLE_IP_RATE = "100/15m"
+    settings.LOGIN_THROTTLE_ACCOUNT_RATE = "3/15m"
+    settings.LOGIN_THROTTLE_IP_ACCOUNT_RATE = "100/15m"
+    return settings
+
+
+def _attempt(client, email, ip):
+    return client.post(
+        "/api/v1/auth/login",
+        data={"email": email, "password": "wrong password"},
+        content_type="application/json",
+        REMOTE_ADDR=ip,
+    )
+
+
+def test_parse_rate():
+    assert throttle.parse_rate("5/15m") == (5, 900)
+    assert throttle.parse_rate("100/h") == (100, 3600)
+
+
+def test_account_limit_spans_ips_and_rejects_before_hashing(client, throttled, user):
+    hashes = hashing.HASH_SECONDS.count(endpoint="login")
+    statuses = [
+        _attempt(client, user.email.upper() if i % 2 else user.email, f"203.0.113.{i}")
+        for i in range(5)
+    ]
+
+    assert [r.status_code for r in statuses] == [401, 401, 401, 429, 429]
+    assert hashing.HASH_SECONDS.count(endpoint="login") - hashes == 3
+    assert 0 < int(statuses[3]["Retry-After"]) <= 900
+    # One lock event per lock, not one per rejected attempt.
+    locks = AuditEvent.objects.filter(event_type=AuditEvent.EventType.ACCOUNT_LOCK)
+    assert locks.count() == 1
+    assert locks.get().target_type == "account_identifier"
+    # Other accounts are unaffected.
+    assert _attempt(client, "someone-else@example.com", "203.0.113.9").status_code == 401
+
+
+def test_async_middleware_applies_the_same_windows(throttled, user):
+    from asgiref.sync import async_to_sync
+    from django.test import AsyncClient
+
+    client = AsyncClient()
+    body = {"email": user.email, "password": "wrong password"}
+    codes = [
+        async_to_sync(client.post)(
+            "/api/v1/auth/login", data=body, content_type="application/json"
+        ).status_code
+        for _ in range(5)
+    ]
+
+    assert codes == [401, 401, 401, 429, 429]
+    assert AuditEvent.objects.filter(event_type=AuditEvent.EventType.ACCOUNT_LOCK).count() == 1
+
+
+def test_ip_limit_spans_accounts(client, throttled):
+    throttled.LOGIN_THROTTLE_IP_RATE = "2/m"
+    codes = [
+        _attempt(client, f"user{i}@example.com", "198.51.100.7").status_code for i in range(3)
+    ]
+    assert codes == [401, 401, 429]
+    assert _attempt(client, "user9@example.com", "198.51.100.8").status_code == 401
+
+
+def test_windows_slide():
+    windows = [throttle.Window("ip", "k", 2, 10)]
+    backend = throttle.LocalWindows()
+    assert backend.hit(windows, 100.0) == (0.0, [])
+    assert backend.hit(windows, 105.0) == (0.0, [])
+    assert backend.hit(windows, 106.0) == (4.0, [0])
+    assert backend.hit(windows, 110.5) == (0.0, [])
+
+
+def test_local_windows_drop_expired_keys():
+    backend = throttle.LocalWindows()
+    for n in range(1000):
+        backend.hit([throttle.Window("account", f"victim-{n}", 5, 10)], 100.0)
+        backend.mark(f"lockout-{n}", 10, 100.0)
+    backend.hit([throttle.Window("ip", "live", 5, 600)], 100.0)
+    assert len(backend._hits) == 1001
+
+    # One sweep after the windows have passed keeps only the live key.
+    backend.hit([throttle.Window("ip", "live", 5, 600)], 100.0 + backend.SWEEP_SECONDS)
+    assert list(backend._hits) == ["live"]
+    assert backend._marks == {}
+
+
+@pytest.mark.skipif(os.getenv("TEST_REDIS") != "1", reason="requires Redis integration service")
+def test_redis_windows_match_local_semantics(settings):
+    settings.LOGIN_THROTTLE_REDIS_URL = os.getenv("REDIS_CACHE_URL", "redis://localhost:6379/1")
+    backend = throttle.RedisWindows()
+    key = f"test:throttle:{uuid.uuid4().hex}"
+    windows = [throttle.Window("ip", key, 2, 10)]
+    try:
+        assert backend.hit(windows, 100.0) == (0.0, [])
+        assert backend.hit(windows, 105.0) == (0.0, [])
+        assert backend.hit(windows, 106.0) == (4.0, [0])
+        assert backend.hit(windows, 110.5) == (0.0, [])
+        assert backend.mark(key + ":locked", 5, 110.5)
+        assert not backend.mark(key + ":locked", 5, 110.5)
+    finally:
+        backend._client.delete(key, key + ":locked")
@@ -6,10 +6,13 @@ Covers the invariants recorded in CLAUDE.md:
   * reuse of a revoked token trips reuse detection and kills the family
   * concurrent rotation of one token lets exactly one caller win (Postgres)
 """
+import base64
+import os
 import threading
 
 import pytest
 from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 from authsvc.apps.accounts.models import UserSession
 from authsvc.apps.common.security import jwt_verify_rs256, sha256_hex
@@ -72,9 +75,10 @@ def test_rotation_keeps_same_session_and_single_replacement(user):
     assert payload["sid"] == str(original.session.session_id)
 
 
-def test_reuse_of_revoked_token_revokes_family(user):
+def test_reuse_of_revoked_token_revokes_family(user, settings):
     from authsvc.apps.audit.models import AuditEvent
 
+    settings.REFRESH_REUSE_GRACE_SECONDS = 0
     _, raw1 = issue_token_pair(user, request=None)
     _, _, raw2 = rotate_refresh_token(raw1, request=None)  # raw1 now revoked
 
@@ -96,6 +100,74 @@ def test_reuse_of_revoked_token_revokes_family(user):
     ).exists()
 
 
+def test_rotation_happy_path_query_budget(user):
+    """Rotation is claim UPDATE + successor INSERT + replaced_by UPDATE."""
+    _, raw = issue_token_pair(user, request=None)
+
+    with CaptureQueriesContext(connection) as ctx:
+        rotate_refresh_token(raw, request=None)
+
+    statements = [
+        q["sql"] for q in ctx.captured_queries
+        if not q["sql"].upper().startswith(("SAVEPOINT", "RELEASE SAVEPOINT"))
+    ]
+    assert len(statements) <= 3, statements
+
+
+def test_rotation_without_update_returning_takes_the_locking_path(user, monkeypatch):
+    # MariaDB reports INSERT ... RETURNING support but cannot UPDATE ... RETURNING.
+    monkeypatch.setattr(connection, "vendor", "mysql")
+    _, raw = issue_token_pair(user, request=None)
+
+    with CaptureQueriesContext(connection) as ctx:
+        rotate_refresh_token(raw, request=None)
+
+    updates = [q["sql"].upper() for q in ctx.captured_queries if "UPDATE" in q["sql"].upper()]
+    assert updates and not any("RETURNING" in sql for sql in updates)
+    assert RefreshToken.objects.filter(revoked_at__isnull=True).count() == 1
+
+
+def test_retry_within_grace_window_returns_same_successor(user, settings):
+    from authsvc.apps.audit.models import AuditEvent
+
+    settings.REFRESH_REUSE_GRACE_SECONDS = 10
+    _, raw1 = issue_token_pair(user, request=None)
+    _, access, raw2 = rotate_refresh_token(raw1, request=None)
+
+    # A client retry with the same token gets the pair already issued.
+    ret_user, retry_access, retry_raw = rotate_refresh_token(raw1, request=None)
+
+    assert ret_user == user
+    assert (retry_access, retry_raw) == (access, raw2)
+    assert UserSession.objects.get().is_active
+    assert RefreshToken.objects.count() == 2
+    assert not AuditEvent.objects.filter(
+        event_type=AuditEvent.EventType.REFRESH_TOKEN_REUSE
+    ).exists()
+
+
+def test_grace_window_does_not_cover_late_or_superseded_reuse(user, settings):
+    from datetime import timedelta
+
+    from django.utils import timezone
+
+    settings.REFRESH_REUSE_GRACE_SECONDS = 10
+    _, raw1 = issue_token_pair(user, request=None)
+    _, _, raw2 = rotate_refresh_token(raw1, request=None)
+    rotate_refresh_token(raw2, request=None)  # successor already used
+
+    with pytest.raises(ValueError, match="reuse"):
+        rotate_refresh_token(raw1, request=None)
+
+    _, raw3 = issue_token_pair(user, request=None)
+    rotate_refresh_token(raw3, request=None)
+    RefreshToken.objects.filter(token=sha256_hex(raw3)).update(
+        revoked_at=timezone.now() - timedelta(seconds=11)
+    )
+    with pytest.raises(ValueError, match="reuse"):
+        rotate_refresh_token(raw3, request=None)
+
+
 def test_unknown_token_raises(user):
     with pytest.raises(ValueError, match="not found"):
         rotate_refresh_token("nonexistent-token", request=None)
@@ -130,7 +202,7 @@ def test_revoke_all_deactivates_sessions_and_refresh_tokens(user):
 
 
 @pytest.mark.django_db(transaction=True)
-def test_concurrent_rotation_only_one_wins(user):
+def test_concurrent_rotation_only_one_wins(user, settings):
     """Two simultaneous rotations of the same token: exactly one succeeds.
 
     Requires real row locking, so it only runs on PostgreSQL. On SQLite
@@ -139,6 +211,7 @@ def test_concurrent_rotation_only_one_wins(user):
     """
     if connection.vendor != "postgresql":
         pytest.skip("concurrency test requires PostgreSQL (select_for_update)")
+    settings.REFRESH_REUSE_GRACE_SECONDS = 0
 
     _, raw = issue_token_pair(user, request=None)
 
@@ -162,3 +235,163 @@ def test_concurrent_rotation_only_one_wins(user):
         t.join()
 
     assert sorted(results.values()) == ["ok", "rejected"]
+
+
+def _introspect(client, body, headers=None):
+    return client.post(
+        "/api/v1/auth/introspect", data=body, content_type="application/json", headers=headers
+    )
+
+
+def _basic(client_id, secret):
+    return {"Authorization": "Basic " + base64.b64encode(f"{client_id}:{secret}".encode()).decode()}
+
+
+def test_introspect_requires_client_credentials(client, user, resource_server):
+    from oauth2_provider.models import get_application_model
+
+    access, _ = issue_token_pair(user, request=None)
+    client_id = get_application_model().objects.get(name="resource-server").client_id
+
+    assert _introspect(client, {"token": access}).status_code == 401
+    assert _introspect(client, {"token": access}, _basic(client_id, "wrong")).status_code == 401
+    assert _introspect(client, {"token": access}, _basic("nope", "rs-raw-secret")).status_code == 401
+    assert _introspect(client, {"token": access}, resource_server).status_code == 200
+
+
+def test_introspect_hashes_once_for_unknown_and_known_clients(
+    client, user, resource_server, monkeypatch
+):
+    from django.contrib.auth.hashers import check_password
+    from oauth2_provider.models import get_application_model
+
+    from authsvc.api.v1 import auth
+
+    calls = []
+    monkeypatch.setattr(
+        auth, "check_password", lambda *args: calls.append(args) or check_password(*args)
+    )
+    access, _ = issue_token_pair(user, request=None)
+    client_id = get_application_model().objects.get(name="resource-server").client_id
+
+    # Same work either way: an unknown client_id must not answer faster.
+    assert _introspect(client, {"token": access}, _basic("nope", "wrong")).status_code == 401
+    assert _introspect(client, {"token": access}, _basic(client_id, "wrong")).status_code == 401
+    assert len(calls) == 2
+
+
+def test_introspect_single_token_rfc7662_shape(client, user, resource_server):
+    access, _ = issue_token_pair(user, request=None)
+
+    resp = _introspect(client, {"token": access}, resource_server)
+
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["active"] is True
+    assert body["token_type"] == "access_token"
+    assert body["sub"] == str(user.uuid)
+    assert body["sid"] == str(UserSession.objects.get().session_id)
+
+    revoke_all_refresh_tokens(user)
+    assert _introspect(client, {"token": access}, resource_server).json() == {"active": False}
+
+
+def test_introspect_batch_uses_one_session_query(
+    client, user, resource_server, django_assert_num_queries
+):
+    from authsvc.apps.common.security import make_mfa_challenge
+    from authsvc.apps.tokens.services import introspect_tokens
+
+    live, _ = issue_token_pair(user, request=None)
+    dead, _ = issue_token_pair(user, request=None)
+    UserSession.objects.filter(
+        session_id=jwt_verify_rs256(dead)["sid"]
+    ).update(is_active=False)
+    tokens = [live, "garbage", dead, make_mfa_challenge(str(user.uuid)), live]
+
+    with django_assert_num_queries(1):
+        results = introspect_tokens(tokens)
+
+    assert [r["active"] for r in results] == [True, False, False, False, True]
+    results = _introspect(client, {"tokens": tokens}, resource_server).json()["results"]
+    assert results[1] == {"active": False}
+
+
+def test_introspect_rejects_oversized_or_ambiguous_requests(client, settings, resource_server):
+    settings.INTROSPECTION_MAX_TOKENS = 2
+
+    assert _introspect(client, {"tokens": ["a", "b", "c"]}, resource_server).status_code == 400
+    assert _introspect(client, {"token": "a", "tokens": ["b"]}, resource_server).status_code == 400
+    assert _introspect(client, {}, resource_server).status_code == 400
+
+
+def test_logout_all_cuts_off_outstanding_access_tokens(
+    client, user, django_capture_on_commit_callbacks
+):
+    access, _ = issue_token_pair(user, request=None)
+    other_access, _ = issue_token_pair(user, request=None)
+    auth = {"HTTP_AUTHORIZATION": f"Bearer {access}"}
+    assert client.get("/api/v1/auth/me", **auth).status_code == 200
+
+    with django_capture_on_commit_callbacks(execute=True):
+        assert client.post("/api/v1/auth/logout-all", **auth).status_code == 200
+
+    # Both sessions' access tokens die now, not at exp — even though the first
+    # one is already in AuthBearer's verified-token cache.
+    assert client.get("/api/v1/auth/me", **auth).status_code == 401
+    other = {"HTTP_AUTHORIZATION": f"Bearer {other_access}"}
+    assert client.get("/api/v1/auth/me", **other).status_code == 401
+
+
+def test_refresh_reuse_revokes_the_session_access_token(
+    client, user, settings, django_capture_on_commit_callbacks
+):
+    settings.REFRESH_REUSE_GRACE_SECONDS = 0
+    access, raw1 = issue_token_pair(user, request=None)
+    rotate_refresh_token(raw1, request=None)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        with pytest.raises(ValueError, match="reuse"):
+            rotate_refresh_token(raw1, request=None)
+
+    resp = client.get("/api/v1/auth/me", HTTP_AUTHORIZATION=f"Bearer {access}")
+    assert resp.status_code == 401
+
+
+def test_revoked_session_entries_expire_after_access_ttl(settings):
+    import time
+    import uuid
+
+    from authsvc.apps.tokens.revocation import RevokedSessions
+
+    revoked = RevokedSessions()
+    sid = str(uuid.uuid4())
+    settings.JWT_ACCESS_TTL_SECONDS = 60
+    revoked.revoke([sid])
+    assert revoked.is_revoked(sid)
+
+    revoked._expiry[sid] = time.time() - 1
+    assert not revoked.is_revoked(sid)
+    assert sid not in revoked._expiry
+
+
+@pytest.mark.skipif(os.getenv("TEST_REDIS") != "1", reason="requires Redis integration service")
+def test_revocations_propagate_between_processes_via_redis(settings):
+    import time
+    import uuid
+
+    from authsvc.apps.tokens.revocation import RevokedSessions
+
+    settings.SESSION_REVOCATION_BACKEND = "redis"
+    settings.SESSION_REVOCATION_REDIS_URL = os.getenv("REDIS_CACHE_URL", "redis://localhost:6379/1")
+    publisher, subscriber = RevokedSessions(), RevokedSessions()
+    sid = str(uuid.uuid4())
+    assert not subscriber.is_revoked(sid)  # starts the listener
+    time.sleep(0.5)
+
+    publisher.revoke([sid])
+
+    deadline = time.monotonic() + 5
+    while not subscriber.is_revoked(sid) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert subscriber.is_revoked(sid)
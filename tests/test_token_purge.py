@@ -0,0 +1,89 @@
+"""Batched purge of dead token rows (manage.py purge_tokens / beat task)."""
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from authsvc.apps.accounts.models import EmailOTP, UserSession
+from authsvc.apps.tokens.models import OneTimeToken, RefreshToken
+from authsvc.apps.tokens.purge import purge_tokens
+
+pytestmark = pytest.mark.django_db
+
+
+def _refresh(user, session, *, expires_in_days=30, revoked_days_ago=None):
+    now = timezone.now()
+    rt = RefreshToken(
+        user=user,
+        session=session,
+        expires_at=now + timedelta(days=expires_in_days),
+        revoked_at=now - timedelta(days=revoked_days_ago) if revoked_days_ago is not None else None,
+    )
+    rt.save()
+    return rt
+
+
+def test_purge_deletes_only_rows_past_retention(user):
+    session = UserSession.objects.create(user=user)
+    old_expired = [_refresh(user, session, expires_in_days=-10) for _ in range(5)]
+    old_revoked = _refresh(user, session, revoked_days_ago=10)
+    recently_revoked = _refresh(user, session, revoked_days_ago=1)
+    live = _refresh(user, session)
+    # A live token whose predecessor link points at a purged row.
+    live.replaced_by = old_revoked
+    live.save(update_fields=["replaced_by"])
+
+    OneTimeToken(
+        user=user,
+        purpose=OneTimeToken.PURPOSE_RESET_PASSWORD,
+        expires_at=timezone.now() - timedelta(days=10),
+    ).save()
+    OneTimeToken(
+        user=user,
+        purpose=OneTimeToken.PURPOSE_VERIFY_EMAIL,
+        expires_at=timezone.now() + timedelta(minutes=15),
+    ).save()
+    EmailOTP.objects.create(user=user, expires_at=timezone.now() - timedelta(days=10))
+
+    # Batch size 2 forces several keyset pages.
+    results = {r.label: r for r in purge_tokens(retention_days=7, batch_size=2, pause=0)}
+
+    assert results["refresh_tokens"].deleted == len(old_expired) + 1
+    assert results["refresh_tokens"].batches >= 3
+    assert results["one_time_tokens"].deleted == 1
+    assert results["email_otps"].deleted == 1
+    assert set(RefreshToken.objects.values_list("pk", flat=True)) == {
+        recently_revoked.pk,
+        live.pk,
+    }
+    live.refresh_from_db()
+    assert live.replaced_by_id is None
+    assert OneTimeToken.objects.count() == 1
+    assert not EmailOTP.objects.exists()
+
+
+def test_purge_command_reports_rate_and_supports_dry_run(user):
+    session = UserSession.objects.create(user=user)
+    _refresh(user, session, expires_in_days=-30)
+
+    out = StringIO()
+    call_command("purge_tokens", "--dry-run", stdout=out)
+    assert "refresh_tokens: 1 eligible" in out.getvalue()
+    assert RefreshToken.objects.count() == 1
+
+    out = StringIO()
+    call_command("purge_tokens", "--pause", "0", stdout=out)
+    assert "refresh_tokens: deleted 1" in out.getvalue()
+    assert "rows/s" in out.getvalue()
+    assert not RefreshToken.objects.exists()
+
+
+def test_purge_beat_task(user):
+    from authsvc.apps.tokens.tasks import purge_expired_tokens
+
+    session = UserSession.objects.create(user=user)
+    _refresh(user, session, expires_in_days=-30)
+
+    assert purge_expired_tokens.delay().get()["refresh_tokens"] == 1